@@ -51,6 +51,23 @@ with DAG(
         """,
     )
     
+    # hashes the fetched CSV; exits 99 (task skipped, so are preprocess, eda and model_pipeline) when
+    # the last complete model_pipeline ran on the same file. Trigger with {"force": true} to rerun anyway.
+    data_version = BashOperator(
+        task_id="data_version",
+        bash_command=f"""
+        python /opt/airflow/scripts/data_version.py --data_path "{OUTPUT}" {{{{ "--force" if dag_run.conf.get("force") else "" }}}}
+        """,
+        skip_on_exit_code=99,
+    )
+
+    preprocess = BashOperator(
+        task_id="preprocess",
+        bash_command=f"""
+        python /opt/airflow/scripts/preprocess.py --data_path "{OUTPUT}"
+        """
+    )
+
     eda = BashOperator(
         task_id="eda",
         bash_command=f"""
@@ -62,18 +79,44 @@ with DAG(
         task_id="model_pipeline",
         bash_command=f"""
         echo "Starting model pipeline with data from {OUTPUT}"
-        python /opt/airflow/scripts/train_model.py --data_path "{OUTPUT}"
+        python /opt/airflow/scripts/train_model.py --data_path "{OUTPUT}" --diagnostics defer
         """,
     )
     
+    # folds labeled batches the backend wrote since the last run into the incremental model (partial_fit);
+    # runs on unchanged data too, since new labels arrive independently of the Kaggle CSV
+    incremental = BashOperator(
+        task_id="incremental",
+        bash_command=f"""
+        python /opt/airflow/scripts/incremental.py --data_path "{OUTPUT}" --gcs_prefix data_label/labeled_
+        """,
+        trigger_rule="none_failed",
+    )
+
+    # trigger with {"new_data_path": "<csv> [<csv> ...]"} to warm-start Production on those labeled rows
+    # (--warm_start) instead of retraining every model
     retrain = BashOperator(
         task_id="retrain",
         bash_command=f"""
         echo "Running retraining pipeline..."
-        python /opt/airflow/scripts/retrain.py --data_path "{OUTPUT}" --promote
+        python /opt/airflow/scripts/retrain.py --data_path "{OUTPUT}" --promote --diagnostics defer \
+            {{{{ ("--warm_start --new_data_path " ~ dag_run.conf["new_data_path"]) if dag_run.conf.get("new_data_path") else "" }}}}
+        """,
+        # still runs when data_version skipped training on unchanged data, so live drift can trigger it
+        trigger_rule="none_failed",
+    )
+
+    # decision boundary plots for the runs above; off the critical path and scheduled last
+    diagnostics = BashOperator(
+        task_id="diagnostics",
+        bash_command=f"""
+        python /opt/airflow/scripts/diagnostics.py --data_path "{OUTPUT}"
         """,
+        priority_weight=1,
+        weight_rule="absolute",
     )
 
     end = EmptyOperator(task_id="end")
 
-dependencies >> fetch_mobile_reviews >> [eda, model_pipeline] >> retrain >> end
+dependencies >> fetch_mobile_reviews >> data_version >> preprocess >> [eda, model_pipeline] >> incremental >> retrain >> end
+retrain >> diagnostics
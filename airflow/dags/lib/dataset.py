@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "sentiment_dataset"))
+CLEAN_COLUMN = "review_clean"
+LABEL_ID_COLUMN = "label_id"
+# run tag holding the sha256 of the raw CSV a model was trained on
+DATA_VERSION_TAG = "data_sha256"
+# experiment tag holding the sha256 of the CSV the last complete training task succeeded on
+TRAINED_DATA_TAG = "trained_data_sha256"
+
+
+@lru_cache(maxsize=1)
+def english_stopwords():
+    """NLTK English stopwords, downloaded on first use only."""
+    import nltk
+    from nltk.corpus import stopwords
+
+    try:
+        return frozenset(stopwords.words("english"))
+    except LookupError:
+        nltk.download("stopwords")
+        return frozenset(stopwords.words("english"))
+
+
+def clean_texts(texts):
+    """
+    clean_text over a whole column: lower-case, keep alphabetic tokens that are
+    not English stopwords. The stopword set is built once for all rows.
+    """
+    stop = english_stopwords()
+    return pd.Series(
+        [" ".join(w for w in t.lower().split() if w.isalpha() and w not in stop) for t in texts],
+        index=getattr(texts, "index", None), dtype=object,
+    )
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _build(data_path, target):
+    df = pd.read_csv(data_path).dropna(subset=["review_text", "sentiment"])
+    df = df.drop_duplicates(subset=["review_text"]).reset_index(drop=True)
+    le = LabelEncoder()
+    df[LABEL_ID_COLUMN] = le.fit_transform(df["sentiment"])
+    df[CLEAN_COLUMN] = clean_texts(df["review_text"])
+
+    target.mkdir(parents=True)
+    df.to_parquet(target / "dataset.parquet", index=False)
+    (target / "labels.json").write_text(json.dumps({"classes_": le.classes_.tolist()}, ensure_ascii=False))
+
+
+def cached_dataset_dir(data_path, cache_dir=DATASET_CACHE_DIR):
+    """
+    Directory holding the preprocessed dataset for this exact raw file: rows after
+    dropna/dedupe with the raw columns plus review_clean and label_id
+    (dataset.parquet) and the label encoding (labels.json). Built once per file
+    hash; concurrent builders write to a temp dir and the first rename wins.
+    """
+    key = file_sha256(data_path)[:16]
+    target = Path(cache_dir) / key
+    if not (target / "labels.json").exists():
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=cache_dir, prefix=f".{key}-"))
+        try:
+            _build(data_path, tmp / "data")
+            os.replace(tmp / "data", target)
+        except OSError:
+            if not (target / "labels.json").exists():
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def _read(target):
+    df = pd.read_parquet(target / "dataset.parquet")
+    class_names = json.loads((target / "labels.json").read_text())["classes_"]
+    return df, class_names
+
+
+def load_dataset(data_path, cache_dir=DATASET_CACHE_DIR):
+    """(preprocessed DataFrame, class names) for a raw CSV, from the cache."""
+    return _read(cached_dataset_dir(data_path, cache_dir))
+
+
+def split_indices(target, labels, test_size, random_state):
+    """Stratified train/val row positions, cached next to the dataset per (test_size, random_state)."""
+    path = Path(target) / f"split_{test_size}_{random_state}.npz"
+    if path.exists():
+        with np.load(path) as saved:
+            return saved["train"], saved["val"]
+    train_idx, val_idx = train_test_split(
+        np.arange(len(labels)), test_size=test_size, stratify=labels, random_state=random_state
+    )
+    fd, tmp = tempfile.mkstemp(dir=target, suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, train=train_idx, val=val_idx)
+    os.replace(tmp, path)
+    return train_idx, val_idx
+
+
+def training_split(data_path, test_size, random_state, cache_dir=DATASET_CACHE_DIR):
+    """
+    (train_df, val_df, class_names) with cleaned review_text and encoded sentiment,
+    identical to splitting the cleaned frame with train_test_split directly.
+    """
+    target = cached_dataset_dir(data_path, cache_dir)
+    df, class_names = _read(target)
+    df = df.assign(review_text=df[CLEAN_COLUMN], sentiment=df[LABEL_ID_COLUMN])
+    df = df.drop(columns=[CLEAN_COLUMN, LABEL_ID_COLUMN])
+    train_idx, val_idx = split_indices(target, df["sentiment"].to_numpy(), test_size, random_state)
+    return df.iloc[train_idx], df.iloc[val_idx], class_names
@@ -0,0 +1,152 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import chi2_contingency, wasserstein_distance
+
+DRIFT_TOP_K = int(os.getenv("DRIFT_TOP_K", "200"))
+# Same defaults as Evidently's DataDriftPreset for large numerical columns
+WASSERSTEIN_THRESHOLD = 0.1
+DATASET_DRIFT_SHARE = 0.5
+CATEGORICAL_P_VALUE = 0.05
+
+
+def column_stats(X):
+    """Per-feature rows, document frequency, mean and std straight from a sparse matrix."""
+    X = sparse.csr_matrix(X)
+    n = X.shape[0]
+    mean = np.asarray(X.mean(axis=0)).ravel()
+    mean_sq = np.asarray(X.multiply(X).mean(axis=0)).ravel()
+    return {
+        "rows": n,
+        "doc_freq": np.bincount(X.indices, minlength=X.shape[1]) / max(n, 1),
+        "mean": mean,
+        "std": np.sqrt(np.maximum(mean_sq - mean ** 2, 0.0)),
+    }
+
+
+def top_features(ref_stats, cur_stats, top_k=DRIFT_TOP_K):
+    """Indices of the top_k features by mean TF-IDF weight across reference and current."""
+    weight = ref_stats["mean"] + cur_stats["mean"]
+    k = min(top_k, weight.size)
+    top = np.argpartition(-weight, k - 1)[:k] if k else np.empty(0, dtype=int)
+    return top[np.argsort(-weight[top], kind="stable")]
+
+
+def _column_values(X_csc, j):
+    # a sparse column as (values, weights): its nonzeros plus one weighted zero
+    start, end = X_csc.indptr[j], X_csc.indptr[j + 1]
+    values = np.r_[0.0, X_csc.data[start:end]]
+    weights = np.r_[X_csc.shape[0] - (end - start), np.ones(end - start)]
+    return values, weights
+
+
+def wasserstein_normed(ref_csc, cur_csc, j, ref_std):
+    """Wasserstein distance of column j, normed by the reference std (Evidently's default test)."""
+    u, u_w = _column_values(ref_csc, j)
+    v, v_w = _column_values(cur_csc, j)
+    distance = wasserstein_distance(u, v, u_w, v_w)
+    return float(distance / ref_std) if ref_std > 0 else float(distance > 0)
+
+
+def categorical_drift(reference, current):
+    """Chi-square test of two label distributions; drift when p < CATEGORICAL_P_VALUE."""
+    ref_counts = pd.Series(reference).value_counts()
+    cur_counts = pd.Series(current).value_counts()
+    table = pd.concat([ref_counts, cur_counts], axis=1).fillna(0).to_numpy()
+    if table.shape[0] < 2:
+        p_value = 1.0
+    else:
+        p_value = float(chi2_contingency(table)[1])
+    return {
+        "stattest_name": "chi-square p_value",
+        "drift_score": p_value,
+        "threshold": CATEGORICAL_P_VALUE,
+        "drift_detected": p_value < CATEGORICAL_P_VALUE,
+    }
+
+
+def sparse_drift(X_ref, X_cur, feature_names, y_ref=None, y_cur=None,
+                 pred_ref=None, pred_cur=None, top_k=DRIFT_TOP_K):
+    """
+    Training-time drift between reference (train) and current (validation)
+    TF-IDF matrices without densifying them. Feature statistics come from the
+    CSR data; the drift test runs on the top_k features by mean weight.
+    The result mirrors Evidently's DataDriftTable: drift_share is the share of
+    drifted columns among the tested ones.
+    """
+    ref_stats, cur_stats = column_stats(X_ref), column_stats(X_cur)
+    top = top_features(ref_stats, cur_stats, top_k)
+    ref_csc, cur_csc = sparse.csc_matrix(X_ref), sparse.csc_matrix(X_cur)
+
+    drift_by_columns = {}
+    for j in top:
+        score = wasserstein_normed(ref_csc, cur_csc, j, ref_stats["std"][j])
+        drift_by_columns[str(feature_names[j])] = {
+            "stattest_name": "Wasserstein distance (normed)",
+            "drift_score": score,
+            "threshold": WASSERSTEIN_THRESHOLD,
+            "drift_detected": score >= WASSERSTEIN_THRESHOLD,
+            "reference": {"mean": float(ref_stats["mean"][j]), "doc_freq": float(ref_stats["doc_freq"][j])},
+            "current": {"mean": float(cur_stats["mean"][j]), "doc_freq": float(cur_stats["doc_freq"][j])},
+        }
+
+    n_drifted = sum(c["drift_detected"] for c in drift_by_columns.values())
+    drift_share = n_drifted / len(drift_by_columns) if drift_by_columns else 0.0
+    result = {
+        "number_of_columns": len(drift_by_columns),
+        "number_of_drifted_columns": n_drifted,
+        "drift_share": drift_share,
+        "dataset_drift": drift_share >= DATASET_DRIFT_SHARE,
+        "drift_by_columns": drift_by_columns,
+    }
+    if y_ref is not None and y_cur is not None:
+        result["target_drift"] = categorical_drift(y_ref, y_cur)
+    if pred_ref is not None and pred_cur is not None:
+        result["prediction_drift"] = categorical_drift(pred_ref, pred_cur)
+
+    return {
+        "metrics": {"metric": "SparseDataDrift", "result": result},
+        "stats": {
+            "reference_rows": ref_stats["rows"],
+            "current_rows": cur_stats["rows"],
+            "n_features": int(X_ref.shape[1]),
+            "top_k": int(top_k),
+        },
+    }
+
+
+def drift_table(report):
+    """Per-column drift results as a DataFrame (for the HTML artifact)."""
+    rows = [
+        {"feature": name, "drift_score": c["drift_score"], "drift_detected": c["drift_detected"],
+         "ref_mean": c["reference"]["mean"], "cur_mean": c["current"]["mean"],
+         "ref_doc_freq": c["reference"]["doc_freq"], "cur_doc_freq": c["current"]["doc_freq"]}
+        for name, c in report["metrics"]["result"]["drift_by_columns"].items()
+    ]
+    return pd.DataFrame(rows)
+
+
+def serving_drift_summary(series, window_hours, now=None):
+    """
+    Aggregate the hourly /predict drift series over the last window_hours:
+    request-weighted mean and max drift_share and the share of requests that
+    crossed the serving threshold. None when no request falls in the window.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(hours=window_hours)).replace(minute=0, second=0, microsecond=0).isoformat()
+    buckets = [b for b in (series or {}).get("buckets", []) if b["start"] >= cutoff]
+    requests = sum(b["requests"] for b in buckets)
+    if not requests:
+        return None
+    return {
+        "window_hours": window_hours,
+        "requests": requests,
+        "rows": sum(b["rows"] for b in buckets),
+        "mean_drift_share": sum(b["drift_share_sum"] for b in buckets) / requests,
+        "max_drift_share": max(b["drift_share_max"] for b in buckets),
+        "drifted_request_share": sum(b["drifted_requests"] for b in buckets) / requests,
+        "last_bucket": buckets[-1]["start"],
+    }
@@ -1,16 +1,21 @@
 import pandas as pd
 import json
+import hashlib
 import tempfile
 from pathlib import Path
 import os
 import requests
 
+import joblib
+import numpy as np
 import mlflow
 from mlflow.tracking import MlflowClient
 from mlflow.models import infer_signature
 import mlflow.sklearn as mlflow_sklearn
+from scipy import sparse
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.pipeline import Pipeline
@@ -20,59 +25,197 @@ try:
 except Exception:
     XGB_AVAILABLE = False
 
-def build_pipelines(max_features):
-    """Builds classification pipelines with TF-IDF and 3 different classifiers."""
-    tfidf = TfidfVectorizer(
+from lib import tracking
+from lib.dataset import DATA_VERSION_TAG
+
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "sentiment_features"))
+_FEATURE_CACHE = {}
+INCREMENTAL_N_FEATURES = 2 ** 18
+# Serving budgets a run must meet to be promoted (0 disables a budget)
+MAX_LATENCY_P99_MS = float(os.getenv("MAX_LATENCY_P99_MS", "100"))
+MAX_MODEL_SIZE_MB = float(os.getenv("MAX_MODEL_SIZE_MB", "200"))
+# Run tag set by evaluate_model; runs carrying it need benchmark metrics to pass the budgets
+BENCHMARK_TAG = "serving_benchmark"
+# Experiment tag holding the champion record (see update_champion)
+CHAMPION_TAG = "champion"
+
+
+def build_vectorizer(max_features):
+    """TF-IDF vectorizer shared by every candidate model."""
+    return TfidfVectorizer(
         lowercase=True, strip_accents="unicode", analyzer="word",
         ngram_range=(1, 2), max_features=max_features, min_df=2
     )
 
-    nb = Pipeline([
-        ("tfidf", tfidf),
-        ("clf", MultinomialNB(alpha=4.0, fit_prior=True))
-    ])
 
-    rf = Pipeline([
+def build_classifiers(params=None):
+    """
+    Unfitted classifiers keyed by model key (nb, rf and xgb when available).
+    `params` ({model_key: {param: value}}) overrides the default hyperparameters.
+    """
+    classifiers = {
+        "nb": MultinomialNB(alpha=4.0, fit_prior=True),
+        "rf": RandomForestClassifier(
+            n_estimators=10, max_depth=3, random_state=42, n_jobs=-1),
+    }
+    if XGB_AVAILABLE:
+        classifiers["xgb"] = XGBClassifier(
+            objective="multi:softprob",
+            learning_rate=0.01, n_estimators=10,
+            max_depth=6, subsample=0.5,
+            random_state=42, n_jobs=-1)
+    for key, overrides in (params or {}).items():
+        if key in classifiers:
+            classifiers[key].set_params(**overrides)
+    return classifiers
+
+
+def assemble_pipeline(tfidf, clf):
+    return Pipeline([
         ("tfidf", tfidf),
-        ("clf", RandomForestClassifier(
-            n_estimators=10, max_depth=3, random_state=42, n_jobs=-1))
+        ("clf", clf)
     ])
 
-    models = {"nb": nb, "rf": rf}
-    if XGB_AVAILABLE:
-        xgb = Pipeline([
-            ("tfidf", tfidf),
-            ("clf", XGBClassifier(
-                objective="multi:softprob",
-                learning_rate=0.01, n_estimators=10,
-                max_depth=6, subsample=0.5, 
-                random_state=42, n_jobs=-1))
-        ])
-        models["xgb"] = xgb
-    return models
+
+def build_pipelines(max_features):
+    """Builds classification pipelines with TF-IDF and 3 different classifiers."""
+    tfidf = build_vectorizer(max_features)
+    return {key: assemble_pipeline(tfidf, clf) for key, clf in build_classifiers().items()}
+
+
+def build_hashing_vectorizer(n_features=INCREMENTAL_N_FEATURES):
+    """Stateless vectorizer for incremental models; non-negative so MultinomialNB can use it."""
+    return HashingVectorizer(
+        lowercase=True, strip_accents="unicode", analyzer="word",
+        ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm="l2"
+    )
+
+
+def build_incremental_pipelines(n_features=INCREMENTAL_N_FEATURES):
+    """Pipelines that learn batch by batch: HashingVectorizer + partial_fit classifiers."""
+    hashing = build_hashing_vectorizer(n_features)
+    return {
+        "sgd": Pipeline([
+            ("hashing", hashing),
+            ("clf", SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42))
+        ]),
+        "inb": Pipeline([
+            ("hashing", hashing),
+            ("clf", MultinomialNB(alpha=0.1))
+        ]),
+    }
+
+
+def partial_fit_pipeline(pipe, texts, y, classes):
+    """Update an incremental pipeline with one batch; cost is O(batch)."""
+    X = pipe.named_steps["hashing"].transform(texts)
+    pipe.named_steps["clf"].partial_fit(X, y, classes=classes)
+    return pipe
+
+
+def _features_key(X_train, X_val, tfidf):
+    digest = hashlib.sha256(json.dumps(tfidf.get_params(), sort_keys=True, default=str).encode("utf-8"))
+    for X in (X_train, X_val):
+        digest.update(pd.util.hash_pandas_object(pd.Series(X).reset_index(drop=True), index=False).values.tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()[:16]
+
+
+def split_features(X_train, X_val, max_features, cache_dir=FEATURE_CACHE_DIR):
+    """
+    Fit the TF-IDF vectorizer once per train/val split and cache it with the
+    sparse train/val matrices, in memory and (when cache_dir is set) on disk
+    so other processes training on the same split can reuse them.
+    Returns {"key", "vectorizer", "X_train", "X_val"}.
+    """
+    tfidf = build_vectorizer(max_features)
+    key = _features_key(X_train, X_val, tfidf)
+    if key in _FEATURE_CACHE:
+        return _FEATURE_CACHE[key]
+
+    cache_path = Path(cache_dir) / key if cache_dir else None
+    if cache_path is not None and (cache_path / "val.npz").exists():
+        features = {
+            "key": key,
+            "vectorizer": joblib.load(cache_path / "vectorizer.joblib"),
+            "X_train": sparse.load_npz(cache_path / "train.npz"),
+            "X_val": sparse.load_npz(cache_path / "val.npz"),
+        }
+    else:
+        X_train_tfidf = tfidf.fit_transform(X_train)
+        features = {
+            "key": key,
+            "vectorizer": tfidf,
+            "X_train": X_train_tfidf.tocsr(),
+            "X_val": tfidf.transform(X_val).tocsr(),
+        }
+        if cache_path is not None:
+            try:
+                cache_path.mkdir(parents=True, exist_ok=True)
+                joblib.dump(tfidf, cache_path / "vectorizer.joblib")
+                sparse.save_npz(cache_path / "train.npz", features["X_train"])
+                # written last: its presence marks a complete cache entry
+                sparse.save_npz(cache_path / "val.npz", features["X_val"])
+            except OSError as e:
+                print(f"[warn] could not write feature cache {cache_path}: {e}")
+
+    _FEATURE_CACHE[key] = features
+    return features
+
+
+def subset_rows(y, fraction, seed=42):
+    """
+    Stratified row positions covering `fraction` of y. One fixed permutation per
+    class, so a larger fraction is a superset of a smaller one.
+    """
+    y = np.asarray(y)
+    if fraction >= 1.0:
+        return np.arange(len(y))
+    rng = np.random.default_rng(seed)
+    rows = []
+    for label in np.unique(y):
+        members = rng.permutation(np.flatnonzero(y == label))
+        rows.append(members[:max(1, int(round(len(members) * fraction)))])
+    return np.sort(np.concatenate(rows))
+
+
+def pipeline_on_features(model_key, features, clf=None):
+    """
+    Pipeline around the already-fitted shared vectorizer; evaluate_model(features=...)
+    only fits its "clf" step on the cached matrices.
+    """
+    clf = clf if clf is not None else build_classifiers()[model_key]
+    return assemble_pipeline(features["vectorizer"], clf)
 
 
 def log_model_info(model_name, model_key, pipe, run_name, registered_name,
                    class_names, metrics, args):
-    """save model metadata and log to mlflow artifacts"""
+    """save model metadata and log to mlflow artifacts; returns the ModelInfo of the logged model"""
     meta = {
         "model_name": model_name,
         "registered_model_name": registered_name,
-        "tfidf": {
-            "max_features": pipe.named_steps["tfidf"].max_features,
-            "ngram_range": pipe.named_steps["tfidf"].ngram_range,
-            "min_df": pipe.named_steps["tfidf"].min_df
-        },
         "params_specific": {},
         "data": {
             "test_size": args.test_size,
-            "random_state": args.random_state
+            "random_state": args.random_state,
+            "sha256": getattr(args, "data_sha256", None),
         },
         "labels": {
             "id_to_label": {int(i): str(lbl) for i, lbl in enumerate(class_names)},
         },
         "metrics": metrics
     }
+    if "tfidf" in pipe.named_steps:
+        meta["tfidf"] = {
+            "max_features": pipe.named_steps["tfidf"].max_features,
+            "ngram_range": pipe.named_steps["tfidf"].ngram_range,
+            "min_df": pipe.named_steps["tfidf"].min_df
+        }
+    elif "hashing" in pipe.named_steps:
+        meta["hashing"] = {
+            "n_features": pipe.named_steps["hashing"].n_features,
+            "ngram_range": pipe.named_steps["hashing"].ngram_range,
+        }
     if model_key == "rf":
         clf = pipe.named_steps["clf"]
         meta["params_specific"] = {
@@ -88,21 +231,24 @@ def log_model_info(model_name, model_key, pipe, run_name, registered_name,
             "subsample": float(clf.subsample)
         }
 
+    if getattr(args, "data_sha256", None):
+        tracking.set_tag(DATA_VERSION_TAG, args.data_sha256)
+
     with tempfile.TemporaryDirectory() as td:
         p = Path(td) / f"{model_key}__metadata.json"
         p.write_text(json.dumps(meta, indent=2, ensure_ascii=False))
-        mlflow.log_artifact(p, artifact_path="model")
+        tracking.log_artifact(p, artifact_path="model")
 
         # Also persist the label encoder mapping for serving
         le_map = {"classes_": class_names}
         p_le = Path(td) / f"{model_key}__label_encoder.json"
         p_le.write_text(json.dumps(le_map, indent=2, ensure_ascii=False))
-        mlflow.log_artifact(p_le, artifact_path="model")
+        tracking.log_artifact(p_le, artifact_path="model")
 
     # ---- Log model (per-run) + optional registration
     input_example = pd.DataFrame({"review_text": ["great phone", "แบตอึดมาก"]})
     signature = infer_signature(model_input=input_example)
-    mlflow_sklearn.log_model(
+    model_info = mlflow_sklearn.log_model(
         sk_model=pipe,
         name=f"{model_key}_model",
         registered_model_name=registered_name,
@@ -111,12 +257,134 @@ def log_model_info(model_name, model_key, pipe, run_name, registered_name,
     )
 
     print(f"[{run_name}] run_id={mlflow.active_run().info.run_id} | registered_name={registered_name}")
+    return model_info
+
+
+def budget_violations(metrics, max_latency_ms=MAX_LATENCY_P99_MS, max_size_mb=MAX_MODEL_SIZE_MB, benchmarked=True):
+    """
+    Serving budgets a run's benchmark metrics (lib.artifacts.benchmark_model) exceed.
+    Empty when the run fits. A benchmarked run missing a metric (its benchmark
+    failed) violates that budget; only runs logged before benchmarking existed
+    (benchmarked=False, no BENCHMARK_TAG) are not gated.
+    """
+    violations = []
+    latency = metrics.get("latency_p99_ms")
+    if max_latency_ms and latency is None and benchmarked:
+        violations.append("latency_p99_ms missing")
+    elif max_latency_ms and latency is not None and latency > max_latency_ms:
+        violations.append(f"latency_p99_ms={latency:.1f} > {max_latency_ms:g}")
+    size = metrics.get("model_size_mb")
+    if max_size_mb and size is None and benchmarked:
+        violations.append("model_size_mb missing")
+    elif max_size_mb and size is not None and size > max_size_mb:
+        violations.append(f"model_size_mb={size:.1f} > {max_size_mb:g}")
+    return violations
+
+
+def ranked_runs(client, experiment_id, max_latency_ms=MAX_LATENCY_P99_MS, max_size_mb=MAX_MODEL_SIZE_MB,
+                page_size=100):
+    """
+    Finished runs by macro_f1, best first (newest first on ties), ordered by the
+    tracking server and paged through, so no run is missed however long the
+    history. Runs over the serving budgets (or whose benchmark failed) are skipped.
+    """
+    page_token = None
+    while True:
+        page = client.search_runs(
+            experiment_ids=[experiment_id],
+            filter_string="attributes.status = 'FINISHED' and metrics.macro_f1 >= 0",
+            order_by=["metrics.macro_f1 DESC", "attributes.start_time DESC"],
+            max_results=page_size,
+            page_token=page_token,
+        )
+        for run in page:
+            if run.data.tags.get("evaluation") == "prequential":
+                # incremental runs scored on their own new batches, not on the shared validation split
+                continue
+            violations = budget_violations(run.data.metrics, max_latency_ms, max_size_mb,
+                                           benchmarked=BENCHMARK_TAG in run.data.tags)
+            if violations:
+                print(f"[gate] skipping run {run.info.run_id} ({run.info.run_name}): {', '.join(violations)}")
+                continue
+            yield run
+        page_token = page.token
+        if not page_token:
+            return
+
+
+def read_champion(experiment):
+    """The experiment's champion record (see update_champion), or None."""
+    record = experiment.tags.get(CHAMPION_TAG)
+    return json.loads(record) if record else None
+
+
+def _write_champion(client, experiment_id, run_id, run_name, macro_f1, model_name, version,
+                    max_latency_ms, max_size_mb):
+    record = {
+        "run_id": run_id,
+        "run_name": run_name,
+        "macro_f1": macro_f1,
+        "model_name": model_name,
+        "version": str(version) if version is not None else None,
+        "max_latency_ms": max_latency_ms,
+        "max_size_mb": max_size_mb,
+    }
+    client.set_experiment_tag(experiment_id, CHAMPION_TAG, json.dumps(record))
+    return record
 
 
-def promote_best_model(experiment_name: str = "Sentiment CLS", alias: str = "Production"):
+def update_champion(client, experiment_id, run_id, run_name, metrics, model_name=None, version=None,
+                    max_latency_ms=MAX_LATENCY_P99_MS, max_size_mb=MAX_MODEL_SIZE_MB):
     """
-    Fetch eval metrics from all runs in an experiment, identify the best model by macro_f1,
-    and promote it to the given alias (default 'Production').
+    Make a just-finished run the experiment's champion if it is within the serving
+    budgets and at least as good (macro_f1) as the current one. The record is a
+    small experiment tag, so promotion reads it instead of scanning every run.
+    `model_name`/`version` identify the model version the run registered.
+    """
+    macro_f1 = metrics.get("macro_f1")
+    if macro_f1 is None or budget_violations(metrics, max_latency_ms, max_size_mb):
+        return None
+    champion = read_champion(client.get_experiment(experiment_id))
+    if champion and (champion["max_latency_ms"], champion["max_size_mb"]) != (max_latency_ms, max_size_mb):
+        # recorded under other budgets: re-rank everything (this run included) under these
+        return rebuild_champion(client, experiment_id, max_latency_ms, max_size_mb)
+    if champion and champion["macro_f1"] > macro_f1:
+        return champion
+    return _write_champion(client, experiment_id, run_id, run_name, float(macro_f1), model_name, version,
+                           max_latency_ms, max_size_mb)
+
+
+def rebuild_champion(client, experiment_id, max_latency_ms=MAX_LATENCY_P99_MS, max_size_mb=MAX_MODEL_SIZE_MB):
+    """Recompute the champion record from the ordered leaderboard; None when no run qualifies."""
+    best_run = next(ranked_runs(client, experiment_id, max_latency_ms, max_size_mb), None)
+    if best_run is None:
+        return None
+    versions = client.search_model_versions(f"run_id='{best_run.info.run_id}'")
+    model_name, version = (versions[0].name, versions[0].version) if versions else (None, None)
+    return _write_champion(client, experiment_id, best_run.info.run_id, best_run.info.run_name,
+                           best_run.data.metrics["macro_f1"], model_name, version, max_latency_ms, max_size_mb)
+
+
+def _champion_is_current(client, champion, max_latency_ms, max_size_mb):
+    # recorded under other budgets, or its run / model version has since been deleted
+    if champion["max_latency_ms"] != max_latency_ms or champion["max_size_mb"] != max_size_mb:
+        return False
+    try:
+        if client.get_run(champion["run_id"]).info.lifecycle_stage != "active":
+            return False
+        if champion["version"] is not None:
+            client.get_model_version(champion["model_name"], champion["version"])
+    except Exception:
+        return False
+    return True
+
+
+def promote_best_model(experiment_name: str = "Sentiment CLS", alias: str = "Production",
+                       max_latency_ms: float = MAX_LATENCY_P99_MS, max_size_mb: float = MAX_MODEL_SIZE_MB):
+    """
+    Promote the experiment's champion (best macro_f1 within the serving budgets, see
+    update_champion) to the given alias (default 'Production'). Reading the champion
+    record is O(1) in the number of runs; it is rebuilt from ranked_runs when needed.
     """
     client = MlflowClient()
     
@@ -128,59 +396,44 @@ def promote_best_model(experiment_name: str = "Sentiment CLS", alias: str = "Pro
             "message": f"Experiment '{experiment_name}' not found."
         }
     
-    # Search all runs in the experiment (limit to recent runs or all if necessary)
-    runs = client.search_runs(experiment_ids=[experiment.experiment_id], max_results=1000)
-    
-    if not runs:
-        return {
-            "promoted": False,
-            "message": f"No runs found in experiment '{experiment_name}'."
-        }
-    
-    # Find best run by macro_f1 metric
-    best_run = None
-    best_macro_f1 = -1
-    
-    for run in runs:
-        macro_f1 = run.data.metrics.get("macro_f1", -1)
-        if macro_f1 > best_macro_f1:
-            best_macro_f1 = macro_f1
-            best_run = run
-    
-    if not best_run:
+    # Champion record kept up to date after every run; rebuilt from the ordered
+    # leaderboard when missing, recorded under other budgets or stale
+    champion = read_champion(experiment)
+    if champion is None or not _champion_is_current(client, champion, max_latency_ms, max_size_mb):
+        champion = rebuild_champion(client, experiment.experiment_id, max_latency_ms, max_size_mb)
+
+    if not champion:
         return {
             "promoted": False,
-            "message": "No runs with macro_f1 metric found."
+            "message": "No runs with macro_f1 metric within the serving budgets found."
         }
-    
-    print(f"Best run found: {best_run.info.run_id} with macro_f1={best_macro_f1}")
-    
-    # Find registered model version(s) for the best run
-    versions = client.search_model_versions(f"run_id='{best_run.info.run_id}'")
-    
-    if not versions:
+
+    best_run_id = champion["run_id"]
+    best_macro_f1 = champion["macro_f1"]
+    print(f"Best run found: {best_run_id} with macro_f1={best_macro_f1}")
+
+    if champion["version"] is None:
         return {
             "promoted": False,
-            "best_run_id": best_run.info.run_id,
+            "best_run_id": best_run_id,
             "best_macro_f1": best_macro_f1,
-            "message": f"No registered model version found for best run {best_run.info.run_id}."
+            "message": f"No registered model version found for best run {best_run_id}."
         }
-    
-    best_version = versions[0]
-    model_name = best_version.name
-    version_number = best_version.version
+
+    model_name = champion["model_name"]
+    version_number = champion["version"]
     
     try:
         # Check if a current production alias exists
         try:
             current_prod = client.get_model_version_by_alias(model_name, alias)
             # If same version, no promotion needed
-            if current_prod.version == version_number:
+            if str(current_prod.version) == version_number:
                 return {
                     "promoted": False,
                     "best_model_name": model_name,
                     "best_version": version_number,
-                    "best_run_id": best_run.info.run_id,
+                    "best_run_id": best_run_id,
                     "best_macro_f1": best_macro_f1,
                     "message": f"Model {model_name} v{version_number} is already at @{alias}."
                 }
@@ -208,7 +461,7 @@ def promote_best_model(experiment_name: str = "Sentiment CLS", alias: str = "Pro
             "promoted": True,
             "best_model_name": model_name,
             "best_version": version_number,
-            "best_run_id": best_run.info.run_id,
+            "best_run_id": best_run_id,
             "best_macro_f1": best_macro_f1,
             "message": f"Successfully promoted {model_name} v{version_number} to @{alias} (macro_f1={best_macro_f1})"
         }
@@ -218,7 +471,7 @@ def promote_best_model(experiment_name: str = "Sentiment CLS", alias: str = "Pro
             "promoted": False,
             "best_model_name": model_name,
             "best_version": version_number,
-            "best_run_id": best_run.info.run_id,
+            "best_run_id": best_run_id,
             "best_macro_f1": best_macro_f1,
             "message": f"Promotion failed: {e}"
         }
@@ -0,0 +1,142 @@
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import mlflow
+from mlflow.utils.mlflow_tags import MLFLOW_PARENT_RUN_ID
+from sklearn.metrics import f1_score
+from threadpoolctl import threadpool_limits
+
+from lib.model import build_classifiers, split_features, subset_rows
+from lib.training import MODEL_NAMES, resolve_workers, thread_budget
+
+# Candidate values per hyperparameter; configurations are sampled from this grid.
+SEARCH_SPACE = {
+    "nb": {"alpha": [0.1, 0.5, 1.0, 2.0, 4.0]},
+    "rf": {"n_estimators": [10, 50, 100, 200], "max_depth": [3, 6, 12, None]},
+    "xgb": {"learning_rate": [0.01, 0.05, 0.1, 0.3], "n_estimators": [10, 50, 100], "max_depth": [3, 6]},
+}
+MAX_FEATURES_SPACE = [100, 500, 2000, 5000]
+
+# Per-process search state, set once per worker by _init_search
+_SEARCH = {}
+
+
+def sample_configs(n_configs, model_keys, seed=42):
+    """
+    Up to `n_configs` distinct configurations, spread round-robin over the
+    model keys: {"trial", "model_key", "max_features", "params"}.
+    """
+    rng = random.Random(seed)
+    seen, configs = set(), []
+    n_possible = sum(
+        len(MAX_FEATURES_SPACE) * math.prod(len(v) for v in SEARCH_SPACE[key].values()) for key in model_keys
+    )
+    while len(configs) < min(n_configs, n_possible):
+        key = model_keys[len(configs) % len(model_keys)]
+        params = {name: rng.choice(values) for name, values in SEARCH_SPACE[key].items()}
+        max_features = rng.choice(MAX_FEATURES_SPACE)
+        ident = (key, max_features, tuple(sorted(params.items())))
+        if ident in seen:
+            continue
+        seen.add(ident)
+        configs.append({"trial": len(configs), "model_key": key, "max_features": max_features, "params": params})
+    return configs
+
+
+def rung_fractions(min_fraction, eta):
+    """Training-data fractions per rung: ..., 1/eta**2, 1/eta, 1.0, starting at or above min_fraction."""
+    n_rungs = math.floor(math.log(1 / min_fraction, eta) + 1e-9) + 1
+    return [float(eta) ** -(n_rungs - 1 - r) for r in range(n_rungs)]
+
+
+def _init_search(train_df, val_df, tracking_uri, experiment_name, n_jobs):
+    _SEARCH.update(train_df=train_df, val_df=val_df, n_jobs=n_jobs)
+    if tracking_uri:
+        mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_experiment(experiment_name)
+
+
+def _run_trial(config, fraction, rung, parent_run_id, seed):
+    train_df, val_df, n_jobs = _SEARCH["train_df"], _SEARCH["val_df"], _SEARCH["n_jobs"]
+    features = split_features(train_df["review_text"], val_df["review_text"], config["max_features"])
+    y_train = train_df["sentiment"].to_numpy()
+    rows = subset_rows(y_train, fraction, seed)
+
+    clf = build_classifiers({config["model_key"]: config["params"]})[config["model_key"]]
+    if "n_jobs" in clf.get_params():
+        clf.set_params(n_jobs=n_jobs)
+    start = time.perf_counter()
+    with threadpool_limits(limits=n_jobs):
+        clf.fit(features["X_train"][rows], y_train[rows])
+        y_pred = clf.predict(features["X_val"])
+    fit_seconds = time.perf_counter() - start
+    score = float(f1_score(val_df["sentiment"], y_pred, average="macro"))
+
+    run_name = f"{MODEL_NAMES.get(config['model_key'], config['model_key'])}-t{config['trial']}-r{rung}"
+    # nested in-process; in a worker the parent tag links the run. Trials log trial_macro_f1,
+    # not macro_f1, so promote_best_model never picks a subset fit
+    with mlflow.start_run(run_name=run_name, nested=True, tags={MLFLOW_PARENT_RUN_ID: parent_run_id}) as run:
+        mlflow.log_params({"model_key": config["model_key"], "max_features": config["max_features"],
+                           "rung": rung, "train_fraction": fraction, **config["params"]})
+        mlflow.log_metrics({"trial_macro_f1": score, "train_rows": len(rows), "fit_seconds": fit_seconds})
+    return config | {"rung": rung, "fraction": fraction, "score": score, "run_id": run.info.run_id}
+
+
+def successive_halving(train_df, val_df, args, n_configs=12, eta=3, min_fraction=0.1,
+                       workers=0, seed=42):
+    """
+    Successive halving over training-data subsets: every sampled configuration
+    is fitted on a small fraction (>= min_fraction) of the training rows, the best 1/eta move on
+    to eta times more data, until the survivors train on all rows. Trials share
+    the cached TF-IDF matrices (one per max_features value), run in parallel
+    workers and are logged as nested runs under one "HyperparameterSearch" run.
+    Returns {"best", "rungs", "parent_run_id"}.
+    """
+    columns = ["review_text", "sentiment"]
+    train_df, val_df = train_df[columns], val_df[columns]
+    model_keys = [key for key in build_classifiers() if key in SEARCH_SPACE]
+    configs = sample_configs(n_configs, model_keys, seed)
+    fractions = rung_fractions(min_fraction, eta)
+
+    # warm the feature cache once so workers only load matrices from disk
+    for max_features in sorted({c["max_features"] for c in configs}):
+        split_features(train_df["review_text"], val_df["review_text"], max_features)
+
+    workers = resolve_workers(workers, len(configs))
+    n_jobs = thread_budget(workers)
+    init_args = (train_df, val_df, args.tracking_uri, args.experiment_name, n_jobs)
+
+    rungs = []
+    with mlflow.start_run(run_name="HyperparameterSearch") as parent:
+        mlflow.log_params({"n_configs": len(configs), "eta": eta, "min_fraction": min_fraction,
+                           "workers": workers, "seed": seed})
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_search, initargs=init_args)
+        else:
+            _init_search(*init_args)
+        try:
+            survivors = configs
+            for rung, fraction in enumerate(fractions):
+                print(f"Rung {rung}: {len(survivors)} configs on {fraction:.0%} of training rows")
+                if pool is not None:
+                    futures = [pool.submit(_run_trial, c, fraction, rung, parent.info.run_id, seed) for c in survivors]
+                    results = [f.result() for f in futures]
+                else:
+                    results = [_run_trial(c, fraction, rung, parent.info.run_id, seed) for c in survivors]
+                results.sort(key=lambda r: (-r["score"], r["trial"]))
+                rungs.append(results)
+                survivors = [configs[r["trial"]] for r in results[:max(1, len(results) // eta)]]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        best = rungs[-1][0]
+        mlflow.log_params({"best_model_key": best["model_key"], "best_max_features": best["max_features"]})
+        mlflow.log_metric("best_trial_macro_f1", best["score"])
+        mlflow.log_dict({"best": best, "rungs": rungs}, "search/successive_halving.json")
+    return {"best": best, "rungs": rungs, "parent_run_id": parent.info.run_id}
@@ -0,0 +1,76 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+# Serving writes these; the Airflow side only reads them
+SERVING_DRIFT_BLOB = "reports/drift/series.json"
+
+
+def gcs_bucket():
+    """The shared bucket, via the emulator when GCS_ENDPOINT is set (as in the backend)."""
+    from google.cloud import storage
+
+    endpoint = os.getenv("GCS_ENDPOINT", "").strip()
+    if endpoint:
+        from google.api_core.client_options import ClientOptions
+        from google.auth.credentials import AnonymousCredentials
+
+        client = storage.Client(project="test-project", credentials=AnonymousCredentials(),
+                                client_options=ClientOptions(api_endpoint=endpoint))
+    else:
+        client = storage.Client()
+    return client.bucket(os.getenv("GCS_BUCKET_NAME", "mobile-reviews-bucket"))
+
+
+def read_json_blob(bucket, blob_path):
+    """A small JSON object in one download, or None when it does not exist."""
+    from google.api_core.exceptions import NotFound
+
+    try:
+        return json.loads(bucket.blob(blob_path).download_as_bytes())
+    except NotFound:
+        return None
+
+
+# ---------- Manifests ----------
+# The backend keeps a pointer (latest.json) and one index shard per UTC day (index/<YYYY-MM-DD>.json)
+# for data_label/labeled_; it resyncs that prefix from a listing every few minutes, so entries can lag
+MANIFEST_PREFIX = "manifests"
+MANIFEST_LAG_SECONDS = int(os.getenv("MANIFEST_LAG_SECONDS", "900"))
+
+
+def timestamp(dt: datetime) -> str:
+    """Fixed-width UTC timestamp, the manifest's time format (naive means UTC)."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+
+
+def _manifest_key(prefix):
+    return prefix.strip("/").replace("/", "__")
+
+
+def files_since(bucket, prefix, since=None):
+    """
+    Manifest entries (name, time_created, ...) under prefix created at or after `since`,
+    oldest first. Reads only the day shards in range; lists the prefix instead when the
+    backend has no manifest for it or has not resynced it within MANIFEST_LAG_SECONDS.
+    """
+    lo = timestamp(since) if since else ""
+    pointer = read_json_blob(bucket, f"{MANIFEST_PREFIX}/{_manifest_key(prefix)}/latest.json")
+    stale = timestamp(datetime.now(timezone.utc) - timedelta(seconds=MANIFEST_LAG_SECONDS))
+    if pointer is None or (pointer.get("synced_at") or "") < stale:
+        print(f"[warn] no fresh manifest for {prefix}; listing the bucket")
+        entries = [{"name": b.name, "time_created": timestamp(b.time_created)}
+                   for b in bucket.list_blobs(prefix=prefix)]
+    else:
+        entries = []
+        for day in (d for d in pointer["shards"] if d >= lo[:10]):
+            shard = read_json_blob(bucket, f"{MANIFEST_PREFIX}/{_manifest_key(prefix)}/index/{day}.json")
+            entries += (shard or {}).get("entries", [])
+    return sorted((e for e in entries if e["name"].startswith(prefix) and e["time_created"] >= lo),
+                  key=lambda e: (e["time_created"], e["name"]))
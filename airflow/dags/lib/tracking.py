@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import mlflow
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+UPLOAD_WORKERS = int(os.getenv("MLFLOW_UPLOAD_WORKERS", "4"))
+# MLflow's log_batch limits
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_TAGS_PER_BATCH = 100
+
+# Logger of the enclosing batched_logging() block, if any
+_ACTIVE = None
+
+
+class RunLogger:
+    """
+    Buffers one run's metrics, params and tags and sends them with log_batch on
+    flush(). Artifacts are staged into a private temp dir (so callers may delete
+    their files right away) and uploaded by a thread pool while training continues.
+    """
+
+    def __init__(self, run_id, max_workers=UPLOAD_WORKERS, client=None):
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self._metrics, self._params, self._tags = [], [], []
+        self._uploads = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mlflow-upload")
+        self._staging = Path(tempfile.mkdtemp(prefix="mlflow-staging-"))
+
+    # ---- metrics / params / tags
+    def log_metrics(self, metrics, step=0):
+        timestamp = int(time.time() * 1000)
+        self._metrics.extend(Metric(k, float(v), timestamp, step) for k, v in metrics.items())
+
+    def log_params(self, params):
+        self._params.extend(Param(k, str(v)) for k, v in params.items())
+
+    def set_tags(self, tags):
+        self._tags.extend(RunTag(k, str(v)) for k, v in tags.items())
+
+    # ---- artifacts
+    def _stage(self, artifact_file):
+        path = Path(tempfile.mkdtemp(dir=self._staging)) / Path(artifact_file).name
+        parent = Path(artifact_file).parent.as_posix()
+        return path, None if parent == "." else parent
+
+    def _upload(self, local_path, artifact_path):
+        self._uploads.append(self._pool.submit(self.client.log_artifact, self.run_id, str(local_path), artifact_path))
+
+    def log_artifact(self, local_path, artifact_path=None):
+        path = Path(tempfile.mkdtemp(dir=self._staging)) / Path(local_path).name
+        shutil.copyfile(local_path, path)
+        self._upload(path, artifact_path)
+
+    def log_figure(self, figure, artifact_file):
+        # rendered here: matplotlib is not thread-safe, only the upload is deferred
+        path, artifact_path = self._stage(artifact_file)
+        figure.savefig(path)
+        self._upload(path, artifact_path)
+
+    def log_dict(self, dictionary, artifact_file):
+        path, artifact_path = self._stage(artifact_file)
+        path.write_text(json.dumps(dictionary, indent=2))
+        self._upload(path, artifact_path)
+
+    # ---- lifecycle
+    def flush(self):
+        """Send buffered values in log_batch-sized chunks and wait for every pending upload."""
+        metrics, params, tags = self._metrics, self._params, self._tags
+        self._metrics, self._params, self._tags = [], [], []
+        for i in range(0, len(metrics), MAX_METRICS_PER_BATCH):
+            self.client.log_batch(self.run_id, metrics=metrics[i:i + MAX_METRICS_PER_BATCH])
+        for i in range(0, max(len(params), len(tags)), MAX_PARAMS_TAGS_PER_BATCH):
+            self.client.log_batch(self.run_id, params=params[i:i + MAX_PARAMS_TAGS_PER_BATCH],
+                                  tags=tags[i:i + MAX_PARAMS_TAGS_PER_BATCH])
+        uploads, self._uploads = self._uploads, []
+        errors = [f.exception() for f in uploads if f.exception() is not None]
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._pool.shutdown(wait=True)
+            shutil.rmtree(self._staging, ignore_errors=True)
+
+
+@contextmanager
+def batched_logging(run_id=None, max_workers=UPLOAD_WORKERS):
+    """
+    Route this module's log_* calls for the block to a RunLogger on `run_id`
+    (default: the active run). Everything is flushed when the block exits, so
+    open it inside mlflow.start_run(): the run only ends, and promotion only
+    reads it, once all of its metrics and artifacts are stored.
+    """
+    global _ACTIVE
+    logger = RunLogger(run_id or mlflow.active_run().info.run_id, max_workers)
+    previous, _ACTIVE = _ACTIVE, logger
+    try:
+        yield logger
+    except BaseException:
+        _ACTIVE = previous
+        try:
+            logger.close()
+        except Exception as e:
+            print(f"[warn] flushing MLflow logs after an error failed: {e}")
+        raise
+    _ACTIVE = previous
+    logger.close()
+
+
+# Drop-in replacements for the mlflow fluent calls; they go straight to mlflow
+# outside a batched_logging() block.
+def log_metric(key, value):
+    log_metrics({key: value})
+
+
+def log_metrics(metrics):
+    if _ACTIVE is not None:
+        _ACTIVE.log_metrics(metrics)
+    else:
+        mlflow.log_metrics(metrics)
+
+
+def log_params(params):
+    if _ACTIVE is not None:
+        _ACTIVE.log_params(params)
+    else:
+        mlflow.log_params(params)
+
+
+def set_tag(key, value):
+    set_tags({key: value})
+
+
+def set_tags(tags):
+    if _ACTIVE is not None:
+        _ACTIVE.set_tags(tags)
+    else:
+        mlflow.set_tags(tags)
+
+
+def log_artifact(local_path, artifact_path=None):
+    if _ACTIVE is not None:
+        _ACTIVE.log_artifact(local_path, artifact_path)
+    else:
+        mlflow.log_artifact(local_path, artifact_path=artifact_path)
+
+
+def log_figure(figure, artifact_file):
+    if _ACTIVE is not None:
+        _ACTIVE.log_figure(figure, artifact_file)
+    else:
+        mlflow.log_figure(figure, artifact_file)
+
+
+def log_dict(dictionary, artifact_file):
+    if _ACTIVE is not None:
+        _ACTIVE.log_dict(dictionary, artifact_file)
+    else:
+        mlflow.log_dict(dictionary, artifact_file)
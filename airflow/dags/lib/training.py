@@ -0,0 +1,234 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+import mlflow
+import numpy as np
+from mlflow.tracking import MlflowClient
+from sklearn.base import clone
+from threadpoolctl import threadpool_limits
+
+from lib import tracking
+from lib.model import (
+    MAX_LATENCY_P99_MS, MAX_MODEL_SIZE_MB, build_classifiers, build_pipelines, log_model_info, pipeline_on_features,
+    split_features, update_champion,
+)
+from lib.artifacts import evaluate_model
+
+MODEL_NAMES = {"nb": "NaiveBayes", "rf": "RandomForest", "xgb": "XGBoost",
+               "sgd": "SGDIncremental", "inb": "NaiveBayesIncremental"}
+# Model families that can only be warm-started on new rows covering every class
+FULL_CLASS_WARM_START = ("xgb", "rf")
+
+
+def resolve_workers(workers, n_candidates):
+    """0 means one worker per candidate, capped by the CPU count."""
+    cpus = os.cpu_count() or 1
+    if workers <= 0:
+        workers = min(n_candidates, cpus)
+    return max(1, min(workers, n_candidates))
+
+
+def thread_budget(workers):
+    """Threads each worker may use so that workers * threads stays within the CPU count."""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+@contextmanager
+def _limit_n_jobs(pipe, n_jobs):
+    """
+    Cap the classifier's n_jobs and the BLAS/OpenMP pools while training; the
+    original n_jobs is restored on exit so the logged/registered model keeps it.
+    """
+    clf = pipe.named_steps["clf"]
+    has_n_jobs = "n_jobs" in clf.get_params()
+    original = clf.get_params()["n_jobs"] if has_n_jobs else None
+    if has_n_jobs:
+        clf.set_params(n_jobs=n_jobs)
+    try:
+        with threadpool_limits(limits=n_jobs):
+            yield pipe
+    finally:
+        if has_n_jobs:
+            clf.set_params(n_jobs=original)
+
+
+def record_champion(result, args):
+    """Offer a finished candidate to the experiment's champion record (see lib.model.update_champion)."""
+    client = MlflowClient()
+    update_champion(client, client.get_run(result["run_id"]).info.experiment_id, result["run_id"],
+                    MODEL_NAMES.get(result["model_key"], result["model_key"]), result["metrics"],
+                    model_name=result["registered_name"], version=result["version"],
+                    max_latency_ms=getattr(args, "max_latency_ms", MAX_LATENCY_P99_MS),
+                    max_size_mb=getattr(args, "max_size_mb", MAX_MODEL_SIZE_MB))
+
+
+def train_candidate(model_key, X_train, y_train, X_val, y_val, class_names, args,
+                    features=None, n_jobs=None, params=None, record=True):
+    """
+    Train, evaluate and register one candidate in its own MLflow run.
+    `params` overrides the classifier's default hyperparameters.
+    `record` updates the experiment's champion record once the run has finished.
+    Returns {"model_key", "run_id", "metrics", "train_seconds", "registered_name",
+    "version"} for the promotion decision.
+    """
+    model_name = MODEL_NAMES.get(model_key, model_key)
+    if params:
+        clf = build_classifiers({model_key: params})[model_key]
+        features = features or split_features(X_train, X_val, args.max_features)
+        pipe = pipeline_on_features(model_key, features, clf=clf)
+    elif features is not None:
+        pipe = pipeline_on_features(model_key, features)
+    else:
+        pipe = build_pipelines(args.max_features)[model_key]
+
+    # metrics and tags are batched and artifacts uploaded in the background; all of it
+    # is flushed before the run ends, so promotion always sees complete runs
+    with mlflow.start_run(run_name=model_name) as run, tracking.batched_logging(run.info.run_id):
+        start = time.perf_counter()
+        with _limit_n_jobs(pipe, n_jobs) if n_jobs is not None else nullcontext():
+            metrics = evaluate_model(pipe, model_name, X_train, y_train,
+                                     X_val=X_val, y_val=y_val, features=features,
+                                     diagnostics=getattr(args, "diagnostics", "full"))
+        train_seconds = time.perf_counter() - start
+        tracking.log_metric("train_seconds", train_seconds)
+        model_info = log_model_info(
+            model_name=model_name,
+            model_key=model_key,
+            pipe=pipe,
+            run_name=model_name,
+            registered_name=f"{args.registered_model_name}",
+            class_names=class_names,
+            metrics=metrics,
+            args=args,
+        )
+    result = {"model_key": model_key, "run_id": run.info.run_id, "metrics": metrics, "train_seconds": train_seconds,
+              "registered_name": args.registered_model_name, "version": model_info.registered_model_version}
+    if record:
+        record_champion(result, args)
+    return result
+
+
+def continue_training(pipe, model_key, X_new, y_new, extra_estimators):
+    """
+    Continue training a fitted pipeline on new rows only, keeping its vectorizer:
+    XGB boosts `extra_estimators` more rounds from the existing booster, RF adds
+    that many trees with warm_start, NB folds the rows in with partial_fit.
+    """
+    tfidf, clf = pipe.named_steps["tfidf"], pipe.named_steps["clf"]
+    if model_key in FULL_CLASS_WARM_START and not np.array_equal(np.unique(y_new), clf.classes_):
+        # XGB cannot continue boosting and a warm-started RF would reset classes_ and mix
+        # trees with different class counts (predict_proba then fails to broadcast)
+        raise ValueError(f"warm start of '{model_key}' needs new rows covering every class {list(clf.classes_)}, "
+                         f"got {np.unique(y_new).tolist()}")
+    X_new_tfidf = tfidf.transform(X_new)
+    if model_key == "xgb":
+        booster = clf.get_booster()
+        clf = clone(clf).set_params(n_estimators=extra_estimators)
+        clf.fit(X_new_tfidf, y_new, xgb_model=booster)
+        # report the total number of rounds in the model metadata
+        clf.set_params(n_estimators=clf.get_booster().num_boosted_rounds())
+        pipe.steps[-1] = ("clf", clf)
+    elif model_key == "rf":
+        clf.set_params(warm_start=True, n_estimators=clf.n_estimators + extra_estimators)
+        clf.fit(X_new_tfidf, y_new)
+    elif model_key == "nb":
+        clf.partial_fit(X_new_tfidf, y_new)
+    else:
+        raise ValueError(f"warm start is not supported for model '{model_key}'")
+    return pipe, X_new_tfidf
+
+
+def warm_start_candidate(pipe, model_key, X_new, y_new, X_val, y_val, class_names, args,
+                         extra_estimators=10):
+    """
+    Warm-start a Production pipeline on new rows and log it like any other candidate
+    (its own MLflow run, metrics on the shared validation split, registration,
+    champion record).
+    """
+    model_name = MODEL_NAMES.get(model_key, model_key)
+    with mlflow.start_run(run_name=model_name) as run, tracking.batched_logging(run.info.run_id):
+        start = time.perf_counter()
+        pipe, X_new_tfidf = continue_training(pipe, model_key, X_new, y_new, extra_estimators)
+        features = {
+            "key": None,
+            "vectorizer": pipe.named_steps["tfidf"],
+            "X_train": X_new_tfidf,
+            "X_val": pipe.named_steps["tfidf"].transform(X_val),
+        }
+        metrics = evaluate_model(pipe, model_name, X_new, y_new, X_val=X_val, y_val=y_val,
+                                 features=features, diagnostics=getattr(args, "diagnostics", "full"),
+                                 fitted=True)
+        train_seconds = time.perf_counter() - start
+        tracking.set_tags({"training": "warm_start", "warm_start_rows": len(y_new)})
+        tracking.log_metric("train_seconds", train_seconds)
+        model_info = log_model_info(
+            model_name=model_name,
+            model_key=model_key,
+            pipe=pipe,
+            run_name=model_name,
+            registered_name=f"{args.registered_model_name}",
+            class_names=class_names,
+            metrics=metrics,
+            args=args,
+        )
+    result = {"model_key": model_key, "run_id": run.info.run_id, "metrics": metrics, "train_seconds": train_seconds,
+              "registered_name": args.registered_model_name, "version": model_info.registered_model_version}
+    record_champion(result, args)
+    return result
+
+
+def _train_in_worker(model_key, train_df, val_df, class_names, args, n_jobs):
+    # spawned workers start with a fresh MLflow state
+    if args.tracking_uri:
+        mlflow.set_tracking_uri(args.tracking_uri)
+    mlflow.set_experiment(args.experiment_name)
+
+    features = None
+    if args.shared_features:
+        # hits the on-disk cache written by the parent
+        features = split_features(train_df["review_text"], val_df["review_text"], args.max_features)
+    # the parent records the champion: workers would race on the read-modify-write
+    return train_candidate(model_key, train_df["review_text"], train_df["sentiment"],
+                           val_df["review_text"], val_df["sentiment"],
+                           class_names, args, features=features, n_jobs=n_jobs, record=False)
+
+
+def train_candidates(train_df, val_df, class_names, args, workers=0):
+    """
+    Train every candidate and return their results in candidate order.
+
+    With more than one worker each candidate is trained in a spawned process
+    with its own MLflow run; RF/XGB n_jobs and the BLAS/OpenMP pools are capped
+    at cpu_count // workers so the workers do not oversubscribe the machine.
+    The caller makes the promotion decision once all results are in.
+    """
+    keys = list(build_pipelines(args.max_features))
+    features = None
+    if args.shared_features:
+        features = split_features(train_df["review_text"], val_df["review_text"], args.max_features)
+
+    workers = resolve_workers(workers, len(keys))
+    if workers == 1:
+        return [
+            train_candidate(key, train_df["review_text"], train_df["sentiment"],
+                            val_df["review_text"], val_df["sentiment"],
+                            class_names, args, features=features)
+            for key in keys
+        ]
+
+    n_jobs = thread_budget(workers)
+    print(f"Training {len(keys)} candidates on {workers} workers ({n_jobs} threads each)")
+    columns = ["review_text", "sentiment"]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            key: pool.submit(_train_in_worker, key, train_df[columns], val_df[columns],
+                             class_names, args, n_jobs)
+            for key in keys
+        }
+        results = [futures[key].result() for key in keys]
+    for result in results:
+        record_champion(result, args)
+    return results
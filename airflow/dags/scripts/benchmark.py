@@ -0,0 +1,243 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from string import ascii_lowercase
+
+import matplotlib.pyplot as plt
+import mlflow
+import numpy as np
+import pandas as pd
+
+from lib.artifacts import (
+    benchmark_model, confusion_scores, diagnostic_projection, plot_confusion_matrix, plot_decision_boundary
+)
+from lib.dataset import training_split
+from lib.drift import sparse_drift
+from lib.model import build_classifiers, log_model_info, pipeline_on_features, split_features
+from lib.training import MODEL_NAMES
+
+LABELS = ["Positive", "Negative", "Neutral"]
+LABEL_SHARES = [0.5, 0.3, 0.2]
+SENTIMENT_WORDS = {
+    "Positive": ["great", "love", "excellent", "amazing", "smooth", "perfect"],
+    "Negative": ["terrible", "hate", "broken", "awful", "laggy", "refund"],
+    "Neutral": ["okay", "average", "decent", "fine", "normal", "acceptable"],
+}
+# Share of reviews whose sentiment word matches their label; the rest get a random one
+LABEL_SIGNAL = 0.8
+
+
+# -----------------------
+# CLI
+# -----------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Time every training stage on synthetic review corpora of growing size")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                   help="Corpus sizes (rows) to benchmark, e.g. 10000 100000 1000000 10000000")
+    p.add_argument("--max_features", type=int, nargs="+", default=[100, 1000, 10000],
+                   help="TF-IDF vocabulary sizes to benchmark at every corpus size")
+    p.add_argument("--models", nargs="+", default=list(build_classifiers()), choices=list(build_classifiers()))
+    p.add_argument("--vocab_size", type=int, default=20000, help="Distinct synthetic tokens (Zipf-distributed)")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--work_dir", default=None, help="Where corpora, caches and the MLflow file store go (default: temp dir)")
+    p.add_argument("--output", default="benchmark_results.json")
+    p.add_argument("--baseline", default=None, help="Earlier results JSON to compare stage timings against")
+    return p.parse_args()
+
+
+# -----------------------
+# Synthetic corpus
+# -----------------------
+def synthetic_vocabulary(vocab_size):
+    # alphabetic so clean_texts keeps them; the "x" prefix keeps them clear of NLTK stopwords
+    return np.array(["x" + "".join(t) for t in itertools.islice(itertools.product(ascii_lowercase, repeat=4), vocab_size)])
+
+
+def synthetic_reviews(n_rows, vocab, rng):
+    """
+    Review-like rows: 5-40 Zipf-distributed tokens plus one sentiment word that
+    matches the label for LABEL_SIGNAL of the rows, so the models have signal
+    and TF-IDF sees a realistic long tail.
+    """
+    ranks = np.arange(1, len(vocab) + 1)
+    p = 1.0 / ranks ** 1.1
+    p /= p.sum()
+    lengths = rng.integers(5, 41, n_rows)
+    tokens = vocab[rng.choice(len(vocab), lengths.sum(), p=p)]
+    ends = np.cumsum(lengths)
+
+    labels = rng.choice(LABELS, n_rows, p=LABEL_SHARES)
+    word_labels = np.where(rng.random(n_rows) < LABEL_SIGNAL, labels, rng.choice(LABELS, n_rows))
+    word_picks = rng.integers(0, len(SENTIMENT_WORDS["Positive"]), n_rows)
+    texts = [
+        " ".join(tokens[end - length:end]) + " " + SENTIMENT_WORDS[word_label][pick]
+        for end, length, word_label, pick in zip(ends, lengths, word_labels, word_picks)
+    ]
+    return pd.DataFrame({"review_text": texts, "sentiment": labels})
+
+
+def write_synthetic_csv(path, n_rows, vocab_size, seed, chunk_rows=500_000):
+    """Write the corpus in chunks so generating 10M rows stays within bounded memory."""
+    rng = np.random.default_rng(seed)
+    vocab = synthetic_vocabulary(vocab_size)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    for start in range(0, n_rows, chunk_rows):
+        chunk = synthetic_reviews(min(chunk_rows, n_rows - start), vocab, rng)
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+
+# -----------------------
+# Measurement
+# -----------------------
+def peak_rss_mb():
+    """Process high-water mark of resident memory (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+@contextmanager
+def stage(records, rows, name, max_features=None, model=None):
+    """
+    Time one stage and append its record. Each corpus size runs in a fresh
+    process, so peak_rss_mb is comparable across runs and peak_rss_growth_mb
+    shows which stage raised the high-water mark.
+    """
+    before = peak_rss_mb()
+    record = {"rows": rows, "stage": name, "max_features": max_features, "model": model}
+    start = time.perf_counter()
+    yield record
+    record["seconds"] = time.perf_counter() - start
+    record["peak_rss_mb"] = peak_rss_mb()
+    record["peak_rss_growth_mb"] = record["peak_rss_mb"] - before
+    records.append(record)
+    print(f"[{rows} rows] {name:<17} max_features={max_features} model={model} "
+          f"{record['seconds']:.2f}s peak_rss={record['peak_rss_mb']:.0f}MB")
+
+
+# -----------------------
+# Benchmark
+# -----------------------
+def run_size(n_rows, args):
+    """Every stage of the training pipeline on one synthetic corpus; returns the stage records."""
+    records = []
+    work = Path(args.work_dir) / f"rows_{n_rows}"
+    csv_path = work / "reviews.csv"
+
+    with stage(records, n_rows, "generate"):
+        write_synthetic_csv(csv_path, n_rows, args.vocab_size, args.seed)
+    with stage(records, n_rows, "preprocess"):
+        train_df, val_df, class_names = training_split(csv_path, 0.2, args.seed, cache_dir=work / "dataset")
+    y_train, y_val = train_df["sentiment"].to_numpy(), val_df["sentiment"].to_numpy()
+
+    mlflow.set_tracking_uri((work / "mlruns").resolve().as_uri())
+    mlflow.set_experiment("benchmark")
+    log_args = Namespace(test_size=0.2, random_state=args.seed)
+
+    for max_features in args.max_features:
+        with stage(records, n_rows, "vectorize", max_features):
+            features = split_features(train_df["review_text"], val_df["review_text"], max_features,
+                                      cache_dir=work / "features")
+        with stage(records, n_rows, "drift", max_features):
+            sparse_drift(features["X_train"], features["X_val"], features["vectorizer"].get_feature_names_out(),
+                         y_ref=y_train, y_cur=y_val)
+
+        for model_key in args.models:
+            pipe = pipeline_on_features(model_key, features)
+            clf = pipe.named_steps["clf"]
+            with stage(records, n_rows, "fit", max_features, model_key) as record:
+                clf.fit(features["X_train"], y_train)
+                y_pred = clf.predict(features["X_val"])
+            scores = confusion_scores(y_val, y_pred, labels=clf.classes_)
+            metrics = scores["metrics"]
+            record["macro_f1"] = metrics["macro_f1"]
+
+            # the 2D projection is cached per feature set, so the first model pays for it
+            with stage(records, n_rows, "plots", max_features, model_key):
+                fig_cm = plot_confusion_matrix(y_val, y_pred, scores["labels"], cm=scores["cm"])
+                projection = diagnostic_projection(features["vectorizer"], train_df["review_text"], y_train,
+                                                   val_df["review_text"], y_val, features=features)
+                try:
+                    fig_db = plot_decision_boundary(clf, projection["X_2d"], projection["y"],
+                                                    {c: str(c) for c in clf.classes_}, title=model_key)
+                except ValueError as e:
+                    # as in evaluate_model: MultinomialNB cannot fit the standardized (signed) projection
+                    print(f"[warn] decision boundary plot failed: {e}")
+                    fig_db = None
+            with stage(records, n_rows, "serving_benchmark", max_features, model_key):
+                metrics |= benchmark_model(pipe, val_df["review_text"])
+
+            model_name = MODEL_NAMES.get(model_key, model_key)
+            with stage(records, n_rows, "mlflow_logging", max_features, model_key):
+                with mlflow.start_run(run_name=f"{model_name}-{n_rows}-{max_features}"):
+                    mlflow.log_metrics(metrics)
+                    mlflow.log_figure(fig_cm, f"{model_name}__confusion_matrix.png")
+                    if fig_db is not None:
+                        mlflow.log_figure(fig_db, f"{model_name}__decision_boundary.png")
+                    log_model_info(model_name=model_name, model_key=model_key, pipe=pipe, run_name=model_name,
+                                   registered_name="benchmark", class_names=class_names, metrics=metrics,
+                                   args=log_args)
+            plt.close("all")
+    return records
+
+
+def compare(records, baseline_path):
+    """Stage timings next to an earlier results file (ratio > 1 means slower now)."""
+    keys = ["rows", "stage", "max_features", "model"]
+    baseline = pd.DataFrame(json.loads(Path(baseline_path).read_text())["records"])
+    current = pd.DataFrame(records)
+    merged = current[keys + ["seconds"]].merge(baseline[keys + ["seconds"]], on=keys, how="left",
+                                               suffixes=("", "_baseline"))
+    merged["ratio"] = merged["seconds"] / merged["seconds_baseline"]
+    return merged
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as td:
+        args.work_dir = args.work_dir or td
+        records = []
+        # one fresh process per corpus size so peak memory is not inherited from the previous size
+        ctx = multiprocessing.get_context("spawn")
+        for n_rows in args.sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                records.extend(pool.submit(run_size, n_rows, args).result())
+
+    results = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sizes": args.sizes,
+            "max_features": args.max_features,
+            "models": args.models,
+            "vocab_size": args.vocab_size,
+            "seed": args.seed,
+        },
+        "records": records,
+    }
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"Wrote {len(records)} stage timings to {args.output}")
+
+    # corpus-level stages (generate, preprocess) have no max_features
+    summary = pd.DataFrame(records).fillna({"max_features": 0}).pivot_table(index=["rows", "max_features"], columns="stage",
+                                                values="seconds", aggfunc="sum", dropna=False)
+    print(summary.round(2).to_string())
+    if args.baseline:
+        print(compare(records, args.baseline).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
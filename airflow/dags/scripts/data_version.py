@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from lib.dataset import TRAINED_DATA_TAG, file_sha256
+
+# BashOperator marks the task as skipped on this exit code, and all_success downstream tasks skip with it
+SKIP_EXIT_CODE = 99
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Skip the rest of the DAG when the fetched CSV was already trained on")
+    p.add_argument("--data_path", required=True, help="Fetched CSV to version")
+    p.add_argument("--experiment_name", default="Sentiment CLS")
+    p.add_argument("--tracking_uri", default=os.getenv("MLFLOW_TRACKING_URI"))
+    p.add_argument("--force", action="store_true", help="Always continue, even when the data is unchanged")
+    return p.parse_args()
+
+
+def last_trained_version(client: MlflowClient, experiment_name: str):
+    """
+    Data hash of the last training task (train_model.py) that completed every
+    candidate and the promotion, or None. Single runs (a failed task's first
+    candidates, tune.py) do not count.
+    """
+    experiment = client.get_experiment_by_name(experiment_name)
+    if not experiment:
+        return None
+    return experiment.tags.get(TRAINED_DATA_TAG)
+
+
+def main():
+    args = parse_args()
+    if args.tracking_uri:
+        mlflow.set_tracking_uri(args.tracking_uri)
+
+    current = file_sha256(args.data_path)
+    print(f"{args.data_path}: sha256={current}")
+    if args.force:
+        print("--force given; continuing.")
+        return
+
+    try:
+        previous = last_trained_version(MlflowClient(), args.experiment_name)
+    except Exception as e:
+        print(f"[warn] could not read the last data version: {e}. Continuing.")
+        return
+
+    if previous == current:
+        print("Data unchanged since the last complete training task; skipping downstream training tasks.")
+        sys.exit(SKIP_EXIT_CODE)
+    print(f"Data changed (last trained on {previous or 'nothing'}); continuing.")
+
+
+if __name__ == "__main__":
+    main()
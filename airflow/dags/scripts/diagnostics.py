@@ -0,0 +1,67 @@
+import argparse
+import hashlib
+import os
+
+import mlflow
+import mlflow.sklearn as mlflow_sklearn
+from mlflow.tracking import MlflowClient
+
+from train_model import prepare_dataset
+from lib.artifacts import DIAGNOSTIC_MAX_ROWS, diagnostic_projection, log_decision_boundary
+from lib.training import MODEL_NAMES
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Log decision boundary plots for runs trained with --diagnostics defer")
+    p.add_argument("--data_path", required=False, default="/opt/airflow/data/mobile-reviews.csv")
+    p.add_argument("--experiment_name", default="Sentiment CLS")
+    p.add_argument("--tracking_uri", default=os.getenv("MLFLOW_TRACKING_URI"))
+    p.add_argument("--test_size", type=float, default=0.2)
+    p.add_argument("--random_state", type=int, default=42)
+    p.add_argument("--max_rows", type=int, default=DIAGNOSTIC_MAX_ROWS, help="Row cap of the stratified plot sample")
+    return p.parse_args()
+
+
+def vocabulary_key(tfidf):
+    # candidates sharing a vectorizer share one projection
+    return hashlib.sha256("\n".join(tfidf.get_feature_names_out()).encode("utf-8")).hexdigest()[:16]
+
+
+def main():
+    args = parse_args()
+    if args.tracking_uri:
+        mlflow.set_tracking_uri(args.tracking_uri)
+    client = MlflowClient()
+
+    experiment = client.get_experiment_by_name(args.experiment_name)
+    if not experiment:
+        print(f"Experiment '{args.experiment_name}' not found.")
+        return
+    runs = client.search_runs(experiment_ids=[experiment.experiment_id],
+                              filter_string="tags.diagnostics = 'defer'", max_results=1000)
+    if not runs:
+        print("No runs with deferred diagnostics.")
+        return
+
+    # same split as the training task (prepare_dataset is deterministic for a given random_state)
+    train_df, val_df, _ = prepare_dataset(args)
+    model_keys = {name: key for key, name in MODEL_NAMES.items()}
+    for run in runs:
+        run_id, model_name = run.info.run_id, run.info.run_name
+        model_key = model_keys.get(model_name, model_name)
+        try:
+            pipe = mlflow_sklearn.load_model(f"runs:/{run_id}/{model_key}_model")
+            tfidf, clf = pipe.named_steps["tfidf"], pipe.named_steps["clf"]
+            projection = diagnostic_projection(tfidf, train_df["review_text"], train_df["sentiment"],
+                                               val_df["review_text"], val_df["sentiment"],
+                                               key=vocabulary_key(tfidf), max_rows=args.max_rows)
+            with mlflow.start_run(run_id=run_id):
+                log_decision_boundary(clf, model_name, projection, list(clf.classes_))
+                mlflow.set_tag("diagnostics", "done")
+            print(f"[{model_name}] run_id={run_id} diagnostics logged")
+        except Exception as e:
+            print(f"[warn] diagnostics failed for run {run_id}: {e}")
+
+
+if __name__ == "__main__":
+    main()
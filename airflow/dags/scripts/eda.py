@@ -1,15 +1,19 @@
 import json
-from typing import Dict, Any, Optional
+import re
+from collections import Counter
+from typing import Dict, Any, Iterable, Iterator, Optional
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
-from wordcloud import WordCloud
+from wordcloud import WordCloud, STOPWORDS as WC_STOPWORDS
 
 import argparse
 import mlflow
 
+from lib.dataset import CLEAN_COLUMN, LABEL_ID_COLUMN, load_dataset
+
 
 def _clean_text(text: str) -> str:
     """Lower and do minimal cleaning for the wordcloud.
@@ -33,9 +37,8 @@ def _clean_text(text: str) -> str:
     return " ".join(text.split())
 
 
-def plot_sentiment_per_brand(df: pd.DataFrame, brand_col: str, sentiment_col: str):
+def plot_sentiment_per_brand(cross: pd.DataFrame, sentiment_col: str):
     """Return a matplotlib Figure: stacked bar of sentiment counts per brand."""
-    cross = pd.crosstab(df[brand_col], df[sentiment_col], margins=False)
     fig, ax = plt.subplots(figsize=(8, max(4, 0.5 * len(cross))))
     cross.plot(kind="bar", stacked=True, ax=ax)
     ax.set_title("Sentiment counts per brand")
@@ -45,9 +48,8 @@ def plot_sentiment_per_brand(df: pd.DataFrame, brand_col: str, sentiment_col: st
     return fig, cross
 
 
-def plot_class_distribution(df: pd.DataFrame, sentiment_col: str):
+def plot_class_distribution(class_counts: pd.Series, sentiment_col: str):
     """Return a matplotlib Figure: bar plot of sentiment class distribution."""
-    class_counts = df[sentiment_col].value_counts().sort_index()
     fig, ax = plt.subplots(figsize=(6, 4))
     sns.barplot(x=class_counts.index.astype(str), y=class_counts.values, ax=ax, 
                 hue=class_counts.index.astype(str), legend=False)
@@ -58,13 +60,35 @@ def plot_class_distribution(df: pd.DataFrame, sentiment_col: str):
     return fig, class_counts
 
 
-def plot_wordcloud(df: pd.DataFrame, text_col: str, max_words: int = 200):
-    """Return a matplotlib Figure with a generated wordcloud (or (None, None) if empty)."""
-    texts = df[text_col].astype(str).map(_clean_text)
-    full_text = " ".join(texts.values.tolist())
-    if not full_text.strip():
+_WORD_RE = re.compile(r"\w[\w']*")
+
+
+def word_frequencies(texts: pd.Series) -> Counter:
+    """Word counts for the wordcloud; additive across chunks so streaming matches the in-memory run."""
+    counts = Counter()
+    for text in texts.astype(str).map(_clean_text):
+        counts.update(w for w in _WORD_RE.findall(text) if w not in WC_STOPWORDS and not w.isdigit())
+    return counts
+
+
+def wordcloud_text(texts: pd.Series) -> str:
+    """Cleaned, space-joined texts for WordCloud's own tokenization."""
+    return " ".join(texts.astype(str).map(_clean_text).values.tolist())
+
+
+def plot_wordcloud(text: Optional[str] = None, freqs: Optional[Dict[str, int]] = None, max_words: int = 200):
+    """Return a matplotlib Figure with a generated wordcloud (or (None, None) if empty).
+
+    Pass the full `text` (in-memory run) or additive word `freqs` (chunked run, which
+    skips WordCloud's bigrams and plural folding so the cloud can differ slightly).
+    """
+    wc = WordCloud(width=1200, height=600, max_words=max_words, background_color="white")
+    if text is not None and text.strip():
+        wc = wc.generate(text)
+    elif text is None and freqs:
+        wc = wc.generate_from_frequencies(freqs)
+    else:
         return None, None
-    wc = WordCloud(width=1200, height=600, max_words=max_words, background_color="white").generate(full_text)
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.imshow(wc, interpolation="bilinear")
     ax.axis("off")
@@ -90,6 +114,94 @@ def _make_serializable(x):
         return str(x)
 
 
+class _HashCounter:
+    """Exact counts of 64-bit row hashes in sorted numpy arrays (16 bytes per distinct value)."""
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def get(self, hashes: np.ndarray) -> np.ndarray:
+        if self.keys.size == 0:
+            return np.zeros(hashes.size, dtype=np.int64)
+        idx = np.minimum(np.searchsorted(self.keys, hashes), self.keys.size - 1)
+        return np.where(self.keys[idx] == hashes, self.counts[idx], 0)
+
+    def update(self, hashes: np.ndarray):
+        new_keys, new_counts = np.unique(hashes, return_counts=True)
+        idx = np.searchsorted(self.keys, new_keys)
+        found = idx < self.keys.size
+        found[found] = self.keys[idx[found]] == new_keys[found]
+        np.add.at(self.counts, idx[found], new_counts[found])
+        self.keys = np.insert(self.keys, idx[~found], new_keys[~found])
+        self.counts = np.insert(self.counts, idx[~found], new_counts[~found].astype(np.int64))
+
+
+class EdaAccumulator:
+    """Additive EDA summaries so a dataset can be processed one chunk at a time."""
+
+    def __init__(self, text_col: str, sentiment_col: str, brand_col: str, n_examples: int = 5,
+                 keep_text: bool = False):
+        self.text_col = text_col
+        self.sentiment_col = sentiment_col
+        self.brand_col = brand_col
+        self.n_examples = n_examples
+        self.total = 0
+        self.text_hashes = _HashCounter()
+        self.examples: Dict[str, int] = {}  # text -> hash, exact top-n repeated texts
+        self.cross: Optional[pd.DataFrame] = None
+        self.class_counts = pd.Series(dtype="int64")
+        self.word_counts = Counter()
+        self.keep_text = keep_text
+        self.texts = []
+
+    def update(self, df: pd.DataFrame):
+        if self.text_col not in df.columns:
+            raise ValueError(f"Text column '{self.text_col}' not found in dataframe")
+        if self.sentiment_col not in df.columns:
+            raise ValueError(f"Sentiment column '{self.sentiment_col}' not found in dataframe")
+
+        self.total += len(df)
+        hashes = pd.util.hash_pandas_object(df[self.text_col], index=False).to_numpy(dtype=np.uint64)
+        self.text_hashes.update(hashes)
+        texts = df[self.text_col].notna().to_numpy()
+        candidates = dict(self.examples)
+        candidates.update(zip(df[self.text_col][texts].tolist(), hashes[texts].tolist()))
+        counts = self.text_hashes.get(np.array(list(candidates.values()), dtype=np.uint64))
+        ranked = sorted((c, t) for t, c in zip(candidates, counts.tolist()) if c > 1)[::-1][:self.n_examples]
+        self.examples = {t: candidates[t] for _, t in ranked}
+
+        cross = pd.crosstab(df[self.brand_col], df[self.sentiment_col], margins=False)
+        self.cross = cross if self.cross is None else self.cross.add(cross, fill_value=0)
+        self.class_counts = self.class_counts.add(df[self.sentiment_col].value_counts(), fill_value=0)
+        if self.keep_text:
+            self.texts.append(wordcloud_text(df[self.text_col]))
+        else:
+            self.word_counts.update(word_frequencies(df[self.text_col]))
+
+    def wordcloud(self, max_words: int):
+        if self.keep_text:
+            return plot_wordcloud(text=" ".join(self.texts), max_words=max_words)
+        return plot_wordcloud(freqs=self.word_counts, max_words=max_words)
+
+    def duplicates(self) -> Dict[str, Any]:
+        counts = self.text_hashes.counts
+        example_counts = self.text_hashes.get(np.array(list(self.examples.values()), dtype=np.uint64))
+        examples = sorted(zip(self.examples, example_counts.tolist()), key=lambda x: -x[1])
+        return {
+            "total_rows": self.total,
+            "duplicate_rows": int(counts[counts > 1].sum()),
+            "examples": {t: int(c) for t, c in examples},
+        }
+
+    def crosstab(self) -> pd.DataFrame:
+        cross = self.cross if self.cross is not None else pd.DataFrame()
+        return cross.fillna(0).astype("int64").sort_index().sort_index(axis=1)
+
+    def class_distribution(self) -> pd.Series:
+        return self.class_counts.astype("int64").sort_index()
+
+
 def eda(
     df: pd.DataFrame,
     text_col: str = "review_text",
@@ -105,34 +217,48 @@ def eda(
     to MLflow (when `log_to_mlflow=True`) using `mlflow.log_figure` and
     `mlflow.log_dict`.
     """
-    results: Dict[str, Any] = {}
+    return eda_chunked([df], text_col=text_col, sentiment_col=sentiment_col, brand_col=brand_col,
+                       max_words=max_words, log_to_mlflow=log_to_mlflow, mlflow_run_name=mlflow_run_name,
+                       keep_text=True)
+
 
-    # basic validation
-    if text_col not in df.columns:
-        raise ValueError(f"Text column '{text_col}' not found in dataframe")
-    if sentiment_col not in df.columns:
-        raise ValueError(f"Sentiment column '{sentiment_col}' not found in dataframe")
+def eda_chunked(
+    chunks: Iterable[pd.DataFrame],
+    text_col: str = "review_text",
+    sentiment_col: str = "sentiment",
+    brand_col: str = "brand",
+    max_words: int = 200,
+    log_to_mlflow: bool = True,
+    mlflow_run_name: Optional[str] = "EDA",
+    keep_text: bool = False,
+) -> Dict[str, Any]:
+    """Same as `eda`, but consumes the dataset as an iterable of DataFrame chunks in bounded memory.
+
+    keep_text builds the wordcloud from the full text like `eda` does, at the cost of holding it.
+    """
+    acc = EdaAccumulator(text_col, sentiment_col, brand_col, keep_text=keep_text)
+    for chunk in chunks:
+        acc.update(chunk)
+
+    results: Dict[str, Any] = {}
 
     # 1) duplications
-    total = len(df)
-    dup_mask = df.duplicated(subset=[text_col], keep=False)
-    dup_count = int(dup_mask.sum())
-    dup_examples = df.loc[dup_mask, text_col].value_counts().head(5).to_dict()
-    results["duplicates"] = {"total_rows": total, "duplicate_rows": dup_count, "examples": dup_examples}
+    results["duplicates"] = acc.duplicates()
 
     # 2) sentiment per brand
-    fig_brand, cross = plot_sentiment_per_brand(df, brand_col, sentiment_col)
+    cross = acc.crosstab()
+    fig_brand, cross = plot_sentiment_per_brand(cross, sentiment_col)
     results["sentiment_per_brand"] = {
         "counts": _make_serializable(cross),
         "percent": _make_serializable(cross.div(cross.sum(axis=1), axis=0).fillna(0)),
     }
 
     # 3) class distribution
-    fig_class, class_counts = plot_class_distribution(df, sentiment_col)
+    fig_class, class_counts = plot_class_distribution(acc.class_distribution(), sentiment_col)
     results["class_distribution"] = _make_serializable(class_counts)
 
     # 4) wordcloud
-    fig_wc, wc_obj = plot_wordcloud(df, text_col, max_words=max_words)
+    fig_wc, wc_obj = acc.wordcloud(max_words)
     results["wordcloud"] = None if fig_wc is None else "wordcloud_generated"
 
     # Log to MLflow (no local saving)
@@ -172,17 +298,38 @@ def eda(
     return results
 
 
+def iter_clean_chunks(data_path: str, chunksize: int, text_col: str = "review_text",
+                      sentiment_col: str = "sentiment") -> Iterator[pd.DataFrame]:
+    """Stream the CSV with the same cleaning as the in-memory path (dropna + global review dedup)."""
+    seen = _HashCounter()
+    with pd.read_csv(data_path, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = chunk.dropna(subset=[text_col, sentiment_col])
+            chunk = chunk.drop_duplicates(subset=[text_col])
+            hashes = pd.util.hash_pandas_object(chunk[text_col], index=False).to_numpy(dtype=np.uint64)
+            fresh = seen.get(hashes) == 0
+            seen.update(hashes[fresh])
+            yield chunk[fresh].reset_index(drop=True)
+
+
 def _cli():
     p = argparse.ArgumentParser(description="Run EDA and log artifacts to MLflow.")
     p.add_argument("--data_path", required=True, help="Path to CSV file with review_text and sentiment columns")
     p.add_argument("--mlflow_run_name", default="EDA", required=False, help="Optional MLflow run name for EDA")
     p.add_argument("--experiment_name", default="Sentiment CLS", help="MLflow experiment name")
+    p.add_argument("--chunksize", type=int, default=0,
+                   help="Stream the CSV in chunks of this many rows (bounded memory); 0 loads it at once")
     args = p.parse_args()
 
     mlflow.set_experiment(args.experiment_name)
-    df = pd.read_csv(args.data_path).dropna(subset=["review_text", "sentiment"])
-    df = df.drop_duplicates(subset=["review_text"]).reset_index(drop=True)
-    res = eda(df, log_to_mlflow=True, mlflow_run_name=args.mlflow_run_name)
+    if args.chunksize > 0:
+        res = eda_chunked(iter_clean_chunks(args.data_path, args.chunksize),
+                          log_to_mlflow=True, mlflow_run_name=args.mlflow_run_name)
+    else:
+        # same rows (dropna + review dedup) as training, from the preprocessed dataset cache
+        df, _ = load_dataset(args.data_path)
+        df = df.drop(columns=[CLEAN_COLUMN, LABEL_ID_COLUMN])
+        res = eda(df, log_to_mlflow=True, mlflow_run_name=args.mlflow_run_name)
     print("EDA finished. MLflow run info:", res.get("mlflow"))
 
 
@@ -0,0 +1,234 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import mlflow
+import mlflow.sklearn as mlflow_sklearn
+import numpy as np
+import pandas as pd
+from mlflow.tracking import MlflowClient
+
+from train_model import encode_labeled, prepare_dataset
+from lib.model import (
+    BENCHMARK_TAG, INCREMENTAL_N_FEATURES, MAX_LATENCY_P99_MS, MAX_MODEL_SIZE_MB, build_incremental_pipelines,
+    log_model_info, partial_fit_pipeline, update_champion,
+)
+from lib.artifacts import benchmark_model, classification_metrics
+from lib.storage import MANIFEST_LAG_SECONDS, files_since, gcs_bucket, parse_timestamp, timestamp
+from lib.training import MODEL_NAMES
+
+
+# -----------------------
+# CLI
+# -----------------------
+def parse_args():
+    p = argparse.ArgumentParser(description="Update the incremental sentiment model with new labeled batches")
+    p.add_argument("--data_path", required=False, default="/opt/airflow/data/mobile-reviews.csv",
+                   help="Full CSV used once to bootstrap the model when no incremental version exists")
+    p.add_argument("--batch_path", nargs="*", default=[],
+                   help="Local labeled batch CSVs (review_text, sentiment); ones older than the model's high-water mark are skipped")
+    p.add_argument("--gcs_prefix", default=None,
+                   help="Also read unseen batches under this prefix (via the backend manifest), e.g. data_label/labeled_")
+    p.add_argument("--model_key", choices=["sgd", "inb"], default="sgd")
+    p.add_argument("--experiment_name", default="Sentiment CLS")
+    p.add_argument("--registered_model_name", default="sentiment")
+    p.add_argument("--tracking_uri", default=os.getenv("MLFLOW_TRACKING_URI"))
+    p.add_argument("--test_size", type=float, default=0.2)
+    p.add_argument("--random_state", type=int, default=42)
+    p.add_argument("--n_features", type=int, default=INCREMENTAL_N_FEATURES)
+    p.add_argument("--chunksize", type=int, default=50000, help="Rows per partial_fit call when bootstrapping")
+    p.add_argument("--max_latency_ms", type=float, default=MAX_LATENCY_P99_MS,
+                   help="Serving budget: p99 single-text latency a promoted model may have (0 = no limit)")
+    p.add_argument("--max_size_mb", type=float, default=MAX_MODEL_SIZE_MB,
+                   help="Serving budget: pickled size a promoted model may have (0 = no limit)")
+    return p.parse_args()
+
+
+# -----------------------
+# Model state
+# -----------------------
+def state_artifact(model_key):
+    return f"{model_key}__incremental_state.json"
+
+
+def lineage_alias(model_key):
+    """Registered-model alias that always points at the newest incremental version for model_key."""
+    return f"incremental_{model_key}"
+
+
+def latest_incremental_version(client, registered_name, model_key):
+    """Newest registered version trained by this script for model_key, or None."""
+    try:
+        return client.get_model_version_by_alias(registered_name, lineage_alias(model_key))
+    except Exception:
+        return None
+
+
+def load_incremental_model(client, mv, model_key):
+    pipe = mlflow_sklearn.load_model(f"models:/{mv.name}/{mv.version}")
+    with tempfile.TemporaryDirectory() as td:
+        local = client.download_artifacts(mv.run_id, f"model/{state_artifact(model_key)}", td)
+        state = json.loads(Path(local).read_text(encoding="utf-8"))
+    return pipe, state
+
+
+# -----------------------
+# Batches
+# -----------------------
+def _local_entry(path):
+    return {"name": path, "time_created": timestamp(datetime.fromtimestamp(os.path.getmtime(path), timezone.utc))}
+
+
+def iter_new_batches(args, state):
+    """
+    (entry, DataFrame) for every batch created since the model's high-water mark, oldest
+    first. Batches inside the lag window are offered again, so `recent` filters the folded ones.
+    """
+    since = None
+    if state["folded_through"]:
+        since = parse_timestamp(state["folded_through"]) - timedelta(seconds=MANIFEST_LAG_SECONDS)
+    lo = timestamp(since) if since else ""
+    bucket = gcs_bucket() if args.gcs_prefix else None
+    entries = [_local_entry(path) for path in args.batch_path]
+    if bucket is not None:
+        entries += files_since(bucket, args.gcs_prefix, since)
+    for entry in sorted(entries, key=lambda e: (e["time_created"], e["name"])):
+        if entry["name"] in state["recent"] or entry["time_created"] < lo:
+            continue
+        if entry["name"] in args.batch_path:
+            yield entry, pd.read_csv(entry["name"])
+        else:
+            yield entry, pd.read_csv(io.BytesIO(bucket.blob(entry["name"]).download_as_bytes()))
+
+
+def mark_folded(state, entry):
+    """Advance the high-water mark; only names still inside the lag window are kept."""
+    state["folded_through"] = max(state["folded_through"] or "", entry["time_created"])
+    cutoff = timestamp(parse_timestamp(state["folded_through"]) - timedelta(seconds=MANIFEST_LAG_SECONDS))
+    state["recent"] = {n: t for n, t in (state["recent"] | {entry["name"]: entry["time_created"]}).items()
+                       if t >= cutoff}
+
+
+# -----------------------
+# Main
+# -----------------------
+def bootstrap(args, train_df, class_names):
+    """First incremental model: partial_fit over the train split in chunks."""
+    pipe = build_incremental_pipelines(args.n_features)[args.model_key]
+    classes = np.arange(len(class_names))
+    for start in range(0, len(train_df), args.chunksize):
+        chunk = train_df.iloc[start:start + args.chunksize]
+        partial_fit_pipeline(pipe, chunk["review_text"], chunk["sentiment"], classes)
+    state = {"classes": class_names, "folded_through": None, "recent": {}, "rows_seen": int(len(train_df))}
+    return pipe, state, {"batch_rows": len(train_df)}
+
+
+def update(pipe, state, batches):
+    """
+    Fold new batches into the model in O(batch). Each batch is scored before the
+    model learns from it (prequential evaluation); those metrics are logged with a
+    prequential_ prefix and never ranked against the holdout macro_f1.
+    """
+    classes = np.arange(len(state["classes"]))
+    y_true, y_pred, rows = [], [], 0
+    for entry, df in batches:
+        texts, y = encode_labeled(df, state["classes"])
+        if len(y):
+            y_true.append(y)
+            y_pred.append(pipe.predict(texts))
+            partial_fit_pipeline(pipe, texts, y, classes)
+            rows += len(y)
+        mark_folded(state, entry)
+        print(f"Folded {entry['name']}: {len(y)} rows")
+    state["rows_seen"] += rows
+    if not rows:
+        return None
+    metrics = classification_metrics(np.concatenate(y_true), np.concatenate(y_pred))
+    return {f"prequential_{k}": v for k, v in metrics.items()} | {"batch_rows": rows}
+
+
+def holdout_metrics(pipe, val_df):
+    """
+    Scores on the shared validation split plus the serving benchmark, the same
+    numbers full candidates are ranked and gated on (see lib.artifacts.evaluate_model).
+    """
+    metrics = classification_metrics(val_df["sentiment"], pipe.predict(val_df["review_text"]))
+    try:
+        metrics |= benchmark_model(pipe, val_df["review_text"])
+        benchmark = "ok"
+    except Exception as e:
+        print(f"[warn] serving benchmark failed: {e}")
+        benchmark = "failed"
+    return metrics, benchmark
+
+
+def main():
+    args = parse_args()
+    if args.tracking_uri:
+        mlflow.set_tracking_uri(args.tracking_uri)
+    else:
+        print("[warn] No tracking URI supplied; defaulting to local ./mlruns store.")
+    mlflow.set_experiment(args.experiment_name)
+    client = MlflowClient()
+
+    train_df, val_df, class_names = prepare_dataset(args)
+    parent = latest_incremental_version(client, args.registered_model_name, args.model_key)
+    if parent is None:
+        print("No incremental model registered yet; bootstrapping from the full dataset.")
+        pipe, state, metrics = bootstrap(args, train_df, class_names)
+        # batches given on the first run are folded in too
+        update(pipe, state, iter_new_batches(args, state))
+    else:
+        pipe, state = load_incremental_model(client, parent, args.model_key)
+        metrics = update(pipe, state, iter_new_batches(args, state))
+        if metrics is None:
+            print(f"No new labeled rows for {parent.name} v{parent.version}; nothing to do.")
+            return
+
+    # holdout scores only mean the same as the full candidates' when the label encoding matches
+    comparable = list(state["classes"]) == list(class_names)
+    if comparable:
+        holdout, benchmark = holdout_metrics(pipe, val_df)
+        metrics = holdout | metrics
+    else:
+        print(f"[warn] model classes {state['classes']} differ from {args.data_path} ({class_names}); "
+              "not scored on the shared split and not offered for promotion")
+
+    model_name = MODEL_NAMES[args.model_key]
+    with mlflow.start_run(run_name=model_name) as run:
+        mlflow.set_tags({"incremental_key": args.model_key,
+                         "parent_version": parent.version if parent else "none",
+                         "evaluation": "holdout" if comparable else "prequential"})
+        if comparable:
+            mlflow.set_tag(BENCHMARK_TAG, benchmark)
+        mlflow.log_metrics(metrics | {"rows_seen": state["rows_seen"]})
+        with tempfile.TemporaryDirectory() as td:
+            p = Path(td) / state_artifact(args.model_key)
+            p.write_text(json.dumps(state, indent=2, ensure_ascii=False))
+            mlflow.log_artifact(p, artifact_path="model")
+        # registers a new version that the usual promotion flow (macro_f1) can pick up
+        model_info = log_model_info(
+            model_name=model_name,
+            model_key=args.model_key,
+            pipe=pipe,
+            run_name=model_name,
+            registered_name=args.registered_model_name,
+            class_names=state["classes"],
+            metrics=metrics,
+            args=args,
+        )
+    # move the lineage pointer so the next run loads this version without searching the registry
+    client.set_registered_model_alias(args.registered_model_name, lineage_alias(args.model_key),
+                                      model_info.registered_model_version)
+    if comparable:
+        update_champion(client, run.info.experiment_id, run.info.run_id, model_name, metrics,
+                        model_name=args.registered_model_name, version=model_info.registered_model_version,
+                        max_latency_ms=args.max_latency_ms, max_size_mb=args.max_size_mb)
+
+
+if __name__ == "__main__":
+    main()
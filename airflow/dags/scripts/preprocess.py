@@ -0,0 +1,25 @@
+import argparse
+
+from lib.dataset import DATASET_CACHE_DIR, cached_dataset_dir, load_dataset, split_indices
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Clean the raw CSV once into the content-addressed dataset cache")
+    p.add_argument("--data_path", required=True, help="CSV path with columns: review_text, sentiment")
+    p.add_argument("--dataset_cache_dir", default=DATASET_CACHE_DIR)
+    p.add_argument("--test_size", type=float, default=0.2)
+    p.add_argument("--random_state", type=int, default=42)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    target = cached_dataset_dir(args.data_path, args.dataset_cache_dir)
+    df, class_names = load_dataset(args.data_path, args.dataset_cache_dir)
+    train_idx, val_idx = split_indices(target, df["label_id"].to_numpy(), args.test_size, args.random_state)
+    print(f"Preprocessed dataset at {target}: {len(df)} rows, classes={class_names}, "
+          f"train={len(train_idx)} val={len(val_idx)}")
+
+
+if __name__ == "__main__":
+    main()
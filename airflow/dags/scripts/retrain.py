@@ -4,11 +4,16 @@ import json
 import requests
 
 import mlflow
+import mlflow.sklearn as mlflow_sklearn
+import numpy as np
+import pandas as pd
 from mlflow.tracking import MlflowClient
 
-from train_model import prepare_dataset
-import lib.model as model_module
-from lib.artifacts import evaluate_model
+from train_model import encode_labeled, prepare_dataset
+from lib.drift import serving_drift_summary
+from lib.model import MAX_LATENCY_P99_MS, MAX_MODEL_SIZE_MB, budget_violations, split_features
+from lib.storage import SERVING_DRIFT_BLOB, gcs_bucket, read_json_blob
+from lib.training import FULL_CLASS_WARM_START, MODEL_NAMES, train_candidate, train_candidates, warm_start_candidate
 
 
 def parse_args():
@@ -21,8 +26,28 @@ def parse_args():
     p.add_argument("--test_size", type=float, default=0.2)
     p.add_argument("--random_state", type=int, default=42)
     p.add_argument("--max_features", type=int, default=100)
+    p.add_argument("--shared_features", action=argparse.BooleanOptionalAction, default=True,
+                   help="Fit TF-IDF once per split and reuse the cached matrices for every model")
+    p.add_argument("--workers", type=int, default=0,
+                   help="Processes training candidates in parallel (0 = one per candidate, capped by CPUs)")
+    p.add_argument("--diagnostics", choices=["full", "skip", "defer"], default="full",
+                   help="Decision boundary plots: inline, never, or left to scripts/diagnostics.py")
+    p.add_argument("--max_latency_ms", type=float, default=MAX_LATENCY_P99_MS,
+                   help="Serving budget: p99 single-text latency a promoted model may have (0 = no limit)")
+    p.add_argument("--max_size_mb", type=float, default=MAX_MODEL_SIZE_MB,
+                   help="Serving budget: pickled size a promoted model may have (0 = no limit)")
+    p.add_argument("--warm_start", action="store_true",
+                   help="Continue training the current Production model on --new_data_path instead of retraining every model")
+    p.add_argument("--new_data_path", nargs="*", default=[], help="Labeled CSVs the Production model has not seen")
+    p.add_argument("--warm_estimators", type=int, default=10, help="Boosting rounds / trees added when warm-starting")
+    p.add_argument("--cold_baseline", action=argparse.BooleanOptionalAction, default=True,
+                   help="Also train the same model family from scratch to compare against the warm start")
     p.add_argument("--promote", action="store_true", help="Promote best new model to production alias if better")
     p.add_argument("--alias", default="Production", help="Alias to treat as production (case-sensitive)")
+    p.add_argument("--drift_threshold", type=float, default=float(os.getenv("DRIFT_THRESHOLD", "0.3")),
+                   help="Retrain only when the mean drift_share exceeds this")
+    p.add_argument("--drift_window_hours", type=float, default=24,
+                   help="Serving drift from /predict requests in this many hours drives the decision")
     return p.parse_args()
 
 
@@ -38,8 +63,18 @@ def find_any_production_model(client: MlflowClient, alias: str):
     return None, None
 
 
+def serving_drift(window_hours):
+    """Live drift from the /predict drift series (one small read), or None when there is none in the window."""
+    try:
+        series = read_json_blob(gcs_bucket(), SERVING_DRIFT_BLOB)
+    except Exception as e:
+        print(f"Error reading serving drift series: {e}")
+        return None
+    return serving_drift_summary(series, window_hours)
+
+
 def check_drift(client: MlflowClient, prod_mv):
-    """Check drift share from Evidently report in MLflow artifacts."""
+    """Check drift share from the training-time drift report in MLflow artifacts."""
     try:
         artifacts = client.list_artifacts(prod_mv.run_id, path="reports")
         drift_report = next((a for a in artifacts if a.path.endswith("data_drift_report.json")), None)
@@ -51,12 +86,70 @@ def check_drift(client: MlflowClient, prod_mv):
                 print(f"Drift share: {drift_share}")
                 return drift_share
         else:
-            print("No Evidently drift report found in artifacts.")
+            print("No drift report found in artifacts.")
     except Exception as e:
         print(f"Error checking drift: {e}")
     return 0
 
 
+def load_new_data(paths, class_names):
+    texts, labels = [], []
+    for path in paths:
+        X, y = encode_labeled(pd.read_csv(path), class_names)
+        texts.append(X.to_numpy())
+        labels.append(y)
+    if not texts:
+        return pd.Series([], dtype=str), np.array([], dtype=int)
+    return pd.Series(np.concatenate(texts)), np.concatenate(labels)
+
+
+def warm_start_results(client: MlflowClient, args, train_df, val_df, class_names):
+    """
+    Warm-start the Production model on the new rows and, unless --no-cold_baseline,
+    train the same family from scratch on history + new rows for comparison.
+    Returns candidate results, or None to fall back to a full cold retrain.
+    """
+    prod_name, prod_mv = find_any_production_model(client, args.alias)
+    if not prod_mv:
+        print("Warm start: no production model; falling back to a cold retrain.")
+        return None
+    run_name = client.get_run(prod_mv.run_id).info.run_name
+    model_key = {name: key for key, name in MODEL_NAMES.items()}.get(run_name)
+    if model_key not in ("xgb", "rf", "nb"):
+        print(f"Warm start: unsupported production model '{run_name}'; falling back to a cold retrain.")
+        return None
+    X_new, y_new = load_new_data(args.new_data_path, class_names)
+    if not len(y_new):
+        print("Warm start: no new labeled rows (--new_data_path); falling back to a cold retrain.")
+        return None
+    if model_key in FULL_CLASS_WARM_START and len(np.unique(y_new)) < len(class_names):
+        print(f"Warm start: new rows miss some classes, {run_name} cannot be warm-started on them; "
+              "falling back to a cold retrain.")
+        return None
+
+    pipe = mlflow_sklearn.load_model(f"models:/{prod_name}/{prod_mv.version}")
+    warm = warm_start_candidate(pipe, model_key, X_new, y_new, val_df["review_text"], val_df["sentiment"],
+                                class_names, args, extra_estimators=args.warm_estimators)
+    print(f"Warm-started {prod_name} v{prod_mv.version} ({model_key}) on {len(y_new)} new rows: "
+          f"macro_f1={warm['metrics'].get('macro_f1')} in {warm['train_seconds']:.1f}s")
+    results = [warm]
+
+    if args.cold_baseline:
+        cold_df = pd.concat([train_df[["review_text", "sentiment"]],
+                             pd.DataFrame({"review_text": X_new, "sentiment": y_new})], ignore_index=True)
+        features = None
+        if args.shared_features:
+            features = split_features(cold_df["review_text"], val_df["review_text"], args.max_features)
+        cold = train_candidate(model_key, cold_df["review_text"], cold_df["sentiment"],
+                               val_df["review_text"], val_df["sentiment"], class_names, args, features=features)
+        client.log_metric(warm["run_id"], "cold_macro_f1", cold["metrics"].get("macro_f1", 0))
+        client.log_metric(warm["run_id"], "cold_train_seconds", cold["train_seconds"])
+        print(f"Cold baseline ({model_key}) on {len(cold_df)} rows: "
+              f"macro_f1={cold['metrics'].get('macro_f1')} in {cold['train_seconds']:.1f}s")
+        results.append(cold)
+    return results
+
+
 def main():
     args = parse_args()
     if args.tracking_uri:
@@ -71,12 +164,18 @@ def main():
     try:
         prod_name, prod_mv = find_any_production_model(client, args.alias)
         if prod_mv:
-            drift_share = check_drift(client, prod_mv)
-            if drift_share <= 0.3:
-                print("Drift share <= 0.3. Ending pipeline.")
+            live = serving_drift(args.drift_window_hours)
+            if live:
+                print(f"Serving drift over the last {args.drift_window_hours}h: {live}")
+                drift_share = live["mean_drift_share"]
+            else:
+                print("No serving drift recorded in the window; falling back to the training drift report.")
+                drift_share = check_drift(client, prod_mv)
+            if drift_share <= args.drift_threshold:
+                print(f"Drift share {drift_share:.3f} <= {args.drift_threshold}. Ending pipeline.")
                 return
             else:
-                print("Drift share > 0.3. Proceeding with pipeline.")
+                print(f"Drift share {drift_share:.3f} > {args.drift_threshold}. Proceeding with pipeline.")
         else:
             print("No production model found. Proceeding with pipeline.")
     except Exception as e:
@@ -85,44 +184,30 @@ def main():
     # Prepare dataset using helper from train_model.py
     train_df, val_df, class_names = prepare_dataset(args)
 
-    pipelines = model_module.build_pipelines(args.max_features)
-    order = [k for k in pipelines.keys()]
-
     best_new_score = -1
     best_new_run_id = None
+    best_new_version = None
     best_model_key = None
 
-    # Train candidate models and log to mlflow
-    for key in order:
-        model_names = {"nb": "NaiveBayes", "rf": "RandomForest", "xgb": "XGBoost"}
-        run_name = model_names.get(key, key)
-        registered_name = f"{args.registered_model_name}"
-
-        with mlflow.start_run(run_name=run_name):
-            metrics = evaluate_model(pipelines[key], model_names.get(key, key),
-                                     train_df['review_text'], train_df['sentiment'],
-                                     X_val=val_df['review_text'], y_val=val_df['sentiment'])
-
-            # log metadata and register model
-            model_module.log_model_info(
-                model_name=model_names.get(key, key),
-                model_key=key,
-                pipe=pipelines[key],
-                run_name=run_name,
-                registered_name=registered_name,
-                class_names=class_names,
-                metrics=metrics,
-                args=args,
-            )
-
-            run_id = mlflow.active_run().info.run_id
-            score = metrics.get("macro_f1", 0)
-            print(f"Trained {key} (run_id={run_id}) macro_f1={score}")
-
-            if score > best_new_score:
-                best_new_score = score
-                best_new_run_id = run_id
-                best_model_key = key
+    # Warm-start the production model if requested, otherwise train every candidate
+    # (in parallel workers) and log to mlflow
+    results = None
+    if args.warm_start:
+        results = warm_start_results(client, args, train_df, val_df, class_names)
+    if results is None:
+        results = train_candidates(train_df, val_df, class_names, args, workers=args.workers)
+    for result in results:
+        score = result["metrics"].get("macro_f1", 0)
+        print(f"Trained {result['model_key']} (run_id={result['run_id']}) macro_f1={score}")
+        violations = budget_violations(result["metrics"], args.max_latency_ms, args.max_size_mb)
+        if violations:
+            print(f"[gate] {result['model_key']} exceeds the serving budget ({', '.join(violations)}); not eligible")
+            continue
+        if score > best_new_score:
+            best_new_score = score
+            best_new_run_id = result["run_id"]
+            best_new_version = (result["registered_name"], result["version"])
+            best_model_key = result["model_key"]
 
     summary = {
         "best_model_key": best_model_key,
@@ -149,13 +234,12 @@ def main():
                 except Exception:
                     pass
                 
-                # find version for our best run
-                versions = client.search_model_versions(f"run_id='{best_new_run_id}'")
-                if versions:
-                    new_v = versions[0]
-                    client.set_registered_model_alias(new_v.name, args.alias, new_v.version)
+                # the version our best run registered, as returned by train_candidate
+                if best_new_version:
+                    new_name, new_version = best_new_version
+                    client.set_registered_model_alias(new_name, args.alias, new_version)
                     summary["promoted"] = True
-                    summary["promotion_context"] = f"Promoted {new_v.name} v{new_v.version} over {prod_name} v{prod_mv.version}"
+                    summary["promotion_context"] = f"Promoted {new_name} v{new_version} over {prod_name} v{prod_mv.version}"
                     print("Production model promote")
                     print(summary["promotion_context"])
 
@@ -175,12 +259,11 @@ def main():
         else:
             # No production model exists; optionally promote the new best
             print("No existing production alias found.")
-            versions = client.search_model_versions(f"run_id='{best_new_run_id}'")
-            if args.promote and versions:
-                new_v = versions[0]
-                client.set_registered_model_alias(new_v.name, args.alias, new_v.version)
+            if args.promote and best_new_version:
+                new_name, new_version = best_new_version
+                client.set_registered_model_alias(new_name, args.alias, new_version)
                 summary["promoted"] = True
-                summary["promotion_context"] = f"First Production Model: {new_v.name} v{new_v.version}"
+                summary["promotion_context"] = f"First Production Model: {new_name} v{new_version}"
             else:
                 summary["promotion_context"] = "Not promoted (use --promote to enable promotion)"
 
@@ -2,16 +2,11 @@ import argparse
 import os
 
 import mlflow
-import pandas as pd
+from mlflow.tracking import MlflowClient
 
-import nltk
-nltk.download("stopwords")
-from nltk.corpus import stopwords
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
-
-from lib.model import build_pipelines, log_model_info, promote_best_model
-from lib.artifacts import evaluate_model
+from lib.dataset import DATASET_CACHE_DIR, TRAINED_DATA_TAG, clean_texts, file_sha256, training_split
+from lib.model import MAX_LATENCY_P99_MS, MAX_MODEL_SIZE_MB, promote_best_model
+from lib.training import train_candidates
 
 
 # -----------------------
@@ -26,59 +21,42 @@ def parse_args():
     p.add_argument("--test_size", type=float, default=0.2)
     p.add_argument("--random_state", type=int, default=42)
     p.add_argument("--max_features", type=int, default=100)
+    p.add_argument("--dataset_cache_dir", default=DATASET_CACHE_DIR, help="Preprocessed dataset cache (see lib.dataset)")
+    p.add_argument("--shared_features", action=argparse.BooleanOptionalAction, default=True,
+                   help="Fit TF-IDF once per split and reuse the cached matrices for every model")
+    p.add_argument("--workers", type=int, default=0,
+                   help="Processes training candidates in parallel (0 = one per candidate, capped by CPUs)")
+    p.add_argument("--diagnostics", choices=["full", "skip", "defer"], default="full",
+                   help="Decision boundary plots: inline, never, or left to scripts/diagnostics.py")
+    p.add_argument("--max_latency_ms", type=float, default=MAX_LATENCY_P99_MS,
+                   help="Serving budget: p99 single-text latency a promoted model may have (0 = no limit)")
+    p.add_argument("--max_size_mb", type=float, default=MAX_MODEL_SIZE_MB,
+                   help="Serving budget: pickled size a promoted model may have (0 = no limit)")
     return p.parse_args()
 
 # -----------------------
 # Dataset
 # -----------------------
-def clean_text(text):
-    text = text.lower()
-    eng_stopwords = set(stopwords.words("english"))
-    tokens = [word for word in text.split() if word.isalpha() and word not in eng_stopwords]
-    return " ".join(tokens)
-
 def prepare_dataset(args):
-    df = pd.read_csv(args.data_path).dropna(subset=["review_text", "sentiment"])
-    df = df.drop_duplicates(subset=["review_text"]).reset_index(drop=True)
-    df['review_text'] = df['review_text'].apply(clean_text)
-    
-    # Encode labels
-    le = LabelEncoder()
-    df["sentiment"] = le.fit_transform(df["sentiment"])
-    class_names = le.classes_.tolist()
-    
-    # split dataset
-    train_df, val_df = train_test_split(
-        df, test_size=args.test_size, stratify=df["sentiment"], random_state=args.random_state
-    )
-    return train_df, val_df, class_names
-
-
-# -----------------------
-# Logging experiment
-# -----------------------
-def train_eval_log(model_key, pipe, 
-                   X_train, y_train, X_val, y_val, 
-                   class_names, args):
-    model_names = {"nb": "NaiveBayes", "rf": "RandomForest", "xgb": "XGBoost"}
-    run_name = model_names[model_key]
-    registered_name = f"{args.registered_model_name}"
-
-    with mlflow.start_run(run_name=run_name):        
-        metrics = evaluate_model(pipe, model_names[model_key], 
-                       X_train, y_train, X_val=X_val, y_val=y_val)
-
-        # log Metadata as a single JSON
-        log_model_info(
-            model_name=model_names[model_key],
-            model_key=model_key,
-            pipe=pipe,
-            run_name=run_name,
-            registered_name=registered_name,
-            class_names=class_names,
-            metrics=metrics,
-            args=args
-        )
+    """
+    Cleaned, label-encoded train/val split, read from the preprocessed dataset cache (see lib.dataset).
+    Records the raw file hash on args so every run trained on it is tagged with the data version.
+    """
+    args.data_sha256 = file_sha256(args.data_path)
+    return training_split(args.data_path, args.test_size, args.random_state,
+                          cache_dir=getattr(args, "dataset_cache_dir", DATASET_CACHE_DIR))
+
+
+def encode_labeled(df, class_names):
+    """Clean texts and map label strings to the model's class ids; unknown labels are dropped."""
+    df = df.dropna(subset=["review_text", "sentiment"])
+    label_ids = {str(lbl): i for i, lbl in enumerate(class_names)}
+    y = df["sentiment"].astype(str).map(label_ids)
+    unknown = int(y.isna().sum())
+    if unknown:
+        print(f"[warn] dropping {unknown} rows with labels outside {class_names}")
+    df, y = df[y.notna()], y[y.notna()].astype(int)
+    return clean_texts(df["review_text"].astype(str)), y.to_numpy()
 
 
 def main():
@@ -87,25 +65,16 @@ def main():
         mlflow.set_tracking_uri(args.tracking_uri)
     else:
         print("[warn] No tracking URI supplied; defaulting to local ./mlruns store. Use --tracking_uri or set MLFLOW_TRACKING_URI to log against the MLflow server.")
-    mlflow.set_experiment(args.experiment_name)
+    experiment = mlflow.set_experiment(args.experiment_name)
 
-    # pipeline setup
+    # train and eval each model, then decide promotion once every run is logged
     train_df, val_df, class_names = prepare_dataset(args)
-    pipelines = build_pipelines(args.max_features)
-
-    # train and eval each model
-    order = ["nb", "rf"] + (["xgb"] if "xgb" in pipelines.keys() else [])
-    for key in order:
-        train_eval_log(
-            model_key=key,
-            pipe=pipelines[key],
-            X_train=train_df['review_text'], y_train=train_df['sentiment'],
-            X_val=val_df['review_text'], y_val=val_df['sentiment'],
-            class_names=class_names,
-            args=args,
-        )
+    train_candidates(train_df, val_df, class_names, args, workers=args.workers)
     print("Logged artifacts to mlflow!")
-    promote_best_model(experiment_name=args.experiment_name, alias="Production")
+    promote_best_model(experiment_name=args.experiment_name, alias="Production",
+                       max_latency_ms=args.max_latency_ms, max_size_mb=args.max_size_mb)
+    # only now is this data fully trained on; scripts/data_version.py skips the DAG on it
+    MlflowClient().set_experiment_tag(experiment.experiment_id, TRAINED_DATA_TAG, args.data_sha256)
 
 
 if __name__ == "__main__":
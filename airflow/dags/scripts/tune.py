@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+
+import mlflow
+
+from train_model import prepare_dataset
+from lib.model import promote_best_model, split_features
+from lib.search import successive_halving
+from lib.training import train_candidate
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--data_path", required=False, default="/opt/airflow/data/mobile-reviews.csv")
+    p.add_argument("--experiment_name", default="Sentiment CLS")
+    p.add_argument("--registered_model_name", default="sentiment")
+    p.add_argument("--tracking_uri", default=os.getenv("MLFLOW_TRACKING_URI"))
+    p.add_argument("--test_size", type=float, default=0.2)
+    p.add_argument("--random_state", type=int, default=42)
+    p.add_argument("--n_configs", type=int, default=12, help="Configurations sampled for the first rung")
+    p.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta configs per rung; data grows by eta")
+    p.add_argument("--min_fraction", type=float, default=0.1, help="Training-data fraction of the first rung")
+    p.add_argument("--workers", type=int, default=0,
+                   help="Processes running trials in parallel (0 = one per CPU)")
+    p.add_argument("--diagnostics", choices=["full", "skip", "defer"], default="full",
+                   help="Decision boundary plots: inline, never, or left to scripts/diagnostics.py")
+    p.add_argument("--promote", action="store_true", help="Promote the best run to Production after tuning")
+    p.add_argument("--alias", default="Production", help="Alias to treat as production (case-sensitive)")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.tracking_uri:
+        mlflow.set_tracking_uri(args.tracking_uri)
+    else:
+        print("[warn] No tracking URI supplied; defaulting to local ./mlruns store.")
+    mlflow.set_experiment(args.experiment_name)
+
+    train_df, val_df, class_names = prepare_dataset(args)
+    search = successive_halving(train_df, val_df, args, n_configs=args.n_configs, eta=args.eta,
+                                min_fraction=args.min_fraction, workers=args.workers,
+                                seed=args.random_state)
+    best = search["best"]
+    print(f"Best config: {json.dumps(best, default=str)}")
+
+    # refit the winner with full evaluation and registration, like any other candidate
+    args.max_features = best["max_features"]
+    features = split_features(train_df["review_text"], val_df["review_text"], best["max_features"])
+    result = train_candidate(best["model_key"], train_df["review_text"], train_df["sentiment"],
+                             val_df["review_text"], val_df["sentiment"], class_names, args,
+                             features=features, params=best["params"])
+    print(f"Registered tuned {best['model_key']} (run_id={result['run_id']}) "
+          f"macro_f1={result['metrics'].get('macro_f1')}")
+
+    if args.promote:
+        print(json.dumps(promote_best_model(experiment_name=args.experiment_name, alias=args.alias), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,47 @@ ALIAS = "Production"
 XGB_AVAILABLE=True
 FORCE_RETRAIN_ON_PREDICT = os.getenv("FORCE_RETRAIN_ON_PREDICT", "false").lower() == "true"
 
+# Worker processes used to rasterize EDA charts; 0 or 1 renders inline in the caller
+EDA_RENDER_WORKERS = int(os.getenv("EDA_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Chart rendering memory bounds: pooled canvases per process, RSS ceiling in MB (0 = off)
+# and charts a render worker draws before it is replaced
+EDA_FIGURE_POOL_SIZE = int(os.getenv("EDA_FIGURE_POOL_SIZE", "4"))
+EDA_RENDER_MAX_RSS_MB = int(os.getenv("EDA_RENDER_MAX_RSS_MB", "0"))
+EDA_RENDER_TASKS_PER_CHILD = int(os.getenv("EDA_RENDER_TASKS_PER_CHILD", "200"))
+# EDA chart output: "png" rasterizes on the server, "spec" writes JSON chart specs for the client to draw
+EDA_CHART_FORMAT = os.getenv("EDA_CHART_FORMAT", "png").lower()
+# Storage prefix holding EDA results keyed by dataset fingerprint, shared across replicas
+EDA_CACHE_PREFIX = "reports/eda/cache"
+EDA_MEMORY_CACHE_SIZE = int(os.getenv("EDA_MEMORY_CACHE_SIZE", "32"))
+# Mergeable EDA statistics over all labeled batches folded so far
+EDA_STATE_BLOB = "reports/eda/state/eda_state.json"
+# Preview EDA: stratified sample cap, time budget in seconds and the pilot sample used to size it
+EDA_PREVIEW_ROWS = int(os.getenv("EDA_PREVIEW_ROWS", "20000"))
+EDA_PREVIEW_SECONDS = float(os.getenv("EDA_PREVIEW_SECONDS", "5"))
+EDA_PREVIEW_PILOT_ROWS = int(os.getenv("EDA_PREVIEW_PILOT_ROWS", "1000"))
+# Duplicate EDA: repeated texts listed in the report, and MinHash/LSH near-duplicate settings
+DUPLICATE_TOP_K = int(os.getenv("DUPLICATE_TOP_K", "20"))
+# Hashes the incremental EDA state keeps duplicate counts for; 0 keeps exact counts (24 bytes per
+# distinct value), a positive cap bounds the state with an approximate SpaceSaving summary
+DUPLICATE_SKETCH_CAPACITY = int(os.getenv("DUPLICATE_SKETCH_CAPACITY", "0")) or None
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+NEAR_DUPLICATE_NUM_PERM = int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "64"))
+# Serving drift: share of drifted columns that flags a /predict batch, and the hourly
+# time series of drift results (kept for DRIFT_SERIES_RETENTION_HOURS) read by the retrain task
+DRIFT_THRESHOLD = float(os.getenv("DRIFT_THRESHOLD", "0.3"))
+DRIFT_SERIES_BLOB = "reports/drift/series.json"
+DRIFT_SERIES_RETENTION_HOURS = int(os.getenv("DRIFT_SERIES_RETENTION_HOURS", str(24 * 30)))
+# Manifests: per-prefix pointer to the newest object plus a day-sharded index, so lookups never
+# list the bucket. Writes are buffered per process and flushed every BACKGROUND_FLUSH_SECONDS;
+# prefixes also written outside the app are resynced from a listing every MANIFEST_SYNC_SECONDS
+MANIFEST_PREFIX = "manifests"
+MANIFEST_TRACKED_PREFIXES = ("data_label/labeled_", "data_prediction/predicted_")
+MANIFEST_OUT_OF_BAND_PREFIXES = ("data_label/labeled_",)
+MANIFEST_SYNC_SECONDS = int(os.getenv("MANIFEST_SYNC_SECONDS", "300"))
+BACKGROUND_FLUSH_SECONDS = float(os.getenv("BACKGROUND_FLUSH_SECONDS", "5"))
+# Attempts at a generation-checked read-modify-write before giving up
+JSON_UPDATE_RETRIES = int(os.getenv("JSON_UPDATE_RETRIES", "5"))
+
 REVIEW_COLUMN = 'review_text'
 TARGET_COULUM = 'sentiment'
 
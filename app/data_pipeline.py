@@ -1,20 +1,27 @@
+import io
+import json
+import threading
 import pandas as pd
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from google.cloud import storage
+from google.api_core.exceptions import NotFound, PreconditionFailed
 from google.api_core.client_options import ClientOptions
 from google.auth.credentials import AnonymousCredentials
 from google.oauth2 import service_account
 
 from app.config import *
-from app.eda.overview import overview_eda, sentiment_bar_chart
-from app.eda.text_length import text_length_eda, text_length_charts
-from app.eda.word_freq import word_frequency_eda, word_frequency_charts, word_cloud_charts
-from app.eda.duplicates import duplicate_review_eda, duplicate_review_charts
-from app.eda.rating import rating_vs_sentiment_eda, rating_vs_sentiment_charts
-from app.eda.sentiment_brand import sentiment_brand_eda, sentiment_brand_charts
+from app.manifest import (
+    advance_pointer, blob_entry, entries_between, group_by_day, merge_shard, parse_timestamp, pointer_path, shard_path,
+    shards_between, sort_key, timestamp, tracked_prefix,
+)
+from app.eda.preview import preview_eda
+from app.eda.report import eda_reports
+from app.eda.state import EdaState, build_eda_reports
+from app.eda.chunked import DEFAULT_CHUNK_ROWS, eda_state_from_file
+from app.eda.utils import frame_fingerprint, report_paths
 
 def make_storage_client():
     # If endpoint is set -> assume emulator
@@ -31,10 +38,15 @@ def make_storage_client():
 
 storage_client = make_storage_client()
 
+# Manifest entries written by this process and not yet flushed, shared by every DataHandler
+_pending_manifest: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_pending_lock = threading.Lock()
+
 class DataHandler:
     def __init__(self):
         self.production_model = None
         self.bucket_name = GCS_BUCKET_NAME
+        self._eda_cache: Dict[str, Dict[str, Any]] = {}
 
         try:
             self.bucket = storage_client.create_bucket(self.bucket_name)
@@ -54,12 +66,41 @@ class DataHandler:
         blob.chunk_size = None 
         try:
             blob.upload_from_string(data_string, content_type=content_type)
-            return # Success
         except Exception as e:
             print(f"⚠️ Upload failed : {e}")
+        else:
+            if tracked_prefix(blob_path):
+                self._queue_manifest(blob)
+            return # Success
         
         print(f"❌ Failed to upload {blob_path} after retries.")
 
+    def _update_json_safe(self, blob_path, update, retries=JSON_UPDATE_RETRIES):
+        """
+        Read-modify-write a small JSON object without losing concurrent writers:
+        `update(payload or None)` returns the new payload (or the same object to
+        skip the write), and the write only succeeds if the object still has the
+        generation that was read (0 = must not exist yet). On a conflict the
+        update is re-applied to the fresh copy.
+        """
+        for _ in range(retries):
+            blob = self.bucket.get_blob(blob_path)
+            generation = blob.generation if blob is not None else 0
+            try:
+                current = json.loads(blob.download_as_bytes(if_generation_match=generation)) if blob else None
+                payload = update(current)
+                if payload is current:
+                    return payload
+                target = self.bucket.blob(blob_path)
+                target.chunk_size = None
+                target.upload_from_string(json.dumps(payload, ensure_ascii=False), content_type="application/json",
+                                          if_generation_match=generation)
+                return payload
+            except PreconditionFailed:
+                continue
+        print(f"❌ Gave up updating {blob_path} after {retries} concurrent-write conflicts.")
+        return None
+
     def _upload_file(self, file_path: Path, dest_prefix: str):
         """
         Upload a local file into GCS emulator under the given prefix.
@@ -83,110 +124,328 @@ class DataHandler:
         except Exception as e:
             print(f"[warn] upload failed for {file_path}: {e}")
 
+    def _read_json(self, blob_path):
+        try:
+            return json.loads(self.bucket.blob(blob_path).download_as_bytes())
+        except NotFound:
+            return None
+
     def get_lastest_file(self, prefix: str = "data_label/labeled_"):
-        blobs = list(self.bucket.list_blobs(prefix=prefix))
+        name = self.latest_blob_name(prefix)
         tmp_dir = Path("/backend/temp")
         tmp_dir.mkdir(parents=True, exist_ok=True)
         tmp_path = tmp_dir / "ref.csv"
 
-        if blobs:
-            blobs.sort(key=lambda x: x.time_created, reverse=True)
-
-            blobs[0].download_to_filename(str(tmp_path))
+        if name:
+            try:
+                self.bucket.blob(name).download_to_filename(str(tmp_path))
+            except NotFound:
+                # deleted behind the manifest's back: resync once and take the real newest
+                name = self.latest_blob_name(prefix, resync=True)
+                if not name:
+                    return None
+                self.bucket.blob(name).download_to_filename(str(tmp_path))
             ref_df = pd.read_csv(tmp_path)
             return ref_df
 
-    def run_full_eda(self, df: pd.DataFrame, label_column: str = TARGET_COULUM, report_prefix: str = "eda") -> Dict[str, Any]:
+    # ---------- Manifests ----------
+    def _queue_manifest(self, blob):
+        """Buffer a just-written tracked object; flush_manifests indexes it off the request path."""
+        try:
+            entry = blob_entry(blob)
+        except Exception as e:
+            print(f"[warn] could not queue {blob.name} for the manifest: {e}")
+            return
+        with _pending_lock:
+            _pending_manifest.setdefault(tracked_prefix(blob.name), {})[entry["name"]] = entry
+
+    def _pending_entries(self, prefix: str) -> List[Dict[str, Any]]:
+        with _pending_lock:
+            return list(_pending_manifest.get(prefix, {}).values())
+
+    def _requeue_manifest(self, prefix: str, entries: List[Dict[str, Any]]):
+        with _pending_lock:
+            queued = _pending_manifest.setdefault(prefix, {})
+            for entry in entries:
+                queued.setdefault(entry["name"], entry)
+
+    def flush_manifests(self):
+        """Index the buffered entries: one update per touched day shard and one per pointer."""
+        with _pending_lock:
+            pending = {p: list(e.values()) for p, e in _pending_manifest.items() if e}
+            _pending_manifest.clear()
+        for prefix, entries in pending.items():
+            indexed, failed = [], []
+            for day, day_entries in group_by_day(entries).items():
+                try:
+                    shard = self._update_json_safe(shard_path(prefix, day),
+                                                   lambda s: merge_shard(s, day_entries, prefix, day))
+                except Exception as e:
+                    print(f"[warn] could not update the {prefix} manifest shard {day}: {e}")
+                    shard = None
+                (indexed if shard is not None else failed).extend(day_entries)
+            try:
+                pointer = self._update_json_safe(pointer_path(prefix), lambda p: advance_pointer(p, indexed, prefix))
+            except Exception as e:
+                print(f"[warn] could not update the {prefix} manifest pointer: {e}")
+                pointer = None
+            if pointer is None:
+                # re-adding an entry to its shard is a no-op, so the whole batch can be retried
+                failed += indexed
+            if failed:
+                self._requeue_manifest(prefix, failed)
+
+    def sync_manifest(self, prefix: str) -> Dict[str, Any]:
+        """Rebuild a prefix's shards and pointer from one listing; entries registered meanwhile are kept."""
+        listed_at = timestamp(datetime.now(timezone.utc))
+        listed = [blob_entry(b) for b in self.bucket.list_blobs(prefix=prefix)]
+        days = group_by_day(listed)
+        known = (self._read_json(pointer_path(prefix)) or {}).get("shards", [])
+        for day in sorted(set(days) | set(known)):
+            self._update_json_safe(shard_path(prefix, day),
+                                   lambda s: merge_shard(s, days.get(day, []), prefix, day, keep_since=listed_at))
+        pointer = self._update_json_safe(pointer_path(prefix),
+                                         lambda p: advance_pointer(p, listed, prefix, synced_at=listed_at))
+        print(f"Manifest for {prefix}: {len(listed)} object(s) indexed")
+        return pointer or advance_pointer(None, listed, prefix, synced_at=listed_at)
+
+    @staticmethod
+    def _sync_due(pointer: Dict[str, Any]) -> bool:
+        cutoff = timestamp(datetime.now(timezone.utc) - timedelta(seconds=MANIFEST_SYNC_SECONDS))
+        return (pointer.get("synced_at") or "") < cutoff
+
+    def sync_out_of_band_manifests(self):
+        """Resync prefixes that are also written outside the app, once per MANIFEST_SYNC_SECONDS across replicas."""
+        for prefix in MANIFEST_OUT_OF_BAND_PREFIXES:
+            try:
+                pointer = self._read_json(pointer_path(prefix))
+                if pointer is None or self._sync_due(pointer):
+                    self.sync_manifest(prefix)
+            except Exception as e:
+                print(f"[warn] could not resync the {prefix} manifest: {e}")
+
+    def _manifest_pointer(self, prefix: str, resync: bool = False) -> Dict[str, Any]:
+        pointer = None if resync else self._read_json(pointer_path(prefix))
+        if pointer is None or (prefix in MANIFEST_OUT_OF_BAND_PREFIXES and self._sync_due(pointer)):
+            # never trust a pointer older than the resync interval for prefixes written out of band
+            pointer = self.sync_manifest(prefix)
+        return pointer
+
+    def _shard_entries(self, prefix: str, days: List[str]) -> List[Dict[str, Any]]:
+        return [e for day in days for e in (self._read_json(shard_path(prefix, day)) or {}).get("entries", [])]
+
+    def _latest_blob_name_listed(self, prefix: str) -> Optional[str]:
+        """Newest object under prefix by a full listing, for prefixes the manifest does not track."""
+        blobs = list(self.bucket.list_blobs(prefix=prefix))
+        return max(blobs, key=lambda x: x.time_created).name if blobs else None
+
+    def latest_blob_name(self, prefix: str, resync: bool = False) -> Optional[str]:
+        """Name of the newest object under prefix: one small pointer read for tracked prefixes."""
+        tracked = tracked_prefix(prefix)
+        if tracked is None:
+            return self._latest_blob_name_listed(prefix)
+
+        pointer = self._manifest_pointer(tracked, resync=resync)
+        candidates = [e for e in self._pending_entries(tracked) if e["name"].startswith(prefix)]
+        if tracked == prefix:
+            candidates += filter(None, [pointer["latest"]])
+        else:
+            # narrower prefix: walk the shards newest first until one has a match
+            for day in reversed(pointer["shards"]):
+                found = [e for e in self._shard_entries(tracked, [day]) if e["name"].startswith(prefix)]
+                if found:
+                    candidates += found
+                    break
+        return max(candidates, key=sort_key)["name"] if candidates else None
+
+    def list_files_between(self, prefix: str, start: Optional[datetime] = None,
+                           end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Objects under prefix created in [start, end), oldest first, as manifest
+        entries (name, time_created, size, generation). Tracked prefixes read only
+        the day shards in range; untracked prefixes fall back to a listing.
+        """
+        tracked = tracked_prefix(prefix)
+        if tracked is None:
+            return entries_between([blob_entry(b) for b in self.bucket.list_blobs(prefix=prefix)], start, end)
+        pointer = self._manifest_pointer(tracked)
+        indexed = self._shard_entries(tracked, shards_between(pointer["shards"], start, end))
+        entries = {e["name"]: e for e in indexed + self._pending_entries(tracked) if e["name"].startswith(prefix)}
+        return entries_between(list(entries.values()), start, end)
+
+    def _upload_eda_reports(self, result: Dict[str, Any], used_prefix: str) -> str:
+        """Collect every report_path in an EDA payload and upload it under reports/eda/<prefix>."""
+        upload_prefix = f"reports/eda/{used_prefix}"
+        for p in report_paths(result):
+            self._upload_file(p, upload_prefix)
+        return upload_prefix
+
+    # ---------- Incremental EDA state ----------
+    def _eda_state_from(self, payload: Optional[Dict[str, Any]], label_column: str = TARGET_COULUM) -> EdaState:
+        if payload is not None:
+            try:
+                return EdaState.from_dict(payload)
+            except Exception as e:
+                print(f"[warn] could not load EDA state, starting fresh: {e}")
+        return EdaState(label_column=label_column, review_column=REVIEW_COLUMN)
+
+    def load_eda_state(self, label_column: str = TARGET_COULUM) -> EdaState:
+        """Load the persisted mergeable EDA state, or start an empty one."""
+        return self._eda_state_from(self._read_json(EDA_STATE_BLOB), label_column)
+
+    def run_incremental_eda(self, prefix: str = "data_label/labeled_", report_prefix: str = "eda_incremental",
+                            top_n: int = 20, chart_top_n: int = 10,
+                            chart_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fold every labeled batch not yet seen into the persisted EDA state (O(batch)
+        per new file), then rebuild the reports from the merged state.
+        """
+        batches: Dict[str, pd.DataFrame] = {}
+        run = {}
+
+        def fold(payload):
+            state = self._eda_state_from(payload)
+            # new batches come from the manifest; the margin covers out-of-band files indexed late
+            since = (payload or {}).get("folded_through")
+            margin = timedelta(seconds=2 * (MANIFEST_SYNC_SECONDS + BACKGROUND_FLUSH_SECONDS))
+            start = parse_timestamp(since) - margin if since else None
+            entries = [e for e in self.list_files_between(prefix, start=start) if e["name"] not in state.sources]
+            for entry in entries:
+                if entry["name"] not in batches:
+                    batches[entry["name"]] = pd.read_csv(io.BytesIO(self.bucket.blob(entry["name"]).download_as_bytes()))
+                state.update(batches[entry["name"]], source=entry["name"])
+            run.update(state=state, folded=[e["name"] for e in entries])
+            if not entries:
+                return payload
+            newest = max([since or "", *(e["time_created"] for e in entries)])
+            return state.to_dict() | {"folded_through": newest}
+
+        # generation-checked, so concurrent runs never lose or double-count a batch
+        if self._update_json_safe(EDA_STATE_BLOB, fold) is None and run.get("folded"):
+            raise RuntimeError(f"Could not save the EDA state to {EDA_STATE_BLOB} after concurrent updates.")
+        state, folded = run["state"], run["folded"]
+        print(f"EDA state: folded {len(folded)} new batch(es), {state.rows} rows total")
+
+        result = build_eda_reports(state, report_prefix=report_prefix, top_n=top_n, chart_top_n=chart_top_n,
+                                   chart_format=chart_format)
+        upload_prefix = self._upload_eda_reports(result, report_prefix)
+        return result | {"folded_batches": folded, "upload_prefix": upload_prefix}
+
+    # ---------- EDA result cache ----------
+    def _load_cached_eda(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Look up an EDA result in memory first, then in the shared storage cache."""
+        cached = self._eda_cache.get(fingerprint)
+        if cached is not None:
+            return cached
+        try:
+            blob = self.bucket.blob(f"{EDA_CACHE_PREFIX}/{fingerprint}.json")
+            if not blob.exists():
+                return None
+            cached = json.loads(blob.download_as_text())
+        except Exception as e:
+            print(f"[warn] EDA cache lookup failed for {fingerprint}: {e}")
+            return None
+        self._remember_eda(fingerprint, cached)
+        return cached
+
+    def _remember_eda(self, fingerprint: str, result: Dict[str, Any]):
+        self._eda_cache[fingerprint] = result
+        while len(self._eda_cache) > EDA_MEMORY_CACHE_SIZE:
+            self._eda_cache.pop(next(iter(self._eda_cache)))
+
+    def _store_cached_eda(self, fingerprint: str, result: Dict[str, Any]):
+        self._remember_eda(fingerprint, result)
+        self._upload_safe(
+            f"{EDA_CACHE_PREFIX}/{fingerprint}.json",
+            json.dumps(result, ensure_ascii=False, default=str),
+            content_type="application/json",
+        )
+
+    @staticmethod
+    def _full_eda_params(label_column: str, top_n: int, chart_top_n: int, near_duplicates: bool,
+                         chart_format: str) -> Dict[str, Any]:
+        """Parameters that shape a run_full_eda result (and key its cache entry)."""
+        return {"label_column": label_column, "top_n": top_n, "chart_top_n": chart_top_n,
+                "near_duplicates": near_duplicates, "chart_format": chart_format}
+
+    def run_full_eda(self, df: pd.DataFrame, label_column: str = TARGET_COULUM, report_prefix: str = "eda",
+                     top_n: int = 20, chart_top_n: int = 10, use_cache: bool = True,
+                     near_duplicates: bool = False, chart_format: Optional[str] = None) -> Dict[str, Any]:
         """
         Wrapper to run all EDA pieces in one call.
+        Results are cached by dataset fingerprint, so a repeat request on the same
+        data returns the stored payload and report paths without recomputing.
+        chart_format="spec" emits JSON chart specs for client-side rendering instead of PNGs.
         """
+        chart_format = chart_format or EDA_CHART_FORMAT
         if df is None or df.empty:
             raise ValueError("Input dataframe is empty. Cannot run EDA.")
 
+        fingerprint = frame_fingerprint(df, self._full_eda_params(label_column, top_n, chart_top_n,
+                                                                  near_duplicates, chart_format))
+        if use_cache:
+            cached = self._load_cached_eda(fingerprint)
+            if cached is not None:
+                return cached | {"cache_hit": True}
+
         # Use a stable prefix for this batch; if caller didn't provide one, make a timestamped tag
         used_prefix = report_prefix if report_prefix else f"eda_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        overview_payload = overview_eda(df=df, label_column=label_column, review_column=REVIEW_COLUMN,
-                                        rating_column="rating", report_prefix=used_prefix, length_column="text_length_chars")
-
-        sentiment = sentiment_bar_chart(label_summary=overview_payload.get("label_summary", {}), report_prefix=used_prefix)
-
-        text_len = text_length_eda(df=df, review_column=REVIEW_COLUMN, label_column=label_column,
-                                   length_column="text_length_chars", report_prefix=used_prefix)
-
-        text_len_charts = text_length_charts(df=df, review_column=REVIEW_COLUMN, label_column=label_column,
-                                             length_column="text_length_chars", report_prefix=used_prefix)
-
-        word_freq = word_frequency_eda(df=df, review_column=REVIEW_COLUMN, label_column=label_column,
-                                       report_prefix=used_prefix, top_n=20)
-
-        word_freq_charts = word_frequency_charts(freq_payload=word_freq, report_prefix=used_prefix, top_n=10)
-
-        word_cloud = word_cloud_charts(freq_payload=word_freq, report_prefix=used_prefix)
-
-        duplicates_summary = duplicate_review_eda(df=df, review_column=REVIEW_COLUMN,
-                                                  report_prefix=used_prefix)
-
-        duplicates_charts = duplicate_review_charts(summary_payload=duplicates_summary, report_prefix=used_prefix)
-
-        rating_eda = rating_vs_sentiment_eda(df=df, rating_column="rating", label_column=label_column,
-                                             report_prefix=used_prefix)
-
-        rating_charts = rating_vs_sentiment_charts(df=df, rating_column="rating", label_column=label_column,
-                                                   report_prefix=used_prefix)
-
-        brand_eda = sentiment_brand_eda(df=df, brand_column="brand", label_column=label_column,
-                                        report_prefix=used_prefix)
-
-        brand_charts = sentiment_brand_charts(df=df, brand_column="brand", label_column=label_column,
-                                              report_prefix=used_prefix)
-
-        # Collect and upload EDA reports to storage
-        def _collect_paths(obj):
-            paths = []
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    if k == "report_path" and isinstance(v, str):
-                        paths.append(Path(v))
-                    else:
-                        paths.extend(_collect_paths(v))
-            elif isinstance(obj, list):
-                for item in obj:
-                    paths.extend(_collect_paths(item))
-            return paths
-
-        all_paths = _collect_paths({
-            "overview": overview_payload,
-            "sentiment_chart": sentiment,
-            "text_length_overview": text_len,
-            "text_length_charts": text_len_charts,
-            "word_frequency_overview": word_freq,
-            "word_frequency_charts": word_freq_charts,
-            "word_clouds": word_cloud,
-            "duplicates_summary": duplicates_summary,
-            "duplicates_charts": duplicates_charts,
-            "rating_overview": rating_eda,
-            "rating_charts": rating_charts,
-            "brand_overview": brand_eda,
-            "brand_charts": brand_charts,
-        })
-        upload_prefix = f"reports/eda/{used_prefix}"
-        for p in all_paths:
-            self._upload_file(p, upload_prefix)
+        result = eda_reports(df, label_column=label_column, report_prefix=used_prefix, top_n=top_n,
+                             chart_top_n=chart_top_n, near_duplicates=near_duplicates, chart_format=chart_format)
+        upload_prefix = self._upload_eda_reports(result, used_prefix)
+        result |= {"fingerprint": fingerprint, "upload_prefix": upload_prefix}
+        self._store_cached_eda(fingerprint, result)
+        return result | {"cache_hit": False}
 
-        result = {
-            "overview": overview_payload,
-            "sentiment_chart": sentiment,
-            "text_length_overview": text_len,
-            "text_length_charts": text_len_charts,
-            "word_frequency_overview": word_freq,
-            "word_frequency_charts": word_freq_charts,
-            "word_clouds": word_cloud,
-            "duplicates_summary": duplicates_summary,
-            "duplicates_charts": duplicates_charts,
-            "rating_overview": rating_eda,
-            "rating_charts": rating_charts,
-            "brand_overview": brand_eda,
-            "brand_charts": brand_charts,
-        }
-        return result
+    def run_preview_eda(self, df: pd.DataFrame, label_column: str = TARGET_COULUM, report_prefix: str = "eda_preview",
+                        sample_size: int = EDA_PREVIEW_ROWS, time_budget_s: float = EDA_PREVIEW_SECONDS,
+                        top_n: int = 20, chart_top_n: int = 10) -> Dict[str, Any]:
+        """
+        Quick approximate EDA on a stratified sample within a time budget (see eda.preview).
+        If the exact report for this data is already cached it is returned instead.
+        The result's preview.upgrade block holds what upgrade_preview_eda needs for the exact run.
+        """
+        if df is None or df.empty:
+            raise ValueError("Input dataframe is empty. Cannot run EDA preview.")
+
+        params = self._full_eda_params(label_column, top_n, chart_top_n, False, EDA_CHART_FORMAT)
+        fingerprint = frame_fingerprint(df, params)
+        cached = self._load_cached_eda(fingerprint)
+        if cached is not None:
+            return cached | {"cache_hit": True}
+
+        result = preview_eda(df, label_column=label_column, report_prefix=report_prefix, sample_size=sample_size,
+                             time_budget_s=time_budget_s, top_n=top_n, chart_top_n=chart_top_n)
+        upload_prefix = self._upload_eda_reports(result, report_prefix)
+        result["preview"]["upgrade"] = {"fingerprint": fingerprint, "params": params}
+        return result | {"upload_prefix": upload_prefix, "cache_hit": False}
+
+    def upgrade_preview_eda(self, preview: Dict[str, Any], df: pd.DataFrame,
+                            report_prefix: str = "eda") -> Dict[str, Any]:
+        """Run the exact report for the data a preview was computed on (checked by fingerprint)."""
+        upgrade = (preview.get("preview") or {}).get("upgrade")
+        if upgrade is None:
+            # already exact (the preview call returned a cached full report)
+            return preview
+        params = upgrade["params"]
+        if frame_fingerprint(df, params) != upgrade["fingerprint"]:
+            raise ValueError("DataFrame does not match the data this preview was computed on.")
+        return self.run_full_eda(df, label_column=params["label_column"], report_prefix=report_prefix,
+                                 top_n=params["top_n"], chart_top_n=params["chart_top_n"],
+                                 near_duplicates=params["near_duplicates"], chart_format=params["chart_format"])
+
+    def run_chunked_eda(self, path: str, label_column: str = TARGET_COULUM, report_prefix: str = "eda",
+                        chunksize: int = DEFAULT_CHUNK_ROWS, top_n: int = 20, chart_top_n: int = 10,
+                        chart_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Out-of-core variant of run_full_eda for CSV/Parquet files larger than memory.
+        Rows are streamed in batches into a mergeable EdaState; the reports and
+        charts are then built from the state with the same structure as run_full_eda.
+        """
+        used_prefix = report_prefix if report_prefix else f"eda_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        state = eda_state_from_file(path, chunksize=chunksize, label_column=label_column, review_column=REVIEW_COLUMN)
+        result = build_eda_reports(state, report_prefix=used_prefix, top_n=top_n, chart_top_n=chart_top_n,
+                                   chart_format=chart_format)
+        upload_prefix = self._upload_eda_reports(result, used_prefix)
+        return result | {"upload_prefix": upload_prefix}
@@ -0,0 +1,132 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import REVIEW_COLUMN, TARGET_COULUM
+from app.eda.utils import box_stats_from_counts, ensure_text_length_column, numeric_stats_from_moments
+
+_LABEL, _LENGTH, _RATING, _BRAND = "label", "length", "rating", "brand"
+
+
+# Count, mean, M2, min, max of a value -> count histogram.
+def _moments(values: np.ndarray, counts: np.ndarray) -> Dict[str, Any]:
+    n = int(counts.sum())
+    if n == 0:
+        return {"count": 0}
+    mean = float(np.dot(values, counts) / n)
+    return {
+        "count": n,
+        "mean": mean,
+        "m2": float(np.dot(counts, (values - mean) ** 2)),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+
+def _histogram_summary(hist: pd.Series) -> Dict[str, Any]:
+    """Stats, box stats and value counts of one numeric column from its value -> count histogram."""
+    hist = hist.groupby(level=-1).sum().sort_index()
+    values = hist.index.to_numpy(dtype=float)
+    counts = hist.to_numpy(dtype=np.int64)
+    return {
+        "stats": numeric_stats_from_moments(_moments(values, counts), values, counts),
+        "box": box_stats_from_counts(values, counts),
+        "value_counts": {str(v): int(c) for v, c in zip(values, counts)},
+    }
+
+
+def _first_seen(labels: pd.Index) -> List[Any]:
+    return [lbl for lbl in pd.unique(labels) if not pd.isna(lbl)]
+
+
+def _numeric_by_label(cube: pd.Series, value_level: str) -> Dict[str, Any]:
+    """Global and per-label summaries of one numeric level of the cube (rows with a value only)."""
+    valid = cube[cube.index.get_level_values(value_level).notna()]
+    hist = valid.groupby(level=[_LABEL, value_level], dropna=False, sort=False).sum()
+    labels = hist.index.get_level_values(_LABEL)
+    by_label = {lbl: _histogram_summary(hist[labels == lbl]) for lbl in _first_seen(labels)}
+    return {
+        "global": _histogram_summary(hist) if len(hist) else None,
+        "first_seen": [str(lbl) for lbl in by_label],
+        "by_label": {str(lbl): by_label[lbl] for lbl in sorted(by_label)},
+    }
+
+
+def aggregate_eda(
+    df: pd.DataFrame,
+    label_column: str = TARGET_COULUM,
+    review_column: str = REVIEW_COLUMN,
+    rating_column: str = "rating",
+    brand_column: str = "brand",
+    length_column: str = "text_length_chars",
+) -> Dict[str, Any]:
+    """
+    Fused aggregation behind the overview, text length, rating and brand reports.
+    One grouped count over (label, text length, numeric rating, brand) builds a
+    small cube; every per-label / per-brand / per-rating count, moment and
+    quantile is then read from the cube instead of rescanning the frame.
+    Box stats and label lists keep first-appearance label order, summaries are sorted by label.
+    """
+    if review_column in df.columns:
+        length_col = ensure_text_length_column(df, review_column, length_column)
+    else:
+        length_col = length_column if length_column in df.columns else None
+    has_label = label_column in df.columns
+    has_rating = rating_column in df.columns
+    has_brand = brand_column in df.columns
+
+    keys = pd.DataFrame({
+        _LABEL: df[label_column] if has_label else pd.Series(np.nan, index=df.index, dtype=object),
+        _LENGTH: df[length_col] if length_col else np.nan,
+        _RATING: pd.to_numeric(df[rating_column], errors="coerce") if has_rating else np.nan,
+        _BRAND: df[brand_column] if has_brand else np.nan,
+    })
+    cube = keys.groupby(list(keys.columns), dropna=False, sort=False, observed=True).size()
+
+    label_totals = cube.groupby(level=_LABEL, dropna=False, sort=False).sum()
+    label_totals = label_totals.iloc[np.argsort(-label_totals.to_numpy(), kind="stable")]
+    aggregates: Dict[str, Any] = {
+        "rows": int(len(df)),
+        "length_column": length_col,
+        "label_available": has_label,
+        "label_counts": {str(k): int(v) for k, v in label_totals.items()} if has_label else {},
+        "missing_label": int(label_totals[label_totals.index.isna()].sum()) if has_label else None,
+        "length": _numeric_by_label(cube, _LENGTH) if length_col else None,
+        "rating": None,
+        "brand": None,
+    }
+
+    if has_rating:
+        rating = _numeric_by_label(cube, _RATING)
+        values = cube.index.get_level_values(_RATING)
+        valid = values.notna()
+        aggregates["rating"] = rating | {
+            "outliers": int(cube[valid & ((values < 1) | (values > 5))].sum()),
+            "min": float(values[valid].min()) if valid.any() else None,
+            "max": float(values[valid].max()) if valid.any() else None,
+        }
+
+    if has_brand:
+        brands = cube.index.get_level_values(_BRAND)
+        with_brand = cube[brands.notna()]
+        crosstab = with_brand.groupby(level=[_LABEL, _BRAND], sort=True).sum()
+        counts_by_label: Dict[str, Dict[str, int]] = {}
+        for lbl, counts in crosstab.groupby(level=_LABEL, sort=True):
+            counts = counts.droplevel(_LABEL)
+            counts = counts.iloc[np.argsort(-counts.to_numpy(), kind="stable")]
+            counts_by_label[str(lbl)] = {str(b): int(c) for b, c in counts.items()}
+        aggregates["brand"] = {
+            "brands": sorted({str(b) for b in brands[brands.notna()]}),
+            "counts_by_label": counts_by_label,
+        }
+    return aggregates
+
+
+def label_present(aggregates: Dict[str, Any], label: str) -> bool:
+    return aggregates["label_counts"].get(label, 0) > 0
+
+
+def box_by_label(summary: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Per-label box stats in first-appearance order (the order the charts use)."""
+    return {lbl: summary["by_label"][lbl]["box"] for lbl in summary["first_seen"]}
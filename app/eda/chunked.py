@@ -0,0 +1,46 @@
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from app.config import REVIEW_COLUMN, TARGET_COULUM
+from app.eda.state import EdaState
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def iter_frame_chunks(path: str, chunksize: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Stream a CSV or Parquet file as DataFrames of at most `chunksize` rows."""
+    suffix = Path(path).suffix.lower()
+    if suffix in {".parquet", ".pq"}:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(path, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
+
+
+def eda_state_from_file(
+    path: str,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    label_column: str = TARGET_COULUM,
+    review_column: str = REVIEW_COLUMN,
+    state: Optional[EdaState] = None,
+) -> EdaState:
+    """
+    Accumulate every EDA statistic over a file in row batches. The state keeps exact
+    counts (24 bytes per distinct review/row hash plus the vocabulary), so the reports
+    match the in-memory path; memory is one chunk plus that state, never the full dataset.
+    """
+    state = state or EdaState(label_column=label_column, review_column=review_column, exact=True)
+    rows = 0
+    for chunk in iter_frame_chunks(path, chunksize=chunksize):
+        state.update(chunk.reset_index(drop=True))
+        rows += len(chunk)
+    if rows == 0:
+        raise ValueError(f"No rows read from {path}. Cannot run EDA.")
+    return state
@@ -1,35 +1,47 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
-from app.config import REVIEW_COLUMN
-from app.eda.utils import ensure_columns, save_json_report, save_figure
+from app.config import DUPLICATE_TOP_K, NEAR_DUPLICATE_THRESHOLD, REVIEW_COLUMN
+from app.eda.near_duplicates import near_duplicate_clusters
+from app.eda.render import ChartRenderer, save_chart
+from app.eda.utils import ensure_columns, save_json_report, text_hashes
 
 
 def duplicate_review_eda(
     df: pd.DataFrame,
     review_column: str = REVIEW_COLUMN,
     report_prefix: str = "duplicates",
+    top_k: int = DUPLICATE_TOP_K,
+    near_duplicates: bool = False,
+    similarity_threshold: float = NEAR_DUPLICATE_THRESHOLD,
 ) -> Dict[str, Any]:
-    """Summarize duplicate review_text counts and list all repeated texts."""
+    """
+    Summarize duplicate review_text counts from 64-bit text hashes and list the
+    top_k most repeated texts. With near_duplicates=True, also report MinHash/LSH
+    clusters of reviews at or above similarity_threshold.
+    """
     if df is None or df.empty:
         raise ValueError("Input dataframe is empty. Cannot run duplicate review EDA.")
     ensure_columns(df, [review_column])
 
-    series = df[review_column].astype(str)
+    series = df[review_column]
+    hashes = text_hashes(series)
+    _, first_index, counts = np.unique(hashes, return_index=True, return_counts=True)
     total_rows = int(len(series))
-    unique_value_count = int(series.nunique())
-    value_counts = series.value_counts()
-    duplicate_value_counts = value_counts[value_counts > 1]
-    duplicate_value_count = int(len(duplicate_value_counts))
-    duplicate_rows = int((series.duplicated(keep=False)).sum())
+    unique_value_count = int(len(counts))
+    repeated = counts > 1
+    duplicate_value_count = int(repeated.sum())
+    duplicate_rows = int(counts[repeated].sum())
     unique_rows = total_rows - duplicate_rows
 
+    # most repeated first, ties in order of first appearance
+    dup_first, dup_counts = first_index[repeated], counts[repeated]
+    top = np.lexsort((dup_first, -dup_counts))[:top_k]
     duplicated_reviews = [
-        {"text": text, "count": int(count)}
-        for text, count in duplicate_value_counts.items()
+        {"text": str(series.iat[dup_first[i]]), "count": int(dup_counts[i])}
+        for i in top
     ]
 
     payload = {
@@ -39,8 +51,11 @@ def duplicate_review_eda(
         "duplicate_value_count": duplicate_value_count,
         "duplicate_rows": duplicate_rows,
         "unique_rows": unique_rows,
+        "top_k": top_k,
         "duplicated_reviews": duplicated_reviews,
     }
+    if near_duplicates:
+        payload["near_duplicates"] = near_duplicate_clusters(series, threshold=similarity_threshold, top_k=top_k)
 
     return save_json_report(payload, "eda_duplicates", report_prefix)
 
@@ -48,29 +63,34 @@ def duplicate_review_eda(
 def duplicate_review_charts(
     summary_payload: dict,
     report_prefix: str = "duplicates",
+    renderer: Optional[ChartRenderer] = None,
 ) -> Dict[str, Any]:
-    """Plot bar chart of unique vs duplicate review counts."""
+    """Plot bar chart of unique vs duplicate (and near-duplicate, when computed) review counts."""
     if not summary_payload:
         raise ValueError("summary_payload is required to plot duplicate review chart.")
 
     unique_rows = summary_payload.get("unique_rows", 0)
     duplicate_rows = summary_payload.get("duplicate_rows", 0)
 
-    plot_df = pd.DataFrame(
-        {
-            "type": ["unique", "duplicate"],
-            "count": [unique_rows, duplicate_rows],
-        }
-    )
-
-    fig, ax = plt.subplots(figsize=(5, 4))
-    sns.barplot(data=plot_df, x="type", y="count", palette=["#4CAF50", "#F44336"], ax=ax)
-    ax.set_title("Unique vs Duplicate Reviews")
-    ax.set_xlabel("")
-    ax.set_ylabel("Count")
-    ax.grid(axis="y", linestyle="--", alpha=0.4)
+    x, y, colors = ["unique", "duplicate"], [int(unique_rows), int(duplicate_rows)], ["#4CAF50", "#F44336"]
+    near = summary_payload.get("near_duplicates")
+    if near:
+        x.append("near-duplicate")
+        y.append(int(near.get("near_duplicate_rows", 0)))
+        colors.append("#FF9800")
 
-    saved = save_figure(fig, "eda_duplicates_bar", report_prefix)
+    spec = {
+        "kind": "bar",
+        "figsize": (5, 4),
+        "x": x,
+        "y": y,
+        "colors": colors,
+        "grid": True,
+        "title": "Unique vs Duplicate Reviews",
+        "xlabel": "",
+        "ylabel": "Count",
+    }
+    saved = save_chart(spec, "eda_duplicates_bar", report_prefix, renderer)
 
     return {
         "bar_chart": {
@@ -0,0 +1,151 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from app.config import NEAR_DUPLICATE_NUM_PERM, NEAR_DUPLICATE_THRESHOLD
+
+SHINGLE_SIZE = 5
+SIGNATURE_BATCH = 10_000
+CLUSTER_EXAMPLES = 5
+
+_WS_RE = re.compile(r"\s+")
+
+
+# ---------- MinHash ----------
+# splitmix64 finalizer: a cheap, well-mixed 64-bit permutation (uint64 math wraps).
+def _mix64(x: np.ndarray) -> np.ndarray:
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _shingles(text: str, k: int) -> List[str]:
+    """Character k-grams of the normalized text; short texts are a single shingle."""
+    text = _WS_RE.sub(" ", text.lower()).strip()
+    if len(text) <= k:
+        return [text]
+    return [text[i:i + k] for i in range(len(text) - k + 1)]
+
+
+def minhash_signatures(texts: List[str], num_perm: int = NEAR_DUPLICATE_NUM_PERM,
+                       shingle_size: int = SHINGLE_SIZE, seed: int = 1) -> np.ndarray:
+    """
+    (len(texts), num_perm) uint32 MinHash signatures. Texts are processed in
+    batches and one permutation at a time, so memory stays O(batch shingles).
+    """
+    seeds = _mix64(np.arange(seed, seed + num_perm, dtype=np.uint64))
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for start in range(0, len(texts), SIGNATURE_BATCH):
+        batch = [_shingles(t, shingle_size) for t in texts[start:start + SIGNATURE_BATCH]]
+        offsets = np.cumsum([0] + [len(s) for s in batch[:-1]])
+        flat = np.concatenate([np.array(s, dtype=object) for s in batch])
+        hashed = pd.util.hash_array(flat)
+        for p in range(num_perm):
+            mins = np.minimum.reduceat(_mix64(hashed ^ seeds[p]), offsets)
+            signatures[start:start + len(batch), p] = (mins >> np.uint64(32)).astype(np.uint32)
+    return signatures
+
+
+# ---------- LSH ----------
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows == num_perm whose S-curve midpoint is closest to threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1.0 / br[0]) ** (1.0 / br[1]) - threshold))
+
+
+def _band_keys(band: np.ndarray) -> np.ndarray:
+    key = np.zeros(band.shape[0], dtype=np.uint64)
+    for col in range(band.shape[1]):
+        key = _mix64(key ^ band[:, col].astype(np.uint64))
+    return key
+
+
+def lsh_candidate_pairs(signatures: np.ndarray, bands: int, rows: int) -> np.ndarray:
+    """
+    (m, 2) array of candidate pairs. Each bucket contributes (leader, member)
+    edges only, so the pair count is linear in the number of documents.
+    """
+    pairs = []
+    for b in range(bands):
+        keys = _band_keys(signatures[:, b * rows:(b + 1) * rows])
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        leaders = order[np.maximum.accumulate(np.where(starts, np.arange(order.size), 0))]
+        members = ~starts
+        if members.any():
+            pairs.append(np.column_stack([leaders[members], order[members]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def near_duplicate_clusters(
+    series: pd.Series,
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    num_perm: int = NEAR_DUPLICATE_NUM_PERM,
+    shingle_size: int = SHINGLE_SIZE,
+    top_k: int = 20,
+) -> Dict[str, Any]:
+    """
+    Group reviews whose estimated Jaccard similarity (character shingles) is at
+    least `threshold`. Exact duplicates are collapsed first; candidate pairs from
+    LSH are verified on their signatures and joined with connected components.
+    Only clusters with more than one distinct text are reported (top_k by rows).
+    """
+    counts = series.astype(str).value_counts(sort=False)
+    texts = counts.index.tolist()
+    weights = counts.to_numpy(dtype=np.int64)
+    bands, rows = lsh_params(num_perm, threshold)
+
+    payload = {
+        "similarity_threshold": threshold,
+        "num_perm": num_perm,
+        "bands": bands,
+        "rows_per_band": rows,
+        "shingle_size": shingle_size,
+        "cluster_count": 0,
+        "near_duplicate_rows": 0,
+        "clusters": [],
+    }
+    if len(texts) < 2:
+        return payload
+
+    signatures = minhash_signatures(texts, num_perm=num_perm, shingle_size=shingle_size)
+    pairs = lsh_candidate_pairs(signatures, bands, rows)
+    if pairs.size:
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        pairs = pairs[similarity >= threshold]
+    n = len(texts)
+    graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, component = connected_components(graph, directed=False)
+
+    distinct = np.bincount(component)
+    in_cluster = distinct[component] > 1
+    cluster_rows = np.bincount(component, weights=weights).astype(np.int64)
+    cluster_ids = np.flatnonzero(distinct > 1)
+    ranked = cluster_ids[np.argsort(-cluster_rows[cluster_ids], kind="stable")][:top_k]
+
+    clusters = []
+    for cid in ranked:
+        members = np.flatnonzero(component == cid)
+        members = members[np.argsort(-weights[members], kind="stable")]
+        clusters.append({
+            "rows": int(cluster_rows[cid]),
+            "distinct_texts": int(distinct[cid]),
+            "representative": texts[members[0]],
+            "examples": [{"text": texts[i], "count": int(weights[i])} for i in members[:CLUSTER_EXAMPLES]],
+        })
+
+    payload.update({
+        "cluster_count": int(len(cluster_ids)),
+        "near_duplicate_rows": int(weights[in_cluster].sum()),
+        "clusters": clusters,
+    })
+    return payload
@@ -1,11 +1,11 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from app.config import REVIEW_COLUMN, TARGET_COULUM
-from app.eda.utils import ensure_text_length_column, save_json_report, save_figure, sentiment_palette
+from app.eda.aggregate import aggregate_eda
+from app.eda.render import ChartRenderer, save_chart
+from app.eda.utils import save_json_report, sentiment_palette
 
 
 def overview_eda(
@@ -15,40 +15,40 @@ def overview_eda(
     rating_column: str = "rating",
     report_prefix: str = "overview",
     length_column: str = "text_length_chars",
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """Build a dataset overview (shape, dtypes, missingness, duplicates, rating info)."""
+    """
+    Build a dataset overview (shape, dtypes, missingness, duplicates, rating info).
+    Label and rating figures come from `aggregates` (see aggregate_eda), computed here when not given.
+    """
     if df is None or df.empty:
         raise ValueError("Input dataframe is empty. Cannot generate EDA overview.")
 
-    length_col = ensure_text_length_column(df, review_column, length_column)
+    aggregates = aggregates or aggregate_eda(df, label_column, review_column, rating_column,
+                                             length_column=length_column)
+    length_col = aggregates["length_column"]
 
     rows, cols = df.shape
     dtype_info = [{"column": col, "dtype": str(dtype)} for col, dtype in df.dtypes.items()]
 
-    label_counts = df[label_column].value_counts(dropna=False) if label_column in df.columns else pd.Series(dtype=int)
+    label_counts = aggregates["label_counts"]
     label_summary = {
         "label_column": label_column,
         "num_classes": int(len(label_counts)),
-        "classes": [str(c) for c in label_counts.index.tolist()],
-        "counts": {str(k): int(v) for k, v in label_counts.to_dict().items()},
+        "classes": list(label_counts.keys()),
+        "counts": dict(label_counts),
     }
 
     pct = (lambda c: round((c / rows) * 100, 2) if rows else 0.0)
     missing_review = int(df[review_column].isna().sum()) if review_column in df.columns else None
-    missing_label = int(df[label_column].isna().sum()) if label_column in df.columns else None
+    missing_label = aggregates["missing_label"]
     dup_rows = int(df.duplicated(keep="first").sum())
     dup_review = int(df[review_column].duplicated(keep="first").sum()) if review_column in df.columns else None
 
-    if rating_column in df.columns:
-        series = df[rating_column]
-        outlier_mask = series.notna() & ~series.between(1, 5)
-        outlier_count = int(outlier_mask.sum())
-        rating_min = float(series.min()) if not series.empty else None
-        rating_max = float(series.max()) if not series.empty else None
-    else:
-        outlier_count = None
-        rating_min = None
-        rating_max = None
+    rating = aggregates["rating"]
+    outlier_count = rating["outliers"] if rating else None
+    rating_min = rating["min"] if rating else None
+    rating_max = rating["max"] if rating else None
 
     payload = {
         "shape": {"rows": rows, "columns": cols},
@@ -79,6 +79,7 @@ def overview_eda(
 def sentiment_bar_chart(
     label_summary: dict,
     report_prefix: str = "sentiment_bar",
+    renderer: Optional[ChartRenderer] = None,
 ) -> Dict[str, Any]:
     """Plot sentiment distribution bar chart from label_summary counts."""
     if not label_summary or "counts" not in label_summary:
@@ -91,24 +92,19 @@ def sentiment_bar_chart(
     total = int(sum(counts))
     percents = [round((c / total) * 100, 2) if total else 0.0 for c in counts]
 
-    plot_df = pd.DataFrame({"label": label_order, "count": counts})
-    palette = sentiment_palette(label_order)
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.barplot(data=plot_df, x="label", y="count", palette=palette, ax=ax)
-    ax.set_ylabel("Count")
-    ax.set_xlabel("")
-    ax.set_title("Sentiment distribution")
-    ax.grid(axis="y", linestyle="--", alpha=0.4)
-
-    for p, count, percent in zip(ax.patches, counts, percents):
-        ax.annotate(
-            f"{count} ({percent}%)",
-            (p.get_x() + p.get_width() / 2., p.get_height()),
-            ha="center",
-            va="bottom",
-        )
-
-    saved = save_figure(fig, "eda_sentiment", report_prefix)
+    spec = {
+        "kind": "bar",
+        "figsize": (6, 4),
+        "x": label_order,
+        "y": counts,
+        "colors": sentiment_palette(label_order),
+        "annotations": [f"{count} ({percent}%)" for count, percent in zip(counts, percents)],
+        "grid": True,
+        "title": "Sentiment distribution",
+        "xlabel": "",
+        "ylabel": "Count",
+    }
+    saved = save_chart(spec, "eda_sentiment", report_prefix, renderer)
     return {
         "counts": dict(zip(label_order, counts)),
         "percents": dict(zip(label_order, percents)),
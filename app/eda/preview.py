@@ -0,0 +1,183 @@
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import EDA_PREVIEW_PILOT_ROWS, EDA_PREVIEW_ROWS, EDA_PREVIEW_SECONDS, TARGET_COULUM
+from app.eda.report import eda_reports
+from app.eda.utils import report_paths
+
+Z_95 = 1.959963984540054
+
+
+# ---------- Sampling ----------
+def stratified_sample(df: pd.DataFrame, label_column: str, n: int, seed: int = 0) -> pd.DataFrame:
+    """Proportional stratified sample of n rows by label (largest remainder, every stratum kept), in row order."""
+    if n >= len(df):
+        return df
+    rng = np.random.default_rng(seed)
+    if label_column not in df.columns:
+        return df.iloc[np.sort(rng.choice(len(df), n, replace=False))]
+
+    codes, _ = pd.factorize(df[label_column], use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    quota = sizes * n / len(df)
+    alloc = np.floor(quota).astype(np.int64)
+    if n >= len(sizes):
+        alloc = np.maximum(alloc, 1)
+    remainder = n - int(alloc.sum())
+    if remainder > 0:
+        alloc[np.argsort(-(quota - np.floor(quota)), kind="stable")[:remainder]] += 1
+    elif remainder < 0:
+        # the one-row floor overshot; take rows back from the largest strata
+        for idx in np.argsort(-alloc, kind="stable")[:-remainder]:
+            alloc[idx] -= 1
+    alloc = np.minimum(alloc, sizes)
+
+    picked = [rng.choice(np.flatnonzero(codes == c), k, replace=False) for c, k in enumerate(alloc) if k > 0]
+    return df.iloc[np.sort(np.concatenate(picked))]
+
+
+# ---------- Confidence intervals ----------
+def _fpc(n: int, population: int) -> float:
+    """Finite population correction for sampling n of `population` rows without replacement."""
+    return math.sqrt((population - n) / (population - 1)) if population > 1 and n < population else 0.0
+
+
+def proportion_interval(k: int, n: int, population: int, z: float = Z_95) -> Dict[str, Any]:
+    """Wilson score interval for a sample proportion k/n, narrowed by the finite population correction."""
+    if n == 0:
+        return {"estimate": None, "low": None, "high": None, "n": 0}
+    p = k / n
+    fpc = _fpc(n, population)
+    z = z * fpc
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return {"estimate": p, "low": max(0.0, center - half), "high": min(1.0, center + half), "n": n}
+
+
+def mean_interval(stats: Dict[str, Any], population: int, z: float = Z_95) -> Dict[str, Any]:
+    """Normal-approximation interval for a sample mean from a numeric_stats dict."""
+    n, mean, std = stats.get("count") or 0, stats.get("mean"), stats.get("std")
+    if n == 0 or mean is None:
+        return {"estimate": None, "low": None, "high": None, "n": n}
+    if std is None or n < 2 or math.isnan(std):
+        return {"estimate": mean, "low": None, "high": None, "n": n}
+    half = z * std / math.sqrt(n) * _fpc(n, population)
+    return {"estimate": mean, "low": mean - half, "high": mean + half, "n": n}
+
+
+def preview_intervals(result: Dict[str, Any], sample_rows: int, population_rows: int,
+                      label_populations: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """95% intervals for the sample-based proportions and means; per-label ones use that label's population."""
+    label_populations = label_populations or {}
+    label_population = lambda lbl: label_populations.get(str(lbl), population_rows)
+    overview = result["overview"]
+    proportions: Dict[str, Any] = {}
+    for key, count in (
+        ("missing_review_text", overview["missing"]["review_text"]["count"]),
+        ("missing_label", overview["missing"]["label"]["count"]),
+        ("rating_outliers", overview["rating_outliers"]["count"]),
+    ):
+        if count is not None:
+            proportions[key] = proportion_interval(count, sample_rows, population_rows)
+
+    brand_share: Dict[str, Dict[str, Any]] = {}
+    for lbl, counts in result["brand_overview"].get("counts_by_sentiment", {}).items():
+        total = sum(counts.values())
+        brand_share[lbl] = {b: proportion_interval(c, total, label_population(lbl)) for b, c in counts.items()}
+    proportions["brand_share_by_label"] = brand_share
+
+    means: Dict[str, Any] = {}
+    text_len = result["text_length_overview"]
+    means["text_length"] = mean_interval(text_len["global_summary"], population_rows)
+    means["text_length_by_label"] = {
+        lbl: mean_interval(s, label_population(lbl)) for lbl, s in text_len["summary_by_label"].items()
+    }
+    rating = result["rating_overview"]
+    if rating.get("rating_available"):
+        means["rating"] = mean_interval(rating["global_summary"], population_rows)
+        means["rating_by_label"] = {
+            lbl: mean_interval(s, label_population(lbl)) for lbl, s in rating["summary_by_label"].items()
+        }
+    return {"confidence_level": 0.95, "proportions": proportions, "means": means}
+
+
+# ---------- Preview run ----------
+def _discard_reports(result: Dict[str, Any], keep: Dict[str, Any]):
+    # report paths are second-resolution timestamps, so the pilot and final run can share files
+    kept = set(report_paths(keep))
+    for path in report_paths(result):
+        if path not in kept:
+            path.unlink(missing_ok=True)
+
+
+def _timed_reports(sample: pd.DataFrame, **kwargs) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    result = eda_reports(sample, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def preview_eda(
+    df: pd.DataFrame,
+    label_column: str = TARGET_COULUM,
+    report_prefix: str = "eda_preview",
+    sample_size: int = EDA_PREVIEW_ROWS,
+    time_budget_s: float = EDA_PREVIEW_SECONDS,
+    top_n: int = 20,
+    chart_top_n: int = 10,
+    chart_format: str = "spec",
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Approximate EDA on a label-stratified sample sized from a timed pilot run, plus a
+    `preview` block (sample size, timing, 95% intervals). The budget is a target, not
+    a hard limit: the pilot always runs and the final pass is not interrupted, so
+    check `within_budget`.
+    """
+    if df is None or df.empty:
+        raise ValueError("Input dataframe is empty. Cannot run EDA preview.")
+
+    start = time.perf_counter()
+    population = len(df)
+    label_populations = {}
+    if label_column in df.columns:
+        label_populations = {str(k): int(v) for k, v in df[label_column].value_counts(dropna=False).items()}
+    kwargs = dict(label_column=label_column, report_prefix=report_prefix, top_n=top_n,
+                  chart_top_n=chart_top_n, chart_format=chart_format)
+
+    pilot_rows = min(EDA_PREVIEW_PILOT_ROWS, sample_size, population)
+    sample = stratified_sample(df, label_column, pilot_rows, seed)
+    result, pilot_elapsed = _timed_reports(sample, **kwargs)
+
+    remaining = time_budget_s - (time.perf_counter() - start)
+    # keep a safety margin: the cost is roughly linear in rows, plus fixed chart overhead
+    affordable = int(pilot_rows * 0.8 * remaining / max(pilot_elapsed, 1e-6))
+    target = min(sample_size, population, affordable)
+    if target > pilot_rows:
+        pilot_result = result
+        sample = stratified_sample(df, label_column, target, seed)
+        result, _ = _timed_reports(sample, **kwargs)
+        _discard_reports(pilot_result, keep=result)
+
+    sample_rows = len(sample)
+    elapsed = time.perf_counter() - start
+    return result | {
+        "preview": {
+            "sampling": "stratified",
+            "stratify_column": label_column,
+            "seed": seed,
+            "sample_rows": sample_rows,
+            "population_rows": population,
+            "sample_fraction": round(sample_rows / population, 6),
+            "time_budget_s": time_budget_s,
+            "elapsed_s": round(elapsed, 3),
+            "within_budget": elapsed <= time_budget_s,
+            "intervals": preview_intervals(result, sample_rows, population, label_populations),
+            "notes": "Counts are for the sample. Within-sample duplicate counts under-estimate "
+                     "dataset-wide duplicates; use the exact report for those.",
+        }
+    }
@@ -1,11 +1,11 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from app.config import TARGET_COULUM
-from app.eda.utils import numeric_stats, save_json_report, save_figure, sentiment_palette
+from app.eda.aggregate import aggregate_eda, box_by_label
+from app.eda.render import ChartRenderer, save_chart
+from app.eda.utils import save_json_report, sentiment_palette
 
 
 def rating_vs_sentiment_eda(
@@ -13,6 +13,7 @@ def rating_vs_sentiment_eda(
     rating_column: str = "rating",
     label_column: str = TARGET_COULUM,
     report_prefix: str = "rating_sentiment",
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Summarize rating stats overall and by sentiment label; save as JSON."""
     if df is None or df.empty:
@@ -25,32 +26,22 @@ def rating_vs_sentiment_eda(
             "logged_to_mlflow": False,
         }
 
-    df_use = df[[rating_column, label_column]].copy()
-    df_use = df_use[pd.to_numeric(df_use[rating_column], errors="coerce").notna()]
-    df_use[rating_column] = df_use[rating_column].astype(float)
-    if df_use.empty:
+    aggregates = aggregates or aggregate_eda(df, label_column, rating_column=rating_column)
+    rating = aggregates["rating"]
+    if rating is None or rating["global"] is None:
         return {
             "rating_available": False,
             "report_path": None,
             "logged_to_mlflow": False,
         }
 
-    global_summary = numeric_stats(df_use[rating_column])
-    summary_by_label = {}
-    counts_by_rating_and_label = {}
-    for lbl, sub in df_use.groupby(label_column):
-        summary_by_label[str(lbl)] = numeric_stats(sub[rating_column])
-        counts_by_rating_and_label[str(lbl)] = {
-            str(k): int(v) for k, v in sub[rating_column].value_counts().sort_index().to_dict().items()
-        }
-
     payload = {
         "rating_available": True,
         "rating_column": rating_column,
         "label_column": label_column,
-        "global_summary": global_summary,
-        "summary_by_label": summary_by_label,
-        "counts_by_rating_and_label": counts_by_rating_and_label,
+        "global_summary": rating["global"]["stats"],
+        "summary_by_label": {lbl: s["stats"] for lbl, s in rating["by_label"].items()},
+        "counts_by_rating_and_label": {lbl: s["value_counts"] for lbl, s in rating["by_label"].items()},
     }
 
     return save_json_report(payload, "eda_rating_sentiment", report_prefix)
@@ -61,6 +52,8 @@ def rating_vs_sentiment_charts(
     rating_column: str = "rating",
     label_column: str = TARGET_COULUM,
     report_prefix: str = "rating_sentiment",
+    renderer: Optional[ChartRenderer] = None,
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Plot mean bars and boxplots of rating versus sentiment labels."""
     results = {
@@ -71,29 +64,56 @@ def rating_vs_sentiment_charts(
     if df is None or df.empty or rating_column not in df.columns or label_column not in df.columns:
         return results
 
-    df_use = df[[rating_column, label_column]].copy()
-    df_use = df_use[pd.to_numeric(df_use[rating_column], errors="coerce").notna()]
-    df_use[rating_column] = df_use[rating_column].astype(float)
-    if df_use.empty:
+    aggregates = aggregates or aggregate_eda(df, label_column, rating_column=rating_column)
+    rating = aggregates["rating"]
+    if rating is None or rating["global"] is None:
+        return results
+
+    mean_by_label = {lbl: s["stats"]["mean"] for lbl, s in rating["by_label"].items()}
+    return rating_charts_from_summary(mean_by_label, box_by_label(rating), report_prefix=report_prefix,
+                                      renderer=renderer)
+
+
+def rating_charts_from_summary(
+    mean_by_label: Dict[str, float],
+    box_by_label: Dict[str, Optional[Dict[str, Any]]],
+    report_prefix: str = "rating_sentiment",
+    renderer: Optional[ChartRenderer] = None,
+) -> Dict[str, Any]:
+    """Plot mean bars and boxplots of rating per label from precomputed summaries."""
+    results = {
+        "mean_bar_chart": {"report_path": None, "logged_to_mlflow": False},
+        "boxplot": {"report_path": None, "logged_to_mlflow": False},
+    }
+    if not mean_by_label:
         return results
 
-    means = df_use.groupby(label_column)[rating_column].mean().reset_index()
-    fig_mean, ax_mean = plt.subplots(figsize=(6, 4))
-    sns.barplot(data=means, x=label_column, y=rating_column,
-                palette=sentiment_palette(means[label_column].tolist()), ax=ax_mean)
-    ax_mean.set_title("Average rating by sentiment label")
-    ax_mean.set_xlabel("Label")
-    ax_mean.set_ylabel("Mean rating")
-    mean_saved = save_figure(fig_mean, "eda_rating_mean_by_label", report_prefix)
-
-    fig_box, ax_box = plt.subplots(figsize=(7, 4))
-    labels = df_use[label_column].dropna().unique().tolist()
-    sns.boxplot(data=df_use, x=label_column, y=rating_column, ax=ax_box,
-                palette=sentiment_palette(labels))
-    ax_box.set_title("Rating distribution by sentiment label")
-    ax_box.set_xlabel("Label")
-    ax_box.set_ylabel("Rating")
-    box_saved = save_figure(fig_box, "eda_rating_box_by_label", report_prefix)
+    mean_labels = list(mean_by_label.keys())
+    mean_spec = {
+        "kind": "bar",
+        "figsize": (6, 4),
+        "x": mean_labels,
+        "y": [float(v) for v in mean_by_label.values()],
+        "colors": sentiment_palette(mean_labels),
+        "title": "Average rating by sentiment label",
+        "xlabel": "Label",
+        "ylabel": "Mean rating",
+    }
+    mean_saved = save_chart(mean_spec, "eda_rating_mean_by_label", report_prefix, renderer)
+
+    labels = [lbl for lbl, stats in box_by_label.items() if stats is not None]
+    stats = [box_by_label[lbl] for lbl in labels]
+    box_spec = {
+        "kind": "box",
+        "figsize": (7, 4),
+        "labels": labels,
+        "stats": stats,
+        "colors": sentiment_palette(labels),
+        "title": "Rating distribution by sentiment label",
+        "xlabel": "Label",
+        "ylabel": "Rating",
+    }
+    box_saved = save_chart(box_spec, "eda_rating_box_by_label", report_prefix, renderer)
 
     results["mean_bar_chart"] = {"report_path": mean_saved["report_path"], "logged_to_mlflow": mean_saved["logged_to_mlflow"]}
     results["boxplot"] = {"report_path": box_saved["report_path"], "logged_to_mlflow": box_saved["logged_to_mlflow"]}
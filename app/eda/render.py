@@ -0,0 +1,304 @@
+import gc
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import mlflow
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from app.config import (
+    EDA_CHART_FORMAT,
+    EDA_FIGURE_POOL_SIZE,
+    EDA_RENDER_MAX_RSS_MB,
+    EDA_RENDER_TASKS_PER_CHILD,
+    EDA_RENDER_WORKERS,
+)
+from app.eda.utils import artifact_path_for_run, timestamped_path
+
+
+# ---------- Chart specs ----------
+# A chart spec is a small, picklable dict holding only plot-ready data:
+#   kind="bar":       x, y, colors, optional annotations / rotate_xticks / grid
+#   kind="box":       labels, stats (per-label q1/med/q3/whislo/whishi/fliers), colors
+#   kind="wordcloud": frequencies
+# plus the shared keys figsize, title, xlabel, ylabel.
+# In "spec" format the spec itself is the chart artifact (`<name>_<ts>.spec.json`)
+# and the client draws it; a PNG is only produced when a raster is requested.
+CHART_FORMATS = ("png", "spec")
+SPEC_SUFFIX = ".spec.json"
+
+def _draw_bar(ax, spec: Dict[str, Any]):
+    bars = ax.bar(range(len(spec["x"])), spec["y"], color=spec.get("colors"), width=0.8)
+    ax.set_xticks(range(len(spec["x"])))
+    ax.set_xticklabels([str(x) for x in spec["x"]])
+    if spec.get("rotate_xticks"):
+        ax.tick_params(axis="x", rotation=spec["rotate_xticks"])
+    if spec.get("grid"):
+        ax.grid(axis="y", linestyle="--", alpha=0.4)
+    for bar, text in zip(bars, spec.get("annotations") or []):
+        ax.annotate(
+            text,
+            (bar.get_x() + bar.get_width() / 2., bar.get_height()),
+            ha="center",
+            va="bottom",
+        )
+
+
+def _draw_box(ax, spec: Dict[str, Any]):
+    stats = [dict(s, label=str(lbl)) for lbl, s in zip(spec["labels"], spec["stats"])]
+    if not stats:
+        return
+    boxes = ax.bxp(stats, patch_artist=True, widths=0.6)
+    for patch, color in zip(boxes["boxes"], spec.get("colors") or []):
+        patch.set_facecolor(color)
+
+
+def _draw_wordcloud(ax, spec: Dict[str, Any]):
+    from wordcloud import WordCloud
+
+    wc = WordCloud(width=800, height=400, background_color="white", colormap="viridis")
+    wc.generate_from_frequencies(spec["frequencies"])
+    ax.imshow(wc, interpolation="bilinear")
+    ax.axis("off")
+
+
+CHART_DRAWERS = {
+    "bar": _draw_bar,
+    "box": _draw_box,
+    "wordcloud": _draw_wordcloud,
+}
+
+
+# ---------- Figure lifecycle ----------
+# Figures are plain Agg-backed `Figure` objects and never enter pyplot's global
+# registry, so nothing outlives a render even if a caller forgets plt.close().
+class FigurePool:
+    """Reusable canvases keyed by figsize; a released figure is cleared and kept for the next chart."""
+
+    def __init__(self, max_size: int = EDA_FIGURE_POOL_SIZE):
+        self.max_size = max_size
+        self._free: Dict[Tuple[float, float], List[Figure]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self, figsize) -> Iterator[Figure]:
+        key = tuple(float(v) for v in figsize)
+        with self._lock:
+            free = self._free.get(key)
+            fig = free.pop() if free else None
+        if fig is None:
+            fig = Figure(figsize=key)
+            FigureCanvasAgg(fig)
+        try:
+            yield fig
+        finally:
+            fig.clf()
+            with self._lock:
+                if self.size < self.max_size:
+                    self._free.setdefault(key, []).append(fig)
+
+    @property
+    def size(self) -> int:
+        return sum(len(figs) for figs in self._free.values())
+
+    def clear(self):
+        with self._lock:
+            self._free.clear()
+
+
+_figure_pool = FigurePool()
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def enforce_memory_ceiling(max_rss_mb: int = EDA_RENDER_MAX_RSS_MB) -> bool:
+    """Drop pooled canvases and collect garbage once RSS exceeds the ceiling (0 disables). Returns True if it fired."""
+    if max_rss_mb <= 0 or current_rss_mb() <= max_rss_mb:
+        return False
+    _figure_pool.clear()
+    gc.collect()
+    return True
+
+
+def _draw_on(fig: Figure, spec: Dict[str, Any]):
+    drawer = CHART_DRAWERS.get(spec.get("kind"))
+    if drawer is None:
+        raise ValueError(f"Unknown chart kind: {spec.get('kind')}")
+    ax = fig.subplots()
+    drawer(ax, spec)
+    ax.set_title(spec.get("title", ""))
+    if spec.get("kind") != "wordcloud":
+        ax.set_xlabel(spec.get("xlabel", ""))
+        ax.set_ylabel(spec.get("ylabel", ""))
+
+
+def draw_chart(spec: Dict[str, Any]) -> Figure:
+    """Build a standalone matplotlib figure from a chart spec (not registered with pyplot)."""
+    fig = Figure(figsize=tuple(spec.get("figsize", (7, 4))))
+    FigureCanvasAgg(fig)
+    _draw_on(fig, spec)
+    return fig
+
+
+# Worker entrypoint: draw the spec on a pooled canvas, write the PNG and release it.
+def rasterize_chart(spec: Dict[str, Any], img_path: str) -> str:
+    with _figure_pool.figure(spec.get("figsize", (7, 4))) as fig:
+        _draw_on(fig, spec)
+        fig.tight_layout()
+        fig.savefig(img_path)
+    enforce_memory_ceiling()
+    return img_path
+
+
+def write_chart_spec(spec: Dict[str, Any], spec_path: str) -> str:
+    with open(spec_path, "w", encoding="utf-8") as f:
+        json.dump(spec, f, ensure_ascii=False, separators=(",", ":"), default=str)
+    return spec_path
+
+
+def png_path_for_spec(spec_path: str) -> Path:
+    return Path(str(spec_path)[:-len(SPEC_SUFFIX)] + ".png")
+
+
+def ensure_png(report_path: str) -> str:
+    """Lazily rasterize a chart spec file next to it; PNG report paths are returned as-is."""
+    if not str(report_path).endswith(SPEC_SUFFIX):
+        return str(report_path)
+    img_path = png_path_for_spec(report_path)
+    if not img_path.exists() or img_path.stat().st_mtime < Path(report_path).stat().st_mtime:
+        with open(report_path, encoding="utf-8") as f:
+            rasterize_chart(json.load(f), str(img_path))
+    return str(img_path)
+
+
+def _chart_paths(base_name: str, report_prefix: str, chart_format: str) -> Tuple[str, Path]:
+    if chart_format not in CHART_FORMATS:
+        raise ValueError(f"Unknown chart format: {chart_format}. Expected one of {CHART_FORMATS}")
+    timestamp, img_path = timestamped_path(base_name, report_prefix, "png")
+    if chart_format == "spec":
+        return timestamp, img_path.with_name(img_path.stem + SPEC_SUFFIX)
+    return timestamp, img_path
+
+
+def _log_chart(img_path: Path, run):
+    artifact_path = artifact_path_for_run(run)
+    if artifact_path:
+        mlflow.log_artifact(str(img_path), artifact_path=artifact_path)
+    else:
+        mlflow.log_artifact(str(img_path))
+
+
+# ---------- Scheduler ----------
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _get_pool(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Reuse one spawn-based pool per process; forking the threaded server is unsafe.
+    Workers are replaced after EDA_RENDER_TASKS_PER_CHILD charts so their heaps can't grow forever.
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != max_workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=EDA_RENDER_TASKS_PER_CHILD or None,
+        )
+        _pool_workers = max_workers
+    return _pool
+
+
+def shutdown_pool():
+    """Stop the render workers (they are recreated on the next parallel render)."""
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+    _pool, _pool_workers = None, 0
+
+
+class ChartRenderer:
+    """
+    Collects chart specs while the EDA aggregates are computed and rasterizes
+    them in a process pool. Paths are assigned at submit time so callers can
+    build their payloads immediately; files exist once `wait()` returns.
+    With chart_format="spec" only the JSON specs are written, and PNGs are
+    rasterized just for MLflow logging when a run is active.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chart_format: Optional[str] = None):
+        self.max_workers = EDA_RENDER_WORKERS if max_workers is None else max_workers
+        self.chart_format = chart_format or EDA_CHART_FORMAT
+        self._pending: List[Tuple[Dict[str, Any], Path]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.wait()
+        else:
+            self._pending.clear()
+        return False
+
+    def submit(self, spec: Dict[str, Any], base_name: str, report_prefix: str) -> Dict[str, Any]:
+        timestamp, chart_path = _chart_paths(base_name, report_prefix, self.chart_format)
+        self._pending.append((spec, chart_path))
+        return {"report_path": str(chart_path), "logged_to_mlflow": mlflow.active_run() is not None,
+                "generated_at": timestamp, "format": self.chart_format}
+
+    def wait(self):
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        run = mlflow.active_run()
+        if self.chart_format == "spec":
+            for spec, spec_path in pending:
+                write_chart_spec(spec, str(spec_path))
+            if run is None:
+                return
+            # a raster is only needed for the MLflow artifact
+            pending = [(spec, png_path_for_spec(str(spec_path))) for spec, spec_path in pending]
+
+        if self.max_workers <= 1 or len(pending) == 1:
+            for spec, img_path in pending:
+                rasterize_chart(spec, str(img_path))
+        else:
+            pool = _get_pool(self.max_workers)
+            futures = [pool.submit(rasterize_chart, spec, str(img_path)) for spec, img_path in pending]
+            for fut in futures:
+                fut.result()
+
+        # mlflow logging stays in the parent, where the active run lives
+        if run is not None:
+            for _, img_path in pending:
+                _log_chart(img_path, run)
+        if enforce_memory_ceiling():
+            shutdown_pool()
+
+
+def save_chart(spec: Dict[str, Any], base_name: str, report_prefix: str,
+               renderer: Optional[ChartRenderer] = None) -> Dict[str, Any]:
+    """Render a chart spec now, or queue it on `renderer` when one is given."""
+    if renderer is not None:
+        return renderer.submit(spec, base_name, report_prefix)
+    renderer = ChartRenderer(max_workers=1)
+    saved = renderer.submit(spec, base_name, report_prefix)
+    renderer.wait()
+    return saved
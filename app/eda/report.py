@@ -0,0 +1,97 @@
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from app.config import REVIEW_COLUMN, TARGET_COULUM
+from app.eda.aggregate import aggregate_eda
+from app.eda.duplicates import duplicate_review_charts, duplicate_review_eda
+from app.eda.overview import overview_eda, sentiment_bar_chart
+from app.eda.rating import rating_vs_sentiment_charts, rating_vs_sentiment_eda
+from app.eda.render import ChartRenderer
+from app.eda.sentiment_brand import sentiment_brand_charts, sentiment_brand_eda
+from app.eda.text_length import text_length_charts, text_length_eda
+from app.eda.word_freq import word_cloud_charts, word_frequency_charts, word_frequency_eda
+
+
+def eda_reports(
+    df: pd.DataFrame,
+    label_column: str = TARGET_COULUM,
+    report_prefix: str = "eda",
+    top_n: int = 20,
+    chart_top_n: int = 10,
+    near_duplicates: bool = False,
+    chart_format: Optional[str] = None,
+    renderer: Optional[ChartRenderer] = None,
+) -> Dict[str, Any]:
+    """
+    Run every EDA report and chart on an in-memory frame (no caching or uploads).
+    Charts are queued on `renderer` when one is given; the caller then waits on it.
+    """
+    # Shallow copy: the EDA helpers add derived columns, which must not change the caller's frame (or its fingerprint)
+    df = df.copy(deep=False)
+
+    # One fused grouped pass feeds the label / length / rating / brand reports and charts;
+    # chart functions only reduce to small plot-ready specs and the renderer rasterizes them.
+    aggregates = aggregate_eda(df, label_column=label_column, review_column=REVIEW_COLUMN,
+                               rating_column="rating", brand_column="brand", length_column="text_length_chars")
+
+    overview_payload = overview_eda(df=df, label_column=label_column, review_column=REVIEW_COLUMN,
+                                    rating_column="rating", report_prefix=report_prefix, length_column="text_length_chars",
+                                    aggregates=aggregates)
+
+    text_len = text_length_eda(df=df, review_column=REVIEW_COLUMN, label_column=label_column,
+                               length_column="text_length_chars", report_prefix=report_prefix, aggregates=aggregates)
+
+    word_freq = word_frequency_eda(df=df, review_column=REVIEW_COLUMN, label_column=label_column,
+                                   report_prefix=report_prefix, top_n=top_n)
+
+    duplicates_summary = duplicate_review_eda(df=df, review_column=REVIEW_COLUMN,
+                                              report_prefix=report_prefix, near_duplicates=near_duplicates)
+
+    rating_eda = rating_vs_sentiment_eda(df=df, rating_column="rating", label_column=label_column,
+                                         report_prefix=report_prefix, aggregates=aggregates)
+
+    brand_eda = sentiment_brand_eda(df=df, brand_column="brand", label_column=label_column,
+                                    report_prefix=report_prefix, aggregates=aggregates)
+
+    owns_renderer = renderer is None
+    renderer = renderer or ChartRenderer(chart_format=chart_format)
+    sentiment = sentiment_bar_chart(label_summary=overview_payload.get("label_summary", {}),
+                                    report_prefix=report_prefix, renderer=renderer)
+
+    text_len_charts = text_length_charts(df=df, review_column=REVIEW_COLUMN, label_column=label_column,
+                                         length_column="text_length_chars", report_prefix=report_prefix,
+                                         renderer=renderer, aggregates=aggregates)
+
+    word_freq_charts = word_frequency_charts(freq_payload=word_freq, report_prefix=report_prefix, top_n=chart_top_n,
+                                             renderer=renderer)
+
+    word_cloud = word_cloud_charts(freq_payload=word_freq, report_prefix=report_prefix, renderer=renderer)
+
+    duplicates_charts = duplicate_review_charts(summary_payload=duplicates_summary, report_prefix=report_prefix,
+                                                renderer=renderer)
+
+    rating_charts = rating_vs_sentiment_charts(df=df, rating_column="rating", label_column=label_column,
+                                               report_prefix=report_prefix, renderer=renderer, aggregates=aggregates)
+
+    brand_charts = sentiment_brand_charts(df=df, brand_column="brand", label_column=label_column,
+                                          report_prefix=report_prefix, renderer=renderer, aggregates=aggregates)
+    if owns_renderer:
+        renderer.wait()
+
+    result = {
+        "overview": overview_payload,
+        "sentiment_chart": sentiment,
+        "text_length_overview": text_len,
+        "text_length_charts": text_len_charts,
+        "word_frequency_overview": word_freq,
+        "word_frequency_charts": word_freq_charts,
+        "word_clouds": word_cloud,
+        "duplicates_summary": duplicates_summary,
+        "duplicates_charts": duplicates_charts,
+        "rating_overview": rating_eda,
+        "rating_charts": rating_charts,
+        "brand_overview": brand_eda,
+        "brand_charts": brand_charts,
+    }
+    return result
@@ -1,10 +1,12 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
-from app.eda.utils import ensure_columns, save_json_report, save_figure
+from app.eda.aggregate import aggregate_eda, label_present
+from app.eda.render import ChartRenderer, save_chart
+from app.eda.utils import categorical_palette, ensure_columns, save_json_report
+
+SENTIMENT_LABELS = ["Positive", "Negative", "Neutral"]
 
 
 def sentiment_brand_eda(
@@ -12,22 +14,19 @@ def sentiment_brand_eda(
     brand_column: str,
     label_column: str,
     report_prefix: str = "sentiment_brand",
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Summarize sentiment counts per brand and save as JSON report."""
     if df is None or df.empty:
         raise ValueError("Input dataframe is empty. Cannot run sentiment/brand EDA.")
     ensure_columns(df, [brand_column, label_column])
 
-    counts_by_sentiment: Dict[str, Dict[str, int]] = {}
-    for lbl, sub in df[[label_column, brand_column]].dropna().groupby(label_column):
-        brand_counts = sub[brand_column].value_counts()
-        counts_by_sentiment[str(lbl)] = {str(b): int(c) for b, c in brand_counts.items()}
-
+    aggregates = aggregates or aggregate_eda(df, label_column, brand_column=brand_column)
     payload = {
         "generated_at": None,  # filled by save_json_report
         "label_column": label_column,
         "brand_column": brand_column,
-        "counts_by_sentiment": counts_by_sentiment,
+        "counts_by_sentiment": aggregates["brand"]["counts_by_label"],
     }
 
     return save_json_report(payload, "eda_sentiment_brand", report_prefix)
@@ -38,45 +37,59 @@ def sentiment_brand_charts(
     brand_column: str,
     label_column: str,
     report_prefix: str = "sentiment_brand",
+    renderer: Optional[ChartRenderer] = None,
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Plot bar charts of sentiment counts per brand for each sentiment class."""
     if df is None or df.empty:
         raise ValueError("Input dataframe is empty. Cannot plot sentiment/brand charts.")
     ensure_columns(df, [brand_column, label_column])
 
+    aggregates = aggregates or aggregate_eda(df, label_column, brand_column=brand_column)
+    brand = aggregates["brand"]
+    counts_by_sentiment = {
+        sentiment: brand["counts_by_label"].get(sentiment, {})
+        for sentiment in SENTIMENT_LABELS
+        if label_present(aggregates, sentiment)
+    }
+    return sentiment_brand_charts_from_counts(counts_by_sentiment, brand["brands"],
+                                              report_prefix=report_prefix, renderer=renderer)
+
+
+def sentiment_brand_charts_from_counts(
+    counts_by_sentiment: Dict[str, Dict[str, int]],
+    brands: List[str],
+    report_prefix: str = "sentiment_brand",
+    renderer: Optional[ChartRenderer] = None,
+) -> Dict[str, Any]:
+    """Plot per-sentiment brand bar charts from a sentiment -> brand -> count crosstab."""
     results: Dict[str, Dict[str, Any]] = {}
-    sentiment_labels = ["Positive", "Negative", "Neutral"]
-    brands = sorted(df[brand_column].dropna().astype(str).unique().tolist())
     if not brands:
         return {
             "positive_chart": {"report_path": None, "logged_to_mlflow": False},
             "negative_chart": {"report_path": None, "logged_to_mlflow": False},
             "neutral_chart": {"report_path": None, "logged_to_mlflow": False},
         }
-    brand_palette = sns.color_palette("husl", len(brands))
+    brand_palette = categorical_palette(len(brands))
 
-    for sentiment in sentiment_labels:
-        sub = df[df[label_column] == sentiment]
-        if sub.empty:
+    for sentiment in SENTIMENT_LABELS:
+        if sentiment not in counts_by_sentiment:
             results[f"{sentiment.lower()}_chart"] = {"report_path": None, "logged_to_mlflow": False}
             continue
-        counts = (
-            sub[brand_column]
-            .astype(str)
-            .value_counts()
-            .reindex(brands, fill_value=0)
-            .reset_index()
-        )
-        counts.columns = ["brand", "count"]
+        counts = counts_by_sentiment[sentiment]
 
-        fig, ax = plt.subplots(figsize=(7, 4))
-        sns.barplot(data=counts, x="brand", y="count", palette=brand_palette, ax=ax, order=brands)
-        ax.set_title(f"{sentiment} sentiment per brand")
-        ax.set_xlabel("Brand")
-        ax.set_ylabel("Count")
-        ax.tick_params(axis="x", rotation=45)
-
-        saved = save_figure(fig, f"eda_sentiment_brand_{sentiment.lower()}", report_prefix)
+        spec = {
+            "kind": "bar",
+            "figsize": (7, 4),
+            "x": brands,
+            "y": [int(counts.get(b, 0)) for b in brands],
+            "colors": brand_palette,
+            "rotate_xticks": 45,
+            "title": f"{sentiment} sentiment per brand",
+            "xlabel": "Brand",
+            "ylabel": "Count",
+        }
+        saved = save_chart(spec, f"eda_sentiment_brand_{sentiment.lower()}", report_prefix, renderer)
         results[f"{sentiment.lower()}_chart"] = {
             "report_path": saved["report_path"],
             "logged_to_mlflow": saved["logged_to_mlflow"],
@@ -0,0 +1,97 @@
+"""
+Soak benchmark for EDA inside a long-running process.
+
+Runs the full EDA (reports + charts) repeatedly on synthetic reviews and
+checks that resident memory stays flat once warmed up:
+
+    python -m app.eda.soak --iterations 50 --rows 5000 --tolerance-mb 25
+
+Exits non-zero when RSS grows more than the tolerance after warm-up.
+"""
+import argparse
+import gc
+import json
+import sys
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from app.eda.render import ChartRenderer, current_rss_mb, shutdown_pool
+from app.eda.report import eda_reports
+from app.eda.utils import report_paths
+
+_WORDS = ("battery camera screen price fast slow great bad love hate charge display "
+          "sound value okay phone quality broken perfect delivery").split()
+_BRANDS = ["Apple", "Samsung", "Xiaomi", "Oppo", "Vivo", "Realme"]
+_SENTIMENTS = ["Positive", "Negative", "Neutral"]
+
+
+def synthetic_reviews(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(3, 30, size=rows)
+    words = rng.choice(_WORDS, size=int(lengths.sum()))
+    texts = [" ".join(chunk) for chunk in np.split(words, np.cumsum(lengths)[:-1])]
+    return pd.DataFrame({
+        "review_text": texts,
+        "sentiment": rng.choice(_SENTIMENTS, size=rows, p=[0.5, 0.3, 0.2]),
+        "brand": rng.choice(_BRANDS, size=rows),
+        "rating": rng.integers(1, 6, size=rows).astype(float),
+    })
+
+
+def soak(iterations: int = 50, rows: int = 5000, warmup: int = 5, workers: int = 1,
+         tolerance_mb: float = 25.0, keep_files: bool = False) -> Dict[str, Any]:
+    """Run EDA `iterations` times and report RSS after each run."""
+    df = synthetic_reviews(rows)
+    samples = []
+    for i in range(iterations):
+        renderer = ChartRenderer(max_workers=workers)
+        result = eda_reports(df, report_prefix=f"soak_{i}", renderer=renderer)
+        renderer.wait()
+        if not keep_files:
+            for path in report_paths(result):
+                path.unlink(missing_ok=True)
+        del result
+        gc.collect()
+        samples.append(current_rss_mb())
+    shutdown_pool()
+
+    baseline = samples[min(warmup, iterations) - 1]
+    steady = samples[warmup:] or samples
+    slope = float(np.polyfit(np.arange(len(steady)), steady, 1)[0]) if len(steady) > 1 else 0.0
+    growth = max(steady) - baseline
+    return {
+        "iterations": iterations,
+        "rows": rows,
+        "workers": workers,
+        "baseline_rss_mb": round(baseline, 1),
+        "final_rss_mb": round(samples[-1], 1),
+        "max_growth_mb": round(growth, 1),
+        "slope_mb_per_iteration": round(slope, 3),
+        "tolerance_mb": tolerance_mb,
+        "passed": growth <= tolerance_mb,
+        "rss_mb": [round(s, 1) for s in samples],
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Run EDA repeatedly and assert RSS stays flat.")
+    p.add_argument("--iterations", type=int, default=50)
+    p.add_argument("--rows", type=int, default=5000)
+    p.add_argument("--warmup", type=int, default=5, help="Runs excluded from the growth check")
+    p.add_argument("--workers", type=int, default=1, help="Render workers; 1 renders in this process")
+    p.add_argument("--tolerance-mb", type=float, default=25.0)
+    p.add_argument("--keep-files", action="store_true", help="Keep the generated reports")
+    args = p.parse_args()
+
+    summary = soak(args.iterations, args.rows, args.warmup, args.workers, args.tolerance_mb, args.keep_files)
+    print(json.dumps(summary, indent=2))
+    if not summary["passed"]:
+        print(f"RSS grew {summary['max_growth_mb']} MB after warm-up (tolerance {args.tolerance_mb} MB)",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,734 @@
+import base64
+import json
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import DUPLICATE_SKETCH_CAPACITY, DUPLICATE_TOP_K, REVIEW_COLUMN, TARGET_COULUM
+from app.eda.duplicates import duplicate_review_charts
+from app.eda.overview import sentiment_bar_chart
+from app.eda.rating import rating_charts_from_summary
+from app.eda.render import ChartRenderer
+from app.eda.sentiment_brand import SENTIMENT_LABELS, sentiment_brand_charts_from_counts
+from app.eda.text_length import text_length_box_chart
+from app.eda.utils import (
+    box_stats_from_counts,
+    ensure_columns,
+    numeric_stats_from_moments,
+    save_json_report,
+    text_hashes,
+    tokenize,
+)
+from app.eda.word_freq import word_cloud_charts, word_frequency_charts
+
+STATE_VERSION = 4
+WORD_SKETCH_CAPACITY = 5000
+DUPLICATE_EXAMPLES = 1000
+
+
+# ---------- Mergeable building blocks ----------
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """64-bit hashes of full rows; numeric columns are widened so chunk dtype inference doesn't matter."""
+    normalized = df.copy(deep=False)
+    for col in normalized.columns:
+        if pd.api.types.is_numeric_dtype(normalized[col]) and not pd.api.types.is_bool_dtype(normalized[col]):
+            normalized[col] = normalized[col].astype("float64")
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy(dtype=np.uint64)
+
+
+class HashSketch:
+    """
+    Duplicate counts and first-seen row over 64-bit hashes: exact (24 bytes per distinct value) when
+    capacity is None, otherwise a mergeable SpaceSaving summary plus a HyperLogLog of distinct values.
+    """
+
+    HLL_BITS = 14
+
+    def __init__(self, capacity: Optional[int] = DUPLICATE_SKETCH_CAPACITY, keys: Optional[np.ndarray] = None,
+                 counts: Optional[np.ndarray] = None, errors: Optional[np.ndarray] = None, truncated: bool = False,
+                 total: int = 0, registers: Optional[np.ndarray] = None, first: Optional[np.ndarray] = None):
+        self.capacity = capacity
+        self.keys = keys if keys is not None else np.empty(0, dtype=np.uint64)
+        self.counts = counts if counts is not None else np.empty(0, dtype=np.int64)
+        # row ordinal of each key's first sighting, to order ties like the in-memory report
+        self.first = first if first is not None else np.empty(0, dtype=np.int64)
+        # per-key over-estimate; stays empty while nothing was evicted
+        self.errors = errors if errors is not None else np.empty(0, dtype=np.int64)
+        self.truncated = truncated
+        self.total = total
+        self.registers = registers if registers is not None else np.zeros(1 << self.HLL_BITS, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray):
+        if hashes.size == 0:
+            return
+        self._observe(hashes)
+        new_keys, first_idx, new_counts = np.unique(hashes, return_index=True, return_counts=True)
+        self._add(new_keys, new_counts.astype(np.int64), np.empty(0, dtype=np.int64), 0, self.total + first_idx)
+        self.total += int(hashes.size)
+
+    def merge(self, other: "HashSketch"):
+        """Combine with a sketch of the rows that follow this one's."""
+        self.registers = np.maximum(self.registers, other.registers)
+        self._add(other.keys, other.counts, other.errors, other.floor, self.total + other.first)
+        self.total += other.total
+        self.truncated = self.truncated or other.truncated
+
+    @property
+    def floor(self) -> int:
+        """Upper bound on the count of a hash that is not kept (0 until something was evicted)."""
+        return int(self.counts.min()) if self.truncated and self.counts.size else 0
+
+    def _observe(self, hashes: np.ndarray):
+        low_bits = 64 - self.HLL_BITS
+        idx = (hashes >> np.uint64(low_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << low_bits) - 1)
+        rank = np.full(hashes.size, low_bits + 1, dtype=np.uint8)
+        nonzero = rest > 0
+        rank[nonzero] = low_bits - np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    @staticmethod
+    def _padded(errors: np.ndarray, size: int) -> np.ndarray:
+        return errors if errors.size else np.zeros(size, dtype=np.int64)
+
+    def _add(self, new_keys: np.ndarray, new_counts: np.ndarray, new_errors: np.ndarray, new_floor: int,
+             new_first: np.ndarray):
+        own_floor, own_size = self.floor, self.keys.size
+        keys, inverse = np.unique(np.concatenate([self.keys, new_keys]), return_inverse=True)
+        counts = np.zeros(keys.size, dtype=np.int64)
+        np.add.at(counts, inverse, np.concatenate([self.counts, new_counts]))
+        first = np.full(keys.size, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first, inverse, np.concatenate([self.first, new_first.astype(np.int64)]))
+        errors = np.empty(0, dtype=np.int64)
+        if self.capacity is not None:
+            errors = np.zeros(keys.size, dtype=np.int64)
+            np.add.at(errors, inverse, np.concatenate([self._padded(self.errors, own_size),
+                                                       self._padded(new_errors, new_keys.size)]))
+            # SpaceSaving merge: a key missing on one side may have been evicted there with up to its floor
+            for floor, side in ((own_floor, inverse[:own_size]), (new_floor, inverse[own_size:])):
+                if floor:
+                    missing = np.ones(keys.size, dtype=bool)
+                    missing[side] = False
+                    counts[missing] += floor
+                    errors[missing] += floor
+            if keys.size > self.capacity:
+                keep = np.sort(np.argsort(-counts, kind="stable")[:self.capacity])
+                keys, counts, errors, first = keys[keep], counts[keep], errors[keep], first[keep]
+                self.truncated = True
+        self.keys, self.counts, self.errors, self.first = keys, counts, errors, first
+
+    def _lookup(self, hashes: np.ndarray, values: np.ndarray, missing: int) -> np.ndarray:
+        if self.keys.size == 0:
+            return np.full(hashes.size, missing, dtype=np.int64)
+        idx = np.minimum(np.searchsorted(self.keys, hashes), self.keys.size - 1)
+        return np.where(self.keys[idx] == hashes, values[idx], missing)
+
+    def get(self, hashes: np.ndarray) -> np.ndarray:
+        """Count for each hash (0 when unseen; an over-estimate once not exact)."""
+        return self._lookup(hashes, self.counts, 0)
+
+    def first_seen(self, hashes: np.ndarray) -> np.ndarray:
+        """Row ordinal where each hash was first seen (int64 max when unseen)."""
+        return self._lookup(hashes, self.first, np.iinfo(np.int64).max)
+
+    @property
+    def exact(self) -> bool:
+        return not self.truncated
+
+    @property
+    def distinct(self) -> int:
+        if self.exact:
+            return int(self.keys.size)
+        m = self.registers.size
+        zeros = int((self.registers == 0).sum())
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / float(np.power(2.0, -self.registers.astype(float)).sum())
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(min(max(round(estimate), self.keys.size), self.total))
+
+    def duplicates(self) -> Dict[str, int]:
+        """Values seen more than once and the rows they cover (guaranteed lower bounds once not exact)."""
+        guaranteed = self.counts - self._padded(self.errors, self.counts.size)
+        repeated = guaranteed[guaranteed > 1]
+        return {"values": int(repeated.size), "rows": int(repeated.sum())}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "truncated": self.truncated,
+            "total": self.total,
+            "keys": base64.b64encode(self.keys.astype("<u8").tobytes()).decode("ascii"),
+            "counts": base64.b64encode(self.counts.astype("<i8").tobytes()).decode("ascii"),
+            "errors": base64.b64encode(self.errors.astype("<i8").tobytes()).decode("ascii"),
+            "first": base64.b64encode(self.first.astype("<i8").tobytes()).decode("ascii"),
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HashSketch":
+        decode = lambda key, dtype: np.frombuffer(base64.b64decode(data[key]), dtype=dtype).copy()
+        return cls(capacity=data["capacity"], keys=decode("keys", "<u8").astype(np.uint64),
+                   counts=decode("counts", "<i8").astype(np.int64), errors=decode("errors", "<i8").astype(np.int64),
+                   first=decode("first", "<i8").astype(np.int64),
+                   truncated=data["truncated"], total=data["total"], registers=decode("registers", np.uint8))
+
+
+class HeavyHitters:
+    """Mergeable SpaceSaving top-k counts (exact when capacity is None); each count over-estimates by its `errors`."""
+
+    def __init__(self, capacity: Optional[int] = WORD_SKETCH_CAPACITY, counts: Optional[Dict[str, int]] = None,
+                 errors: Optional[Dict[str, int]] = None, truncated: bool = False):
+        self.capacity = capacity
+        self.counts: Counter = Counter(counts or {})
+        self.errors: Dict[str, int] = dict(errors or {})
+        self.truncated = truncated
+
+    def update(self, counts: Dict[str, int]):
+        self._add(counts, {}, 0)
+
+    def merge(self, other: "HeavyHitters"):
+        self._add(other.counts, other.errors, other.floor)
+        self.truncated = self.truncated or other.truncated
+
+    @property
+    def floor(self) -> int:
+        """Upper bound on the count of an item that is not kept (0 until something was evicted)."""
+        return min(self.counts.values()) if self.truncated and self.counts else 0
+
+    def _add(self, counts: Dict[str, int], errors: Dict[str, int], floor: int):
+        own_floor, mine = self.floor, set(self.counts)
+        if floor:
+            for item in mine.difference(counts):
+                self.counts[item] += floor
+                self.errors[item] = self.errors.get(item, 0) + floor
+        for item, c in counts.items():
+            missed = own_floor if item not in mine else 0
+            self.counts[item] += int(c) + missed
+            error = errors.get(item, 0) + missed
+            if error:
+                self.errors[item] = self.errors.get(item, 0) + error
+        self._truncate()
+
+    def _truncate(self):
+        if self.capacity is None or len(self.counts) <= self.capacity:
+            return
+        self.counts = Counter(dict(self.counts.most_common(self.capacity)))
+        self.errors = {k: e for k, e in self.errors.items() if k in self.counts}
+        self.truncated = True
+
+    def top(self, n: int):
+        return self.counts.most_common(n)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"capacity": self.capacity, "truncated": self.truncated, "counts": dict(self.counts),
+                "errors": self.errors}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HeavyHitters":
+        return cls(capacity=data["capacity"], counts=data["counts"], errors=data["errors"],
+                   truncated=data["truncated"])
+
+
+class NumericSummary:
+    """Mergeable moments (count, mean, M2, min, max) plus a unit-bin value histogram for quantiles."""
+
+    def __init__(self, moments: Optional[Dict[str, Any]] = None, histogram: Optional[Dict[float, int]] = None):
+        self.moments = moments or {"count": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None}
+        self.histogram: Dict[float, int] = histogram or {}
+
+    def update(self, values: pd.Series):
+        values = pd.to_numeric(values, errors="coerce").dropna().astype(float)
+        if values.empty:
+            return
+        arr = values.to_numpy()
+        mean = float(arr.mean())
+        batch = {"count": int(arr.size), "mean": mean, "m2": float(((arr - mean) ** 2).sum()),
+                 "min": float(arr.min()), "max": float(arr.max())}
+        self._merge_moments(batch)
+        for v, c in values.value_counts().items():
+            self.histogram[float(v)] = self.histogram.get(float(v), 0) + int(c)
+
+    def merge(self, other: "NumericSummary"):
+        if other.moments["count"]:
+            self._merge_moments(other.moments)
+        for v, c in other.histogram.items():
+            self.histogram[v] = self.histogram.get(v, 0) + c
+
+    def _merge_moments(self, other: Dict[str, Any]):
+        a, b = self.moments, other
+        n = a["count"] + b["count"]
+        delta = b["mean"] - a["mean"]
+        self.moments = {
+            "count": n,
+            "mean": a["mean"] + delta * b["count"] / n,
+            "m2": a["m2"] + b["m2"] + delta * delta * a["count"] * b["count"] / n,
+            "min": b["min"] if a["min"] is None else min(a["min"], b["min"]),
+            "max": b["max"] if a["max"] is None else max(a["max"], b["max"]),
+        }
+
+    def _sorted_histogram(self):
+        values = np.array(sorted(self.histogram), dtype=float)
+        counts = np.array([self.histogram[v] for v in values], dtype=np.int64)
+        return values, counts
+
+    @property
+    def count(self) -> int:
+        return int(self.moments["count"])
+
+    def stats(self) -> Dict[str, Any]:
+        values, counts = self._sorted_histogram()
+        return numeric_stats_from_moments(self.moments, values, counts)
+
+    def box(self) -> Optional[Dict[str, Any]]:
+        values, counts = self._sorted_histogram()
+        return box_stats_from_counts(values, counts)
+
+    def value_counts(self) -> Dict[str, int]:
+        return {str(v): int(self.histogram[v]) for v in sorted(self.histogram)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"moments": self.moments, "histogram": [[v, c] for v, c in sorted(self.histogram.items())]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NumericSummary":
+        return cls(moments=dict(data["moments"]), histogram={float(v): int(c) for v, c in data["histogram"]})
+
+
+def _merge_counts(target: Dict[str, int], source: Dict[str, int]):
+    for k, v in source.items():
+        target[k] = target.get(k, 0) + int(v)
+
+
+def _merge_dtype(a: str, b: str) -> str:
+    if a == b:
+        return a
+    try:
+        da, db = np.dtype(a), np.dtype(b)
+        if da.kind in "biuf" and db.kind in "biuf":
+            return str(np.result_type(da, db))
+    except TypeError:
+        pass
+    return "object"
+
+
+# ---------- EDA state ----------
+class EdaState:
+    """Mergeable EDA statistics: `update` folds a batch, `merge` combines states, `build_eda_reports` reports."""
+
+    def __init__(
+        self,
+        label_column: str = TARGET_COULUM,
+        review_column: str = REVIEW_COLUMN,
+        rating_column: str = "rating",
+        brand_column: str = "brand",
+        length_column: str = "text_length_chars",
+        exact: bool = False,
+    ):
+        self.label_column = label_column
+        self.review_column = review_column
+        self.rating_column = rating_column
+        self.brand_column = brand_column
+        self.length_column = length_column
+        # exact keeps every hash and word count (out-of-core runs); otherwise the configured sketches
+        self.exact = exact
+
+        self.sources: List[str] = []
+        self.rows = 0
+        self.dtypes: Dict[str, str] = {}
+        self.missing: Dict[str, int] = {}
+
+        self.label_counts: Dict[str, int] = {}
+        self.row_hashes = self._hash_sketch()
+        self.review_hashes = self._hash_sketch()
+        self.duplicate_examples: Dict[str, int] = {}
+
+        self.length_global = NumericSummary()
+        self.length_by_label: Dict[str, NumericSummary] = {}
+
+        self.rating_outliers = 0
+        self.rating_global = NumericSummary()
+        self.rating_by_label: Dict[str, NumericSummary] = {}
+
+        self.brand_totals: Dict[str, int] = {}
+        self.brand_by_label: Dict[str, Dict[str, int]] = {}
+
+        self.words_by_label: Dict[str, HeavyHitters] = {}
+
+    def _hash_sketch(self) -> HashSketch:
+        return HashSketch(capacity=None) if self.exact else HashSketch()
+
+    def _word_sketch(self) -> HeavyHitters:
+        return HeavyHitters(capacity=None) if self.exact else HeavyHitters()
+
+    # ----- folding -----
+    def update(self, df: pd.DataFrame, source: Optional[str] = None) -> "EdaState":
+        """Fold one batch of rows into the state."""
+        if df is None or df.empty:
+            return self
+        ensure_columns(df, [self.review_column])
+        if source is not None:
+            if source in self.sources:
+                return self
+            self.sources.append(source)
+
+        for col in df.columns:
+            dtype = str(df[col].dtype)
+            self.dtypes[str(col)] = _merge_dtype(self.dtypes[str(col)], dtype) if str(col) in self.dtypes else dtype
+        self.rows += int(len(df))
+
+        has_label = self.label_column in df.columns
+        labels = df[self.label_column] if has_label else pd.Series(np.nan, index=df.index)
+        reviews = df[self.review_column]
+
+        self.missing["review"] = self.missing.get("review", 0) + int(reviews.isna().sum())
+        if has_label:
+            self.missing["label"] = self.missing.get("label", 0) + int(labels.isna().sum())
+            _merge_counts(self.label_counts, {str(k): int(v) for k, v in labels.value_counts(dropna=False).items()})
+
+        # duplicates: bounded hash sketches, examples kept as a top-k of repeated texts
+        self.row_hashes.update(row_hashes(df))
+        texts = reviews.astype(str)
+        hashes = text_hashes(texts)
+        self.review_hashes.update(hashes)
+        batch_texts = pd.Series(hashes, index=texts.values)
+        batch_texts = batch_texts[~batch_texts.index.duplicated()]
+        self._refresh_duplicate_examples(batch_texts.index.tolist(), batch_texts.to_numpy())
+
+        # text length
+        if self.length_column in df.columns:
+            lengths = df[self.length_column]
+        else:
+            lengths = reviews.fillna("").astype(str).str.len()
+        self.length_global.update(lengths)
+        for lbl, sub in lengths.groupby(labels, sort=False):
+            self.length_by_label.setdefault(str(lbl), NumericSummary()).update(sub)
+
+        # rating
+        if self.rating_column in df.columns:
+            raw = df[self.rating_column]
+            numeric = pd.to_numeric(raw, errors="coerce")
+            self.rating_outliers += int((raw.notna() & ~numeric.between(1, 5)).sum())
+            self.rating_global.update(numeric)
+            if has_label:
+                for lbl, sub in numeric.dropna().groupby(labels, sort=False):
+                    self.rating_by_label.setdefault(str(lbl), NumericSummary()).update(sub)
+
+        # brand x label crosstab
+        if self.brand_column in df.columns:
+            brands = df[self.brand_column]
+            _merge_counts(self.brand_totals, {str(b): int(c) for b, c in brands.dropna().astype(str).value_counts().items()})
+            if has_label:
+                pairs = pd.DataFrame({"label": labels, "brand": brands}).dropna()
+                for (lbl, brand), c in pairs.groupby(["label", "brand"], sort=False).size().items():
+                    by_brand = self.brand_by_label.setdefault(str(lbl), {})
+                    by_brand[str(brand)] = by_brand.get(str(brand), 0) + int(c)
+
+        # top words per label
+        if has_label:
+            for lbl, sub in reviews.dropna().groupby(labels, sort=False):
+                counter = Counter()
+                for text in sub:
+                    counter.update(tokenize(str(text)))
+                self.words_by_label.setdefault(str(lbl), self._word_sketch()).update(counter)
+
+        return self
+
+    def _refresh_duplicate_examples(self, texts: List[str], hashes: np.ndarray):
+        candidates = dict(self.duplicate_examples)
+        candidates.update(zip(texts, hashes.tolist()))
+        cand_texts = list(candidates.keys())
+        cand_hashes = np.array([int(h) for h in candidates.values()], dtype=np.uint64)
+        counts = self.review_hashes.get(cand_hashes)
+        first = self.review_hashes.first_seen(cand_hashes)
+        ranked = sorted(
+            ((t, int(c), int(f), int(h)) for t, c, f, h in zip(cand_texts, counts, first, cand_hashes) if c > 1),
+            key=lambda x: (-x[1], x[2]),
+        )[:DUPLICATE_EXAMPLES]
+        self.duplicate_examples = {t: h for t, _, _, h in ranked}
+
+    def merge(self, other: "EdaState") -> "EdaState":
+        """Combine with a state built from disjoint rows."""
+        self.sources.extend(s for s in other.sources if s not in self.sources)
+        self.rows += other.rows
+        for col, dtype in other.dtypes.items():
+            self.dtypes[col] = _merge_dtype(self.dtypes[col], dtype) if col in self.dtypes else dtype
+        _merge_counts(self.missing, other.missing)
+        _merge_counts(self.label_counts, other.label_counts)
+        self.row_hashes.merge(other.row_hashes)
+        self.review_hashes.merge(other.review_hashes)
+        examples = dict(other.duplicate_examples)
+        self._refresh_duplicate_examples(list(examples.keys()), np.array(list(examples.values()), dtype=np.uint64))
+
+        self.length_global.merge(other.length_global)
+        for lbl, summary in other.length_by_label.items():
+            self.length_by_label.setdefault(lbl, NumericSummary()).merge(summary)
+        self.rating_outliers += other.rating_outliers
+        self.rating_global.merge(other.rating_global)
+        for lbl, summary in other.rating_by_label.items():
+            self.rating_by_label.setdefault(lbl, NumericSummary()).merge(summary)
+
+        _merge_counts(self.brand_totals, other.brand_totals)
+        for lbl, counts in other.brand_by_label.items():
+            _merge_counts(self.brand_by_label.setdefault(lbl, {}), counts)
+        for lbl, sketch in other.words_by_label.items():
+            self.words_by_label.setdefault(lbl, HeavyHitters(sketch.capacity)).merge(sketch)
+        return self
+
+    # ----- report payloads -----
+    @property
+    def has_label(self) -> bool:
+        return self.label_column in self.dtypes
+
+    def _require(self, columns: List[str]):
+        missing = [c for c in columns if c not in self.dtypes]
+        if missing:
+            raise ValueError(f"Required columns missing: {missing}")
+
+    def overview_payload(self) -> Dict[str, Any]:
+        rows = self.rows
+        dtypes = dict(self.dtypes)
+        dtypes.setdefault(self.length_column, "int64")
+        pct = (lambda c: round((c / rows) * 100, 2) if rows else 0.0)
+
+        ordered = sorted(self.label_counts.items(), key=lambda kv: -kv[1])
+        label_summary = {
+            "label_column": self.label_column,
+            "num_classes": len(ordered),
+            "classes": [k for k, _ in ordered],
+            "counts": {k: int(v) for k, v in ordered},
+        }
+        missing_review = self.missing.get("review", 0)
+        missing_label = self.missing.get("label") if self.has_label else None
+        dup_rows = rows - self.row_hashes.distinct
+        dup_review = rows - self.review_hashes.distinct
+        duplicates = {"full_rows": {"count": dup_rows, "pct": pct(dup_rows)},
+                      "review_text": {"count": dup_review, "pct": pct(dup_review)}}
+        if not (self.row_hashes.exact and self.review_hashes.exact):
+            # only bounded sketches add the flag, so exact states match the in-memory report
+            duplicates["approximate"] = True
+
+        if self.rating_column in self.dtypes:
+            outlier_count = self.rating_outliers
+            rating_min = self.rating_global.moments["min"]
+            rating_max = self.rating_global.moments["max"]
+        else:
+            outlier_count = rating_min = rating_max = None
+
+        return {
+            "shape": {"rows": rows, "columns": len(dtypes)},
+            "dtypes": [{"column": col, "dtype": dtype} for col, dtype in dtypes.items()],
+            "label_summary": label_summary,
+            "missing": {
+                "review_text": {"count": missing_review, "pct": pct(missing_review)},
+                "label": {"count": missing_label, "pct": pct(missing_label) if missing_label is not None else None},
+            },
+            "duplicates": duplicates,
+            "rating_outliers": {
+                "column": self.rating_column,
+                "count": outlier_count,
+                "pct": pct(outlier_count) if outlier_count is not None else None,
+                "min": rating_min,
+                "max": rating_max,
+                "expected_range": [1, 5],
+            },
+            "text_length_column": self.length_column,
+        }
+
+    def text_length_payload(self) -> Dict[str, Any]:
+        return {
+            "length_column": self.length_column,
+            "global_summary": self.length_global.stats(),
+            "summary_by_label": {lbl: s.stats() for lbl, s in sorted(self.length_by_label.items())},
+        }
+
+    def word_frequency_payload(self, top_n: int = 20) -> Dict[str, Any]:
+        self._require([self.review_column, self.label_column])
+        return {
+            "text_column": self.review_column,
+            "label_column": self.label_column,
+            "top_n": top_n,
+            "top_words_by_label": {
+                lbl: [{"word": w, "count": int(c)} for w, c in sketch.top(top_n)]
+                for lbl, sketch in sorted(self.words_by_label.items())
+            },
+        }
+
+    def duplicates_payload(self, top_k: int = DUPLICATE_TOP_K) -> Dict[str, Any]:
+        repeated = self.review_hashes.duplicates()
+        example_hashes = np.array(list(self.duplicate_examples.values()), dtype=np.uint64)
+        example_counts = self.review_hashes.get(example_hashes)
+        example_first = self.review_hashes.first_seen(example_hashes)
+        # most repeated first, ties in order of first appearance (as duplicate_review_eda)
+        ranked = sorted(zip(self.duplicate_examples, example_counts, example_first), key=lambda x: (-x[1], x[2]))
+        duplicated_reviews = [{"text": t, "count": int(c)} for t, c, _ in ranked[:top_k]]
+        payload = {
+            "review_column": self.review_column,
+            "total_rows": self.rows,
+            "unique_value_count": self.review_hashes.distinct,
+            "duplicate_value_count": repeated["values"],
+            "duplicate_rows": repeated["rows"],
+            "unique_rows": self.rows - repeated["rows"],
+            "top_k": top_k,
+            "duplicated_reviews": duplicated_reviews,
+        }
+        return payload if self.review_hashes.exact else payload | {"approximate": True}
+
+    def rating_payload(self) -> Dict[str, Any]:
+        if self.rating_column not in self.dtypes or not self.has_label or self.rating_global.count == 0:
+            return {"rating_available": False}
+        by_label = sorted(self.rating_by_label.items())
+        return {
+            "rating_available": True,
+            "rating_column": self.rating_column,
+            "label_column": self.label_column,
+            "global_summary": self.rating_global.stats(),
+            "summary_by_label": {lbl: s.stats() for lbl, s in by_label},
+            "counts_by_rating_and_label": {lbl: s.value_counts() for lbl, s in by_label},
+        }
+
+    def brand_payload(self) -> Dict[str, Any]:
+        self._require([self.brand_column, self.label_column])
+        return {
+            "generated_at": None,  # filled by save_json_report
+            "label_column": self.label_column,
+            "brand_column": self.brand_column,
+            "counts_by_sentiment": {
+                lbl: dict(sorted(counts.items(), key=lambda kv: -kv[1]))
+                for lbl, counts in sorted(self.brand_by_label.items())
+            },
+        }
+
+    # ----- persistence -----
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "exact": self.exact,
+            "columns": {
+                "label": self.label_column,
+                "review": self.review_column,
+                "rating": self.rating_column,
+                "brand": self.brand_column,
+                "length": self.length_column,
+            },
+            "sources": self.sources,
+            "rows": self.rows,
+            "dtypes": self.dtypes,
+            "missing": self.missing,
+            "label_counts": self.label_counts,
+            "row_hashes": self.row_hashes.to_dict(),
+            "review_hashes": self.review_hashes.to_dict(),
+            "duplicate_examples": {t: str(h) for t, h in self.duplicate_examples.items()},
+            "length_global": self.length_global.to_dict(),
+            "length_by_label": {k: v.to_dict() for k, v in self.length_by_label.items()},
+            "rating_outliers": self.rating_outliers,
+            "rating_global": self.rating_global.to_dict(),
+            "rating_by_label": {k: v.to_dict() for k, v in self.rating_by_label.items()},
+            "brand_totals": self.brand_totals,
+            "brand_by_label": self.brand_by_label,
+            "words_by_label": {k: v.to_dict() for k, v in self.words_by_label.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EdaState":
+        if data.get("version") != STATE_VERSION:
+            raise ValueError(f"Unsupported EDA state version: {data.get('version')}")
+        cols = data["columns"]
+        state = cls(label_column=cols["label"], review_column=cols["review"], rating_column=cols["rating"],
+                    brand_column=cols["brand"], length_column=cols["length"], exact=data.get("exact", False))
+        state.sources = list(data["sources"])
+        state.rows = int(data["rows"])
+        state.dtypes = dict(data["dtypes"])
+        state.missing = dict(data["missing"])
+        state.label_counts = dict(data["label_counts"])
+        state.row_hashes = HashSketch.from_dict(data["row_hashes"])
+        state.review_hashes = HashSketch.from_dict(data["review_hashes"])
+        state.duplicate_examples = {t: int(h) for t, h in data["duplicate_examples"].items()}
+        state.length_global = NumericSummary.from_dict(data["length_global"])
+        state.length_by_label = {k: NumericSummary.from_dict(v) for k, v in data["length_by_label"].items()}
+        state.rating_outliers = int(data["rating_outliers"])
+        state.rating_global = NumericSummary.from_dict(data["rating_global"])
+        state.rating_by_label = {k: NumericSummary.from_dict(v) for k, v in data["rating_by_label"].items()}
+        state.brand_totals = dict(data["brand_totals"])
+        state.brand_by_label = {k: dict(v) for k, v in data["brand_by_label"].items()}
+        state.words_by_label = {k: HeavyHitters.from_dict(v) for k, v in data["words_by_label"].items()}
+        return state
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "EdaState":
+        return cls.from_dict(json.loads(text))
+
+
+def build_eda_reports(
+    state: EdaState,
+    report_prefix: str = "eda",
+    top_n: int = 20,
+    chart_top_n: int = 10,
+    renderer: Optional[ChartRenderer] = None,
+    chart_format: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Rebuild the full run_full_eda payload (JSON reports + charts) from a merged state."""
+    if state.rows == 0:
+        raise ValueError("EDA state is empty. Cannot build reports.")
+
+    overview_payload = save_json_report(state.overview_payload(), "eda_overview", report_prefix)
+    text_len = save_json_report(state.text_length_payload(), "eda_text_length", report_prefix)
+    word_freq = save_json_report(state.word_frequency_payload(top_n), "eda_word_freq", report_prefix)
+    duplicates_summary = save_json_report(state.duplicates_payload(), "eda_duplicates", report_prefix)
+    rating = state.rating_payload()
+    if rating["rating_available"]:
+        rating_eda = save_json_report(rating, "eda_rating_sentiment", report_prefix)
+    else:
+        rating_eda = rating | {"report_path": None, "logged_to_mlflow": False}
+    brand_eda = save_json_report(state.brand_payload(), "eda_sentiment_brand", report_prefix)
+
+    brand_counts = {
+        sentiment: state.brand_by_label.get(sentiment, {})
+        for sentiment in SENTIMENT_LABELS
+        if state.label_counts.get(sentiment, 0) > 0
+    }
+
+    owns_renderer = renderer is None
+    renderer = renderer or ChartRenderer(chart_format=chart_format)
+    sentiment = sentiment_bar_chart(label_summary=overview_payload.get("label_summary", {}),
+                                    report_prefix=report_prefix, renderer=renderer)
+    text_len_charts = text_length_box_chart({lbl: s.box() for lbl, s in state.length_by_label.items()},
+                                            report_prefix=report_prefix, renderer=renderer)
+    word_freq_charts = word_frequency_charts(freq_payload=word_freq, report_prefix=report_prefix,
+                                             top_n=chart_top_n, renderer=renderer)
+    word_cloud = word_cloud_charts(freq_payload=word_freq, report_prefix=report_prefix, renderer=renderer)
+    duplicates_charts = duplicate_review_charts(summary_payload=duplicates_summary,
+                                                report_prefix=report_prefix, renderer=renderer)
+    if rating["rating_available"]:
+        rating_charts = rating_charts_from_summary(
+            {lbl: s.moments["mean"] for lbl, s in sorted(state.rating_by_label.items())},
+            {lbl: s.box() for lbl, s in state.rating_by_label.items()},
+            report_prefix=report_prefix, renderer=renderer,
+        )
+    else:
+        rating_charts = rating_charts_from_summary({}, {}, report_prefix=report_prefix, renderer=renderer)
+    brand_charts = sentiment_brand_charts_from_counts(brand_counts, sorted(state.brand_totals),
+                                                      report_prefix=report_prefix, renderer=renderer)
+    if owns_renderer:
+        renderer.wait()
+
+    return {
+        "overview": overview_payload,
+        "sentiment_chart": sentiment,
+        "text_length_overview": text_len,
+        "text_length_charts": text_len_charts,
+        "word_frequency_overview": word_freq,
+        "word_frequency_charts": word_freq_charts,
+        "word_clouds": word_cloud,
+        "duplicates_summary": duplicates_summary,
+        "duplicates_charts": duplicates_charts,
+        "rating_overview": rating_eda,
+        "rating_charts": rating_charts,
+        "brand_overview": brand_eda,
+        "brand_charts": brand_charts,
+    }
+
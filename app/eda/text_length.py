@@ -1,11 +1,11 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from app.config import REVIEW_COLUMN, TARGET_COULUM
-from app.eda.utils import ensure_text_length_column, numeric_stats, save_json_report, save_figure, sentiment_palette
+from app.eda.aggregate import aggregate_eda, box_by_label as box_stats_by_label
+from app.eda.render import ChartRenderer, save_chart
+from app.eda.utils import save_json_report, sentiment_palette
 
 
 def text_length_eda(
@@ -14,25 +14,21 @@ def text_length_eda(
     label_column: str = TARGET_COULUM,
     length_column: str = "text_length_chars",
     report_prefix: str = "text_length",
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Summarize text length stats overall and by label, save as JSON."""
     if df is None or df.empty:
         raise ValueError("Input dataframe is empty. Cannot run text length EDA.")
 
-    length_col = ensure_text_length_column(df, review_column, length_column)
-    lengths = df[length_col].dropna()
-
-    global_summary = numeric_stats(lengths)
-
-    summary_by_label = {}
-    if label_column in df.columns:
-        for lbl, sub in df[[label_column, length_col]].dropna(subset=[length_col]).groupby(label_column):
-            summary_by_label[str(lbl)] = numeric_stats(sub[length_col])
+    aggregates = aggregates or aggregate_eda(df, label_column, review_column, length_column=length_column)
+    length = aggregates["length"]
+    if length is None:
+        raise ValueError(f"Review column '{review_column}' not found.")
 
     payload = {
-        "length_column": length_col,
-        "global_summary": global_summary,
-        "summary_by_label": summary_by_label,
+        "length_column": aggregates["length_column"],
+        "global_summary": length["global"]["stats"],
+        "summary_by_label": {lbl: s["stats"] for lbl, s in length["by_label"].items()},
     }
 
     return save_json_report(payload, "eda_text_length", report_prefix)
@@ -44,21 +40,37 @@ def text_length_charts(
     label_column: str = TARGET_COULUM,
     length_column: str = "text_length_chars",
     report_prefix: str = "text_length",
+    renderer: Optional[ChartRenderer] = None,
+    aggregates: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """Generate boxplot figures for text length across labels."""
-    length_col = ensure_text_length_column(df, review_column, length_column)
-    if length_col not in df.columns:
-        raise ValueError(f"Length column '{length_col}' not found.")
+    aggregates = aggregates or aggregate_eda(df, label_column, review_column, length_column=length_column)
+    if aggregates["length"] is None:
+        raise ValueError(f"Length column '{length_column}' not found.")
+    return text_length_box_chart(box_stats_by_label(aggregates["length"]), report_prefix=report_prefix,
+                                 renderer=renderer)
+
 
-    fig_box, ax_box = plt.subplots(figsize=(7, 4))
-    labels = df[label_column].dropna().unique().tolist()
-    sns.boxplot(data=df[[label_column, length_col]].dropna(), x=label_column, y=length_col, ax=ax_box,
-                palette=sentiment_palette(labels))
-    ax_box.set_title("Text length by label")
-    ax_box.set_xlabel("Label")
-    ax_box.set_ylabel("Length (chars)")
+def text_length_box_chart(
+    box_by_label: Dict[str, Optional[Dict[str, Any]]],
+    report_prefix: str = "text_length",
+    renderer: Optional[ChartRenderer] = None,
+) -> Dict[str, Any]:
+    """Plot the text length boxplot from per-label box statistics."""
+    labels = [lbl for lbl, stats in box_by_label.items() if stats is not None]
+    stats = [box_by_label[lbl] for lbl in labels]
 
-    saved = save_figure(fig_box, "eda_text_length_box", report_prefix)
+    spec = {
+        "kind": "box",
+        "figsize": (7, 4),
+        "labels": labels,
+        "stats": stats,
+        "colors": sentiment_palette(labels),
+        "title": "Text length by label",
+        "xlabel": "Label",
+        "ylabel": "Length (chars)",
+    }
+    saved = save_chart(spec, "eda_text_length_box", report_prefix, renderer)
 
     return {
         "boxplot": {
@@ -1,11 +1,14 @@
+import hashlib
 import json
 import re
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import matplotlib.pyplot as plt
 import mlflow
 import nltk
+import numpy as np
 import pandas as pd
 from nltk.corpus import stopwords
 
@@ -39,11 +42,29 @@ def save_json_report(payload: Dict[str, Any], base_name: str, report_prefix: str
     return payload | {"report_path": str(report_path), "logged_to_mlflow": active_run is not None, "generated_at": timestamp}
 
 
-# Save a matplotlib figure and log it as an artifact if mlflow run is active.
+# Every report_path (JSON report or chart) referenced anywhere in an EDA payload.
+def report_paths(obj: Any) -> List[Path]:
+    if isinstance(obj, dict):
+        paths = []
+        for k, v in obj.items():
+            if k == "report_path" and isinstance(v, str):
+                paths.append(Path(v))
+            else:
+                paths.extend(report_paths(v))
+        return paths
+    if isinstance(obj, list):
+        return [p for item in obj for p in report_paths(item)]
+    return []
+
+
+# Save a matplotlib figure (always closing it) and log it as an artifact if mlflow run is active.
 def save_figure(fig, base_name: str, report_prefix: str) -> Dict[str, Any]:
     timestamp, img_path = timestamped_path(base_name, report_prefix, "png")
-    fig.tight_layout()
-    fig.savefig(img_path)
+    try:
+        fig.tight_layout()
+        fig.savefig(img_path)
+    finally:
+        plt.close(fig)
     mlflow_run = mlflow.active_run()
     if mlflow_run is not None:
         artifact_path = artifact_path_for_run(mlflow_run)
@@ -62,6 +83,26 @@ def ensure_columns(df: pd.DataFrame, required_cols: List[str]):
         raise ValueError(f"Required columns missing: {missing}")
 
 
+# Content fingerprint of a frame plus the parameters that shape an EDA run.
+# Every column feeds the overview (shape, dtypes, full-row duplicates), so all of them are hashed.
+def frame_fingerprint(df: pd.DataFrame, params: Optional[Dict[str, Any]] = None) -> str:
+    digest = hashlib.sha256()
+    header = {
+        "columns": [str(c) for c in df.columns],
+        "dtypes": [str(t) for t in df.dtypes],
+        "params": params or {},
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    digest.update(row_hashes.tobytes())
+    return digest.hexdigest()
+
+
+# 64-bit content hashes of the string form of each value (exact-duplicate keys).
+def text_hashes(series: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(series.astype(str), index=False).to_numpy(dtype=np.uint64)
+
+
 # Basic numeric summary stats with NaN handling.
 def numeric_stats(series: pd.Series) -> Dict[str, Any]:
     if series is None or series.empty:
@@ -79,6 +120,74 @@ def numeric_stats(series: pd.Series) -> Dict[str, Any]:
     }
 
 
+# Linear-interpolated quantile (numpy's default method) over a sorted value -> count histogram.
+def quantile_from_counts(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+    cum = np.cumsum(counts)
+    pos = q * (cum[-1] - 1)
+    lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+    v_lo = float(values[np.searchsorted(cum, lo, side="right")])
+    v_hi = float(values[np.searchsorted(cum, hi, side="right")])
+    return v_lo + (v_hi - v_lo) * (pos - lo)
+
+
+# Summary stats from mergeable moments (count, mean, M2, min, max) plus a histogram for the median.
+def numeric_stats_from_moments(moments: Dict[str, Any], values: np.ndarray, counts: np.ndarray) -> Dict[str, Any]:
+    count = int(moments.get("count", 0))
+    if count == 0:
+        return {"count": 0, "min": None, "max": None, "mean": None, "median": None, "std": None}
+    return {
+        "count": count,
+        "min": float(moments["min"]),
+        "max": float(moments["max"]),
+        "mean": float(moments["mean"]),
+        "median": quantile_from_counts(values, counts, 0.5),
+        "std": float(np.sqrt(moments["m2"] / (count - 1))) if count > 1 else float("nan"),
+    }
+
+
+# Box-plot summary (matplotlib conventions, whis=1.5) small enough to ship to a chart renderer.
+MAX_BOX_FLIERS = 200
+
+
+def box_stats_from_counts(values: np.ndarray, counts: np.ndarray) -> Optional[Dict[str, Any]]:
+    values = np.asarray(values, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+    if values.size == 0 or counts.sum() == 0:
+        return None
+    order = np.argsort(values)
+    values, counts = values[order], counts[order]
+
+    q1, med, q3 = (quantile_from_counts(values, counts, q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    lo_fence, hi_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = (values >= lo_fence) & (values <= hi_fence)
+    whislo = float(values[inside].min()) if inside.any() else q1
+    whishi = float(values[inside].max()) if inside.any() else q3
+    whislo, whishi = min(whislo, q1), max(whishi, q3)
+
+    flier_values, flier_counts = values[~inside], counts[~inside]
+    total = int(flier_counts.sum())
+    if total <= MAX_BOX_FLIERS:
+        fliers = np.repeat(flier_values, flier_counts)
+    else:
+        # keep an evenly spaced subset of the sorted fliers, always including both extremes
+        ranks = np.linspace(0, total - 1, MAX_BOX_FLIERS).astype(np.int64)
+        fliers = flier_values[np.searchsorted(np.cumsum(flier_counts), ranks, side="right")]
+    return {
+        "q1": q1,
+        "med": med,
+        "q3": q3,
+        "whislo": whislo,
+        "whishi": whishi,
+        "fliers": [float(v) for v in fliers],
+    }
+
+
+def box_stats(series: pd.Series) -> Optional[Dict[str, Any]]:
+    counts = pd.to_numeric(series, errors="coerce").dropna().value_counts()
+    return box_stats_from_counts(counts.index.to_numpy(), counts.to_numpy())
+
+
 # ---------- Text helpers ----------
 try:
     STOPWORDS = set(stopwords.words("english"))
@@ -119,4 +228,4 @@ def sentiment_palette(labels: List[str]) -> List[str]:
 def categorical_palette(count: int) -> List[str]:
     """Diverse palette for categorical bars."""
     import seaborn as sns  # local import to avoid hard dep when not plotting
-    return sns.color_palette("husl", count)
+    return list(sns.color_palette("husl", count).as_hex())
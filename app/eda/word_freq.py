@@ -1,13 +1,12 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 from collections import Counter
 import re
 
 from app.config import REVIEW_COLUMN, TARGET_COULUM
-from app.eda.utils import tokenize, save_json_report, save_figure, ensure_columns, categorical_palette
+from app.eda.render import ChartRenderer, save_chart
+from app.eda.utils import tokenize, save_json_report, ensure_columns, categorical_palette
 
 
 def word_frequency_eda(
@@ -44,23 +43,28 @@ def word_frequency_charts(
     freq_payload: dict,
     report_prefix: str = "word_freq",
     top_n: int = 10,
+    renderer: Optional[ChartRenderer] = None,
 ) -> Dict[str, Any]:
     """Plot bar charts for top tokens per label from frequency payload."""
     results = {}
     for lbl, items in freq_payload.get("top_words_by_label", {}).items():
         if not items:
             continue
-        plot_df = pd.DataFrame(items[:top_n])
-        fig, ax = plt.subplots(figsize=(7, 4))
-        palette = categorical_palette(len(plot_df))
-        sns.barplot(data=plot_df, x="word", y="count", palette=palette, ax=ax)
-        ax.set_title(f"Top words for label = {lbl}")
-        ax.set_xlabel("word")
-        ax.set_ylabel("count")
-        ax.tick_params(axis='x', rotation=45)
+        top_items = items[:top_n]
+        spec = {
+            "kind": "bar",
+            "figsize": (7, 4),
+            "x": [entry["word"] for entry in top_items],
+            "y": [int(entry["count"]) for entry in top_items],
+            "colors": categorical_palette(len(top_items)),
+            "rotate_xticks": 45,
+            "title": f"Top words for label = {lbl}",
+            "xlabel": "word",
+            "ylabel": "count",
+        }
 
         safe_lbl = re.sub(r'[^a-zA-Z0-9]+', '_', lbl)
-        saved = save_figure(fig, f"eda_wordfreq_bar_{safe_lbl}", report_prefix)
+        saved = save_chart(spec, f"eda_wordfreq_bar_{safe_lbl}", report_prefix, renderer)
         results[lbl] = {"report_path": saved["report_path"], "logged_to_mlflow": saved["logged_to_mlflow"]}
 
     return {"bar_charts": results}
@@ -69,10 +73,11 @@ def word_frequency_charts(
 def word_cloud_charts(
     freq_payload: dict,
     report_prefix: str = "word_freq",
+    renderer: Optional[ChartRenderer] = None,
 ) -> Dict[str, Any]:
     """Generate word clouds per label from frequency payload."""
     try:
-        from wordcloud import WordCloud
+        import wordcloud  # noqa: F401  (drawn by the chart renderer)
     except ImportError:
         return {"wordclouds": {}, "error": "wordcloud package not installed"}
 
@@ -84,16 +89,15 @@ def word_cloud_charts(
         if not freqs:
             continue
 
-        wc = WordCloud(width=800, height=400, background_color="white", colormap="viridis")
-        wc.generate_from_frequencies(freqs)
-
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.imshow(wc, interpolation="bilinear")
-        ax.axis("off")
-        ax.set_title(f"Word cloud for label = {lbl}")
+        spec = {
+            "kind": "wordcloud",
+            "figsize": (8, 4),
+            "frequencies": freqs,
+            "title": f"Word cloud for label = {lbl}",
+        }
 
         safe_lbl = re.sub(r'[^a-zA-Z0-9]+', '_', lbl)
-        saved = save_figure(fig, f"eda_wordcloud_{safe_lbl}", report_prefix)
+        saved = save_chart(spec, f"eda_wordcloud_{safe_lbl}", report_prefix, renderer)
         results[lbl] = {"report_path": saved["report_path"], "logged_to_mlflow": saved["logged_to_mlflow"]}
 
     return {"wordclouds": results}
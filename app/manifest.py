@@ -0,0 +1,118 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import MANIFEST_PREFIX, MANIFEST_TRACKED_PREFIXES
+
+MANIFEST_VERSION = 2
+
+
+# ---------- Object names ----------
+def tracked_prefix(blob_name: str) -> Optional[str]:
+    """The tracked prefix a blob belongs to (longest match), or None if it is not tracked."""
+    matches = [p for p in MANIFEST_TRACKED_PREFIXES if blob_name.startswith(p)]
+    return max(matches, key=len) if matches else None
+
+
+def _manifest_key(prefix: str) -> str:
+    return prefix.strip("/").replace("/", "__") or hashlib.sha1(prefix.encode()).hexdigest()[:12]
+
+
+def pointer_path(prefix: str) -> str:
+    """Pointer blob: newest object, the index shard days and the last full sync."""
+    return f"{MANIFEST_PREFIX}/{_manifest_key(prefix)}/latest.json"
+
+
+def shard_path(prefix: str, day: str) -> str:
+    """Index shard holding one UTC day of objects."""
+    return f"{MANIFEST_PREFIX}/{_manifest_key(prefix)}/index/{day}.json"
+
+
+# ---------- Entries ----------
+def timestamp(dt: datetime) -> str:
+    """Fixed-width UTC timestamp, so manifest times order correctly as strings (naive means UTC)."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+
+
+def blob_entry(blob) -> Dict[str, Any]:
+    """What the manifest keeps per object: enough to pick, order and fetch it without a listing."""
+    return {
+        "name": blob.name,
+        "time_created": timestamp(blob.time_created),
+        "size": int(blob.size or 0),
+        "generation": int(blob.generation or 0),
+    }
+
+
+def sort_key(entry: Dict[str, Any]):
+    return entry["time_created"], entry["name"]
+
+
+def entry_day(entry: Dict[str, Any]) -> str:
+    return entry["time_created"][:10]
+
+
+def group_by_day(entries: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    days: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        days.setdefault(entry_day(entry), []).append(entry)
+    return days
+
+
+def merge_shard(shard: Optional[Dict[str, Any]], entries: List[Dict[str, Any]], prefix: str, day: str,
+                keep_since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Shard with entries added (same name replaces). With keep_since only existing
+    entries created at or after it survive, for rebuilding a shard from a listing.
+    Returns the shard itself when nothing changed, so the caller can skip the write.
+    """
+    existing = (shard or {}).get("entries", [])
+    merged = {e["name"]: e for e in existing if keep_since is None or e["time_created"] >= keep_since}
+    merged.update((e["name"], e) for e in entries)
+    ordered = sorted(merged.values(), key=sort_key)
+    if shard is not None and ordered == existing:
+        return shard
+    return {"version": MANIFEST_VERSION, "prefix": prefix, "day": day, "entries": ordered}
+
+
+def advance_pointer(pointer: Optional[Dict[str, Any]], entries: List[Dict[str, Any]], prefix: str,
+                    synced_at: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Pointer after entries were indexed. latest only moves forward, so concurrent
+    writers converge on the newest; with synced_at (a full listing) an older
+    latest is dropped so deleted objects stop being returned.
+    """
+    base = pointer or {"version": MANIFEST_VERSION, "prefix": prefix, "latest": None, "shards": [],
+                       "synced_at": None}
+    latest = base["latest"]
+    if synced_at is not None and latest is not None and latest["time_created"] < synced_at:
+        latest = None
+    latest = max(filter(None, [latest, *entries]), key=sort_key, default=None)
+    updated = base | {
+        "latest": latest,
+        "shards": sorted(set(base["shards"]) | {entry_day(e) for e in entries}),
+        "synced_at": max(filter(None, [base["synced_at"], synced_at]), default=None),
+    }
+    return pointer if pointer is not None and updated == pointer else updated
+
+
+def shards_between(days: List[str], start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+    """Shard days that can hold objects created in [start, end)."""
+    lo = timestamp(start)[:10] if start else None
+    hi = timestamp(end)[:10] if end else None
+    return [d for d in days if (lo is None or d >= lo) and (hi is None or d <= hi)]
+
+
+def entries_between(entries: List[Dict[str, Any]], start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Entries created in [start, end), oldest first."""
+    lo = timestamp(start) if start else None
+    hi = timestamp(end) if end else None
+    return sorted((e for e in entries if (lo is None or e["time_created"] >= lo)
+                   and (hi is None or e["time_created"] < hi)), key=sort_key)
@@ -1,3 +1,4 @@
+import asyncio
 import pandas as pd
 from datetime import datetime
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks, Response
@@ -15,6 +16,20 @@ predictHandler = PredictionHandler()
 dataHandler = DataHandler()
 background_tasks: BackgroundTasks
 
+def flush_pending():
+    # storage bookkeeping buffered by requests, written off the request path
+    dataHandler.flush_manifests()
+    predictHandler.flush_drift()
+
+async def flush_loop():
+    while True:
+        await asyncio.sleep(BACKGROUND_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(flush_pending)
+            await asyncio.to_thread(dataHandler.sync_out_of_band_manifests)
+        except Exception as e:
+            print(f"[warn] background flush failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # STARTUP
@@ -33,9 +48,12 @@ async def lifespan(app: FastAPI):
     except Exception:
         print("System : Cannot find any Production Model")
     
+    flusher = asyncio.create_task(flush_loop())
     yield
 
     print("🛑 LIFESPAN: Shutting down...")
+    flusher.cancel()
+    await asyncio.to_thread(flush_pending)
 
 app = FastAPI(lifespan=lifespan)
 
@@ -154,7 +172,7 @@ async def predict(file: UploadFile = File(...)):
                 cur_df=df_original[[REVIEW_COLUMN]],
                 request_id=request_id
             )
-            if drift_share > 0.3:
+            if drift_share > DRIFT_THRESHOLD:
                 print(f"data drift is more than threshold - wait for data is labeled : {drift_share}")
                 drift_detected = True
             else:
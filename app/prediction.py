@@ -1,4 +1,6 @@
 import json
+import threading
+from datetime import datetime, timedelta, timezone
 
 import mlflow
 from evidently import Dataset, DataDefinition, Report
@@ -12,15 +14,53 @@ def map_model_type(model_type):
         return "xgb"
     elif model_type == "RandomForest":
         return "rf"
+    elif model_type == "SGDIncremental":
+        return "sgd"
+    elif model_type == "NaiveBayesIncremental":
+        return "inb"
     else:
         return "nb"
 
+def merge_drift_series(series, pending, now=None, retention_hours=DRIFT_SERIES_RETENTION_HOURS):
+    """Add pending's hourly buckets into series, dropping buckets older than the retention."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(hours=retention_hours)).isoformat()
+    buckets = {b["start"]: dict(b) for b in (series or {}).get("buckets", []) if b["start"] >= cutoff}
+    for b in (pending or {}).get("buckets", []):
+        if b["start"] < cutoff:
+            continue
+        bucket = buckets.setdefault(b["start"], {"start": b["start"], "requests": 0, "rows": 0,
+                                                 "drift_share_sum": 0.0, "drift_share_max": 0.0,
+                                                 "drifted_requests": 0})
+        for key in ("requests", "rows", "drift_share_sum", "drifted_requests"):
+            bucket[key] += b[key]
+        bucket["drift_share_max"] = max(bucket["drift_share_max"], b["drift_share_max"])
+    return {"bucket_seconds": 3600, "threshold": DRIFT_THRESHOLD, "updated": now.isoformat(),
+            "buckets": sorted(buckets.values(), key=lambda b: b["start"])}
+
+def add_drift_point(series, drift_share, rows, drifted, now=None,
+                    retention_hours=DRIFT_SERIES_RETENTION_HOURS):
+    """
+    Fold one /predict drift result into the hourly drift series: each bucket keeps
+    request and row counts, the sum and max of drift_share and how many requests
+    crossed the threshold, so the series stays small however busy serving gets.
+    """
+    now = now or datetime.now(timezone.utc)
+    point = {"start": now.replace(minute=0, second=0, microsecond=0).isoformat(), "requests": 1, "rows": int(rows),
+             "drift_share_sum": float(drift_share), "drift_share_max": float(drift_share),
+             "drifted_requests": int(drifted)}
+    return merge_drift_series(series, {"buckets": [point]}, now=now, retention_hours=retention_hours)
+
+
 class PredictionHandler:
     def __init__(self):
         self.dataHandler = DataHandler()
         self.production_model = None
         self.id_to_label = None
         self.metrics = {}
+        # drift points recorded by requests and not yet merged into DRIFT_SERIES_BLOB
+        self._drift_pending = None
+        self._drift_lock = threading.Lock()
         
     def find_any_production_model(self, alias: str = ALIAS) -> str | None:
         """
@@ -117,9 +157,38 @@ class PredictionHandler:
         rep_dict = drift_eval.dict()
         metrics = rep_dict.get("metrics", [])
         if metrics:
-            drift_share = metrics[0]["config"]["drift_share"]
+            # DriftedColumnsCount: value holds the measured share, config only the preset's threshold
+            value = metrics[0].get("value")
+            if isinstance(value, dict) and "share" in value:
+                drift_share = float(value["share"])
+            else:
+                drift_share = metrics[0]["config"]["drift_share"]
         else:
             print(f"can not get metrics from datadrift")
             drift_share = 0.0
+
+        self.record_drift(drift_share, rows=len(cur_df))
         return drift_share
 
+    def record_drift(self, drift_share, rows):
+        """Buffer this request's drift result; flush_drift merges it into the shared series."""
+        with self._drift_lock:
+            self._drift_pending = add_drift_point(self._drift_pending, drift_share, rows,
+                                                  drift_share > DRIFT_THRESHOLD)
+
+    def flush_drift(self):
+        """Merge the buffered drift points into the series the retrain task reads, in one update."""
+        with self._drift_lock:
+            pending, self._drift_pending = self._drift_pending, None
+        if pending is None:
+            return
+        try:
+            merged = self.dataHandler._update_json_safe(DRIFT_SERIES_BLOB,
+                                                        lambda series: merge_drift_series(series, pending))
+        except Exception as e:
+            print(f"[warn] could not record drift in {DRIFT_SERIES_BLOB}: {e}")
+            merged = None
+        if merged is None:
+            # keep the points for the next flush
+            with self._drift_lock:
+                self._drift_pending = merge_drift_series(pending, self._drift_pending)